@@ -7,8 +7,12 @@ Run:
     streamlit run app.py
 """
 
+import importlib
+
 import streamlit as st
 
+from engine.metrics import start_exporter, timed
+
 # ─── PAGE CONFIG (must be FIRST streamlit call) ───────────────────────────────
 
 st.set_page_config(
@@ -172,9 +176,16 @@ footer {visibility: hidden;}
 </style>
 """, unsafe_allow_html=True)
 
-# ─── IMPORT PAGE MODULES ──────────────────────────────────────────────────────
+# ─── PAGE MODULES (imported on first visit) ───────────────────────────────────
 
-from pages import home, calculator, predictions, analytics, recommendations
+PAGES = {
+    "🏠  Home": "home",
+    "🧮  Calculator": "calculator",
+    "🤖  AI Prediction": "predictions",
+    "📊  Analytics": "analytics",
+    "💡  Recommendations": "recommendations",
+    "🏢  Organization": "organization",
+}
 
 # ─── SIDEBAR NAVIGATION ───────────────────────────────────────────────────────
 
@@ -190,7 +201,7 @@ with st.sidebar:
 
     page = st.radio(
         "Navigate",
-        ["🏠  Home", "🧮  Calculator", "🤖  AI Prediction", "📊  Analytics", "💡  Recommendations"],
+        list(PAGES),
         label_visibility="collapsed"
     )
 
@@ -204,8 +215,9 @@ with st.sidebar:
 
 # ─── ROUTE TO PAGE ────────────────────────────────────────────────────────────
 
-if   "Home"            in page: home.show()
-elif "Calculator"      in page: calculator.show()
-elif "AI Prediction"   in page: predictions.show()
-elif "Analytics"       in page: analytics.show()
-elif "Recommendations" in page: recommendations.show()
\ No newline at end of file
+# Home never pays for pandas / sklearn / xgboost / plotly; each page module is
+# imported the first time it's routed to and stays cached in sys.modules
+start_exporter()   # CARBON_METRICS_PORT / CARBON_METRICS_FILE, once per process
+module = "diagnostics" if "diagnostics" in st.query_params else PAGES[page]   # hidden: ?diagnostics=1
+with timed('page_render_seconds', page=module):
+    importlib.import_module(f"pages.{module}").show()
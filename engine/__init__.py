@@ -0,0 +1,2 @@
+# engine/__init__.py
+# Shared computation helpers used by the Streamlit pages and the training scripts
@@ -0,0 +1,54 @@
+"""
+Cluster assigner — StandardScaler + KMeans folded into one NumPy expression
+In scaled space the squared distance to centroid c is Σ ((x − μ)/σ − c)².
+With w = 1/σ² and c' = μ + σ·c (the centroid mapped back to raw units) that is
+Σ w (x − c')², and the argmin only needs  ‖c'‖²_w − 2 (x·w) @ c'ᵀ.
+So serving is one matmul on raw inputs — no scaler, no sklearn validation.
+"""
+import os
+
+import numpy as np
+
+
+ASSIGNER_PATH = 'models/cluster_assigner.npz'
+
+
+class ClusterAssigner:
+    """Drop-in for `kmeans.predict(scaler.transform(X))` on raw feature rows"""
+
+    def __init__(self, centroids, weights, features):
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float64)   # k × F, raw units
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)       # F, = 1/σ²
+        self.features = list(features)
+        self._wc = np.ascontiguousarray((self.centroids * self.weights).T)   # F × k
+        self._offset = (self.centroids ** 2 * self.weights).sum(axis=1)      # k
+
+    @classmethod
+    def from_sklearn(cls, scaler, kmeans, features):
+        scale = np.asarray(scaler.scale_, dtype=np.float64)
+        mean = np.asarray(scaler.mean_, dtype=np.float64)
+        centroids = mean + scale * np.asarray(kmeans.cluster_centers_, dtype=np.float64)
+        return cls(centroids, 1.0 / scale ** 2, features)
+
+    def _matrix(self, X):
+        if hasattr(X, 'columns'):
+            X = X[self.features]
+        return np.atleast_2d(np.asarray(X, dtype=np.float64))
+
+    def distances(self, X):
+        """Squared scaled-space distances up to a per-row constant (n × k)"""
+        return self._offset - 2.0 * (self._matrix(X) @ self._wc)
+
+    def predict(self, X):
+        return self.distances(X).argmin(axis=1)
+
+    def save(self, path=ASSIGNER_PATH):
+        np.savez(path, centroids=self.centroids, weights=self.weights,
+                 features=np.asarray(self.features))
+
+    @classmethod
+    def load(cls, path=ASSIGNER_PATH):
+        if not os.path.exists(path):
+            return None
+        data = np.load(path)
+        return cls(data['centroids'], data['weights'], data['features'].tolist())
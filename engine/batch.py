@@ -0,0 +1,215 @@
+"""
+Batch — streaming encode and score of organisation-sized CSV uploads
+The CSV is read in chunks; each chunk is normalised (raw survey headers such as
+"Vehicle Type" or the cleaned snake_case ones), encoded with ENCODE_MAP,
+validated by engine.validation (vectorised masks), scored with one batched predict per model and
+one cluster assignment, then folded into running aggregates and dropped.
+Memory is bounded by the chunk size and the top-k heap, not by the file.
+"""
+import heapq
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from engine.features import ENCODE_MAP, normalize_column
+from engine.scoring import assign_clusters, predict_models
+from engine.validation import DERIVED, ERROR, NUMERIC, WARNING, load_schema
+
+
+CHUNK_ROWS = 20_000
+TOP_K = 25
+HIST_EDGES = np.arange(0, 20_001, 100.0)       # kg CO₂ / year; last bin catches everything above
+ID_COLUMNS = ('employee_id', 'id', 'email', 'name')
+GROUP_COLUMNS = ('department', 'team', 'site', 'office')
+
+CATEGORICAL = tuple(ENCODE_MAP)
+REQUIRED = CATEGORICAL + NUMERIC
+
+_LOWER_MAP = {col: {label.lower(): code for label, code in m.items()} for col, m in ENCODE_MAP.items()}
+
+
+def template_csv():
+    """Header plus two example rows in the raw survey vocabulary"""
+    header = ['employee_id', 'department', *REQUIRED]
+    rows = [
+        ['E001', 'Sales', 'normal', 'female', 'vegetarian', 'daily', 'electricity', 'public', 'none',
+         'sometimes', 'rarely', 'medium', 'Yes', 150, 120, 2, 6, 2, 8],
+        ['E002', 'Engineering', 'overweight', 'male', 'omnivore', 'twice a day', 'natural gas', 'private',
+         'petrol', 'often', 'frequently', 'large', 'No', 240, 900, 4, 8, 6, 10],
+    ]
+    return '\n'.join(','.join(map(str, r)) for r in [header, *rows]) + '\n'
+
+
+def encode_chunk(df):
+    """Label → code mapping for one raw chunk, then the shared validation → Report (.values, .valid)"""
+    encoded = {}
+    for col in CATEGORICAL:
+        s = df[col]
+        numeric = pd.api.types.is_numeric_dtype(s)
+        if col == 'vehicle_type':       # no vehicle — same as clean_data.py
+            s = s.fillna(ENCODE_MAP[col]['none'] if numeric else 'none')
+        if not numeric:
+            s = s.astype(str).str.strip().str.lower().map(_LOWER_MAP[col])
+        encoded[col] = s
+    for col in (*NUMERIC, *DERIVED):
+        if col in df:
+            encoded[col] = df[col]
+    return load_schema().check(encoded, required=REQUIRED)
+
+
+class OrgSummary:
+    """Running org-level aggregates — count, sum, histogram, cluster mix, groups and a top-k heap"""
+
+    def __init__(self, cluster_names, top_k=TOP_K):
+        self.cluster_names = cluster_names
+        self.top_k = top_k
+        self.rows = self.invalid = 0
+        self.total = 0.0
+        self.hist = np.zeros(len(HIST_EDGES), dtype=np.int64)
+        self.cluster_count = np.zeros(len(cluster_names), dtype=np.int64)
+        self.cluster_sum = np.zeros(len(cluster_names))
+        self.warned = 0
+        self.groups = {}                       # group → [count, sum]
+        self.errors = {}                       # 'column: check' → rejected rows
+        self.warnings = {}                     # 'column: check' → scored but flagged rows
+        self.examples = []                     # first few rejected rows, as structured issues
+        self._top = []                         # min-heap of (kg, seq, id, cluster)
+        self._seq = 0
+
+    def add_report(self, report, start):
+        """Fold one chunk's validation into the totals — `start` is the chunk's first row"""
+        for totals, severity in ((self.errors, ERROR), (self.warnings, WARNING)):
+            for key, n in report.counts(severity).items():
+                totals[key] = totals.get(key, 0) + n
+        valid = report.valid
+        self.invalid += int((~valid).sum())
+        self.warned += int((report.warned & valid).sum())
+        if len(self.examples) < 10:
+            for issue in report.rows(10 - len(self.examples), ERROR):
+                self.examples.append({'line': issue['row'] + start + 2, **issue})    # CSV line, header is 1
+
+    def update(self, kg, clusters, ids, groups=None):
+        self.rows += len(kg)
+        self.total += float(kg.sum())
+        idx = np.clip(np.searchsorted(HIST_EDGES, kg, side='right') - 1, 0, None)     # below 0 → first bin
+        self.hist += np.bincount(idx, minlength=len(HIST_EDGES))
+        self.cluster_count += np.bincount(clusters, minlength=len(self.cluster_names))
+        self.cluster_sum += np.bincount(clusters, weights=kg, minlength=len(self.cluster_names))
+
+        if groups is not None:
+            keys, inverse = np.unique(groups, return_inverse=True)
+            counts = np.bincount(inverse, minlength=len(keys))
+            sums = np.bincount(inverse, weights=kg, minlength=len(keys))
+            for key, c, s in zip(keys, counts, sums):
+                g = self.groups.setdefault(str(key), [0, 0.0])
+                g[0] += int(c)
+                g[1] += float(s)
+
+        # only this chunk's k largest can enter the heap
+        k = min(self.top_k, len(kg))
+        if k:
+            for i in np.argpartition(-kg, k - 1)[:k]:
+                item = (float(kg[i]), self._seq, str(ids[i]), self.cluster_names[clusters[i]])
+                self._seq += 1
+                if len(self._top) < self.top_k:
+                    heapq.heappush(self._top, item)
+                elif item[0] > self._top[0][0]:
+                    heapq.heapreplace(self._top, item)
+
+    def percentile(self, q):
+        """Approximate percentile (bin midpoint resolution, 100 kg)"""
+        if not self.rows:
+            return 0.0
+        i = int(np.searchsorted(np.cumsum(self.hist), q / 100 * self.rows))
+        return float(HIST_EDGES[min(i, len(HIST_EDGES) - 1)] + 50)
+
+    def top(self):
+        """[(kg, id, cluster)] largest first"""
+        return [(kg, ident, cluster) for kg, _, ident, cluster in sorted(self._top, reverse=True)]
+
+    def to_dict(self):
+        last = int(np.flatnonzero(self.hist).max()) + 1 if self.rows else 0
+        return {
+            'rows': self.rows, 'invalid': self.invalid, 'warned': self.warned, 'total_kg': self.total,
+            'mean_kg': self.total / self.rows if self.rows else 0.0,
+            'p10': self.percentile(10), 'p50': self.percentile(50), 'p90': self.percentile(90),
+            'clusters': {name: {'count': int(c), 'mean_kg': float(s / c) if c else 0.0}
+                         for name, c, s in zip(self.cluster_names, self.cluster_count, self.cluster_sum)},
+            'groups': {g: {'count': c, 'mean_kg': s / c, 'total_kg': s} for g, (c, s) in sorted(self.groups.items())},
+            'hist': (HIST_EDGES[:last], self.hist[:last]),
+            'top': self.top(), 'errors': dict(self.errors), 'warnings': dict(self.warnings),
+            'examples': list(self.examples),
+        }
+
+
+def encoded_chunks(f, chunk_rows=CHUNK_ROWS):
+    """Read an open CSV in chunks → yields (chunk, Report, ids, groups, start row)
+
+    Headers are normalised and checked on the first chunk (ValueError when required
+    columns are missing). `ids` falls back to 1-based row numbers, `groups` is None
+    without a department-like column; both cover every row, valid or not.
+    """
+    columns = id_col = group_col = None
+    start = 0
+    for chunk in pd.read_csv(f, chunksize=chunk_rows, skipinitialspace=True, low_memory=False):
+        if columns is None:
+            columns = [normalize_column(c) for c in chunk.columns]
+            missing = [c for c in REQUIRED if c not in columns]
+            if missing:
+                raise ValueError(f"Missing column{'s' if len(missing) > 1 else ''}: {', '.join(missing)}")
+            id_col = next((c for c in ID_COLUMNS if c in columns), None)
+            group_col = next((c for c in GROUP_COLUMNS if c in columns), None)
+        chunk.columns = columns
+        ids = chunk[id_col].to_numpy() if id_col else np.arange(start + 1, start + len(chunk) + 1)
+        groups = chunk[group_col].fillna('—').astype(str).to_numpy() if group_col else None
+        yield chunk, encode_chunk(chunk), ids, groups, start
+        start += len(chunk)
+
+
+def score_csv(source, models, chunk_rows=CHUNK_ROWS, top_k=TOP_K, monitor=None):
+    """Stream a CSV path or file object → yields (OrgSummary, stats) after every chunk
+
+    Scored rows and their predictions are counted by `monitor` (a DriftMonitor) when given.
+    Raises ValueError up front when required columns are missing.
+    """
+    features = models['features']
+    k = len(models['cluster_map'])
+    summary = OrgSummary([models['cluster_map'].get(str(c), f'Cluster {c}') for c in range(k)], top_k)
+    stats = {'rows_read': 0, 'parse_s': 0.0, 'score_s': 0.0, 'seconds': 0.0, 'fraction': 0.0}
+
+    f = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+    try:
+        f.seek(0, os.SEEK_END)
+        size = f.tell() or 1
+        f.seek(0)
+        t0 = last = time.perf_counter()
+        for chunk, report, ids, groups, start in encoded_chunks(f, chunk_rows):
+            summary.add_report(report, start)
+            valid = report.valid
+            X = pd.DataFrame({c: report.values[c][valid] for c in features}, columns=features)
+            ids = ids[valid]
+            groups = groups[valid] if groups is not None else None
+            stats['rows_read'] += len(chunk)
+            t1 = time.perf_counter()
+
+            if len(X):
+                kg = predict_models(models, X)['ensemble']
+                clusters, _ = assign_clusters(models, X)
+                summary.update(kg, clusters, ids, groups)
+                if monitor is not None:
+                    from engine.drift import PREDICTION
+                    monitor.observe_many({**{c: report.values[c][valid] for c in REQUIRED}, PREDICTION: kg})
+            t2 = time.perf_counter()
+
+            stats['parse_s'] += t1 - last            # read + encode + validate
+            stats['score_s'] += t2 - t1
+            stats['seconds'] = t2 - t0
+            stats['rows_per_s'] = stats['rows_read'] / stats['seconds']
+            stats['fraction'] = min(f.tell() / size, 1.0)
+            last = t2
+            yield summary, stats
+    finally:
+        if f is not source:
+            f.close()
@@ -0,0 +1,93 @@
+"""
+Binning — server-side aggregation for population charts
+Turns raw population columns into fixed-size bin / heatmap arrays so the
+Plotly payload and render time stay constant no matter how many rows we have.
+"""
+import os
+import numpy as np
+
+
+POPULATION_PATH = 'data/carbon_data_cleaned.csv'
+
+HIST_BINS = 60
+HEATMAP_BINS = (40, 40)
+
+
+def dataset_version(path=POPULATION_PATH):
+    """Cheap version tag for a data file (size + mtime) — used as the cache key"""
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _range(values):
+    if values.size == 0:
+        return 0.0, 1.0
+    lo, hi = float(values.min()), float(values.max())
+    return (lo, hi) if hi > lo else (lo, lo + 1.0)
+
+
+def _centers(edges):
+    return (edges[:-1] + edges[1:]) / 2
+
+
+def _bin_index(values, lo, hi, bins):
+    return np.clip(((values - lo) * (bins / (hi - lo))).astype(np.int64), 0, bins - 1)
+
+
+def hist_1d(values, bins=HIST_BINS, value_range=None):
+    """Fixed-size 1-D histogram → dict(centers, counts, edges)"""
+    values = np.asarray(values, dtype=np.float64)
+    value_range = value_range or _range(values)
+    counts, edges = np.histogram(values, bins=bins, range=value_range)
+    return {'centers': _centers(edges), 'counts': counts, 'edges': edges}
+
+
+def hist_2d(x, y, bins=HEATMAP_BINS, x_range=None, y_range=None):
+    """Fixed-size 2-D histogram → dict(x, y, z) ready for go.Heatmap (z rows follow y)"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    (x_lo, x_hi), (y_lo, y_hi) = x_range or _range(x), y_range or _range(y)
+    nx, ny = bins
+    # bincount on flattened (y, x) cell codes — much faster than histogram2d's sort
+    codes = _bin_index(y, y_lo, y_hi, ny) * nx + _bin_index(x, x_lo, x_hi, nx)
+    z = np.bincount(codes, minlength=nx * ny).reshape(ny, nx)
+    return {'x': _centers(np.linspace(x_lo, x_hi, nx + 1)),
+            'y': _centers(np.linspace(y_lo, y_hi, ny + 1)), 'z': z}
+
+
+def grouped_hist(values, groups, n_groups, bins=HIST_BINS, value_range=None):
+    """One histogram per group in a single pass (bincount over group*bins + bin)"""
+    values = np.asarray(values, dtype=np.float64)
+    groups = np.asarray(groups, dtype=np.int64)
+    lo, hi = value_range or _range(values)
+    edges = np.linspace(lo, hi, bins + 1)
+    counts = np.bincount(groups * bins + _bin_index(values, lo, hi, bins), minlength=n_groups * bins)
+    return {'centers': _centers(edges), 'counts': counts.reshape(n_groups, bins), 'edges': edges}
+
+
+def summarize(values):
+    """Count / mean / quartiles for an annotation line under a chart"""
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return {'n': 0, 'mean': 0.0, 'p25': 0.0, 'p50': 0.0, 'p75': 0.0}
+    p25, p50, p75 = np.percentile(values, [25, 50, 75])
+    return {'n': int(values.size), 'mean': float(values.mean()),
+            'p25': float(p25), 'p50': float(p50), 'p75': float(p75)}
+
+
+def population_bins(df, clusters=None, cluster_names=None, bins=HIST_BINS, heatmap_bins=HEATMAP_BINS):
+    """All population chart arrays for the Analytics page in one pass over the frame"""
+    co2 = df['carbonemission'].to_numpy(dtype=np.float64)
+    distance = df['vehicle_monthly_distance_km'].to_numpy(dtype=np.float64)
+    co2_range = _range(co2)
+
+    out = {
+        'co2_hist': hist_1d(co2, bins=bins, value_range=co2_range),
+        'distance_heatmap': hist_2d(distance, co2, bins=heatmap_bins, y_range=co2_range),
+        'summary': summarize(co2),
+    }
+    if clusters is not None:
+        n_groups = int(clusters.max()) + 1 if clusters.size else 0
+        out['cluster_hist'] = grouped_hist(co2, clusters, n_groups, bins=bins, value_range=co2_range)
+        out['cluster_names'] = cluster_names or [str(c) for c in range(n_groups)]
+    return out
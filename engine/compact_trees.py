@@ -0,0 +1,240 @@
+"""
+Compact trees — RF / XGBoost forests flattened into small NumPy arrays
+Each node is a feature code (int8), one split slot (threshold for splits, leaf
+value for leaves) and the right-child index; nodes are renumbered depth-first so
+the left child is always node + 1. Every split is normalised to `x ≤ T`:
+
+- float32: T is the largest float32 that keeps the original comparison
+  (sklearn's `x ≤ t`, XGBoost's strict `x < t`), so float32 inputs route exactly.
+- int16:   inputs are quantized per feature (scale 1 for integer-valued columns,
+  so label codes and whole-number sliders stay lossless: T = ⌊t⌋ or ⌈t⌉ − 1),
+  leaf values share one int16 scale per model.
+"""
+import json
+import os
+
+import numpy as np
+
+
+FORMATS = ('float32', 'int16')
+INT16_MIN, INT16_MAX = -32768, 32767
+
+
+def compact_path(name, fmt):
+    return f'models/{name}.{fmt}.npz'
+
+
+# ── Flatten ────────────────────────────────────────────────────────────────────
+
+def _sklearn_trees(forest):
+    """Yield (feature, threshold, value, left, right) per tree, sklearn node order"""
+    for est in forest.estimators_:
+        t = est.tree_
+        yield t.feature, t.threshold, t.value[:, 0, 0], t.children_left, t.children_right
+
+
+def _xgb_trees(model, features):
+    """Same layout from the booster's JSON dump (yes = left, `x < condition`)"""
+    booster = model.get_booster()
+    names = booster.feature_names or features
+    code = {name: i for i, name in enumerate(names)}
+    try:
+        dumps = booster.get_dump(dump_format='json')[:model.best_iteration + 1]
+    except AttributeError:
+        dumps = booster.get_dump(dump_format='json')
+    for dump in dumps:
+        nodes = {}
+        stack = [json.loads(dump)]
+        while stack:
+            node = stack.pop()
+            nodes[node['nodeid']] = node
+            stack.extend(node.get('children', []))
+        size = max(nodes) + 1
+        feature = np.full(size, -2, dtype=np.int64)
+        threshold = np.zeros(size)
+        value = np.zeros(size)
+        left = np.full(size, -1, dtype=np.int64)
+        right = np.full(size, -1, dtype=np.int64)
+        for i, node in nodes.items():
+            if 'leaf' in node:
+                value[i] = node['leaf']
+            else:
+                split = node['split']
+                feature[i] = code[split] if split in code else int(split.lstrip('f'))
+                threshold[i] = node['split_condition']
+                left[i], right[i] = node['yes'], node['no']
+        yield feature, threshold, value, left, right
+
+
+def _flatten(trees, threshold_fn):
+    """Depth-first renumbering of every tree into shared arrays"""
+    feats, splits, rights, roots = [], [], [], []
+    offset = 0
+    for feature, threshold, value, left, right in trees:
+        order, stack = [], [0]
+        while stack:
+            i = stack.pop()
+            order.append(i)
+            if left[i] >= 0:
+                stack.extend((right[i], left[i]))    # left popped first → left = node + 1
+        order = np.asarray(order)
+        new_id = np.empty(len(feature), dtype=np.int64)
+        new_id[order] = np.arange(len(order)) + offset
+        is_split = left[order] >= 0
+
+        feats.append(np.where(is_split, feature[order], -1))
+        splits.append(np.where(is_split, threshold_fn(threshold[order], feature[order]), value[order]))
+        rights.append(np.where(is_split, new_id[np.maximum(right[order], 0)], -1))
+        roots.append(offset)
+        offset += len(order)
+    return (np.concatenate(feats), np.concatenate(splits), np.concatenate(rights),
+            np.asarray(roots, dtype=np.int32))
+
+
+# ── Threshold normalisation (→ go left iff x ≤ T) ──────────────────────────────
+
+def _le_float32(t, strict):
+    """Largest float32 T with (x ≤ T) == (x ≤ t) — or (x < t) when strict — for float32 x"""
+    t32 = t.astype(np.float32)
+    if strict:
+        return np.nextafter(t32, np.float32(-np.inf))
+    return np.where(t32 > t, np.nextafter(t32, np.float32(-np.inf)), t32)
+
+
+def feature_quantizer(X):
+    """Per-feature (offset, scale): (0, 1) for integer-valued columns that fit in int16"""
+    X = np.asarray(X, dtype=np.float64)
+    lo, hi = X.min(axis=0), X.max(axis=0)
+    integer = (X == np.round(X)).all(axis=0) & (lo >= INT16_MIN) & (hi <= INT16_MAX)
+    offset = np.where(integer, 0.0, lo)
+    scale = np.where(integer, 1.0, np.maximum(hi - lo, 1e-12) / (INT16_MAX - INT16_MIN))
+    offset = np.where(integer, offset, offset - INT16_MIN * scale)    # map lo → INT16_MIN
+    return offset, scale, integer
+
+
+def _quantize(x, offset, scale):
+    return np.clip(np.floor((x - offset) / scale), INT16_MIN, INT16_MAX)
+
+
+def _le_int16(t, feature, offset, scale, strict):
+    f = np.maximum(feature, 0)
+    q = (t - offset[f]) / scale[f]
+    # x < t on integers  ⇔  x ≤ ⌈t⌉ − 1;   x ≤ t  ⇔  x ≤ ⌊t⌋
+    T = np.ceil(q) - 1 if strict else np.floor(q)
+    return np.clip(T, INT16_MIN, INT16_MAX)
+
+
+# ── Model ──────────────────────────────────────────────────────────────────────
+
+class CompactForest:
+    """predict(X) over flat arrays — mean of trees (RF) or base + sum (XGBoost)"""
+
+    def __init__(self, kind, fmt, features, feature, split, right, roots,
+                 leaf_scale=1.0, base=0.0, offset=None, scale=None):
+        self.kind, self.fmt = kind, fmt
+        self.features = list(features)
+        self.feature, self.split, self.right, self.roots = feature, split, right, roots
+        self.leaf_scale, self.base = float(leaf_scale), float(base)
+        self.offset, self.scale = offset, scale
+
+    @classmethod
+    def from_model(cls, model, kind, fmt, features, X_reference):
+        strict = kind == 'xgb'
+        trees = list(_sklearn_trees(model) if kind == 'rf' else _xgb_trees(model, features))
+        offset = scale = None
+        if fmt == 'float32':
+            threshold_fn = lambda t, f: _le_float32(t, strict)
+        else:
+            offset, scale, _ = feature_quantizer(X_reference)
+            threshold_fn = lambda t, f: _le_int16(t, f, offset, scale, strict)
+        feature, split, right, roots = _flatten(trees, threshold_fn)
+
+        leaf = feature < 0
+        leaf_scale = 1.0
+        if fmt == 'int16':
+            leaf_scale = max(np.abs(split[leaf]).max() / INT16_MAX, 1e-12)
+            split = np.where(leaf, np.round(split / leaf_scale), split)
+        forest = cls(kind, fmt, features, feature.astype(np.int8),
+                     split.astype(np.float32 if fmt == 'float32' else np.int16),
+                     right.astype(np.int32), roots, leaf_scale, 0.0,
+                     None if offset is None else offset.astype(np.float64),
+                     None if scale is None else scale.astype(np.float64))
+        if kind == 'xgb':
+            # base_score isn't in the dump: recover it as the mean prediction − leaf sum
+            sample = X_reference[:2048]
+            forest.base = float(np.mean(model.predict(sample) - forest.predict(sample)))
+        return forest
+
+    def _inputs(self, X):
+        if hasattr(X, 'columns'):
+            X = X[self.features]
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        if self.fmt == 'float32':
+            return X.astype(np.float32)
+        return _quantize(X, self.offset, self.scale).astype(np.int32)
+
+    def _leaves(self, Xq):
+        """Leaf node per (row, tree) — only still-descending pairs are touched each level"""
+        n, n_trees = len(Xq), len(self.roots)
+        node = np.tile(self.roots.astype(np.int64), n)
+        rows = np.repeat(np.arange(n), n_trees)
+        active = np.arange(node.size)
+        while active.size:
+            nd = node[active]
+            f = self.feature[nd]
+            inner = f >= 0
+            active, nd, f = active[inner], nd[inner], f[inner]
+            go_left = Xq[rows[active], f] <= self.split[nd]
+            node[active] = np.where(go_left, nd + 1, self.right[nd])
+        return node.reshape(n, n_trees)
+
+    def predict(self, X, chunk_size=4096):
+        Xq = self._inputs(X)
+        out = np.empty(len(Xq), dtype=np.float64)
+        for start in range(0, len(Xq), chunk_size):
+            leaves = self.split[self._leaves(Xq[start:start + chunk_size])].astype(np.float64)
+            leaves *= self.leaf_scale
+            total = leaves.mean(axis=1) if self.kind == 'rf' else leaves.sum(axis=1) + self.base
+            out[start:start + chunk_size] = total
+        return out
+
+    @property
+    def nbytes(self):
+        arrays = [self.feature, self.split, self.right, self.roots, self.offset, self.scale]
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    def save(self, path):
+        extra = {} if self.offset is None else {'offset': self.offset, 'scale': self.scale}
+        np.savez(path, kind=self.kind, fmt=self.fmt, features=np.asarray(self.features),
+                 feature=self.feature, split=self.split, right=self.right, roots=self.roots,
+                 leaf_scale=self.leaf_scale, base=self.base, **extra)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as d:
+            return cls(str(d['kind']), str(d['fmt']), d['features'].tolist(),
+                       d['feature'], d['split'], d['right'], d['roots'],
+                       float(d['leaf_scale']), float(d['base']),
+                       d['offset'] if 'offset' in d else None, d['scale'] if 'scale' in d else None)
+
+
+def sklearn_nbytes(forest):
+    """In-memory node + value arrays of a fitted sklearn forest"""
+    return sum(e.tree_.__getstate__()['nodes'].nbytes + e.tree_.value.nbytes for e in forest.estimators_)
+
+
+def export_compact(models, features, X_reference, formats=FORMATS):
+    """{(name, fmt): CompactForest} for models = {'random_forest': rf, 'xgboost': xgb}, saved to models/"""
+    out = {}
+    for name, model in models.items():
+        kind = 'rf' if hasattr(model, 'estimators_') else 'xgb'
+        for fmt in formats:
+            forest = CompactForest.from_model(model, kind, fmt, features, X_reference)
+            forest.save(compact_path(name, fmt))
+            out[name, fmt] = forest
+    return out
+
+
+def load_compact(name, fmt):
+    path = compact_path(name, fmt)
+    return CompactForest.load(path) if os.path.exists(path) else None
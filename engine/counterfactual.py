@@ -0,0 +1,254 @@
+"""
+Counterfactual recommendations — rank candidate actions by predicted savings
+Each action rewrites the user's encoded inputs (e.g. petrol → electric, -30% km).
+All applicable counterfactuals are stacked with the baseline and scored in ONE
+batched ensemble predict, so ranking reflects this user rather than a cluster.
+"""
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from engine.features import ENCODE_MAP, rows_to_frame, with_interactions
+from engine.scoring import predict_ensemble
+
+
+Action = namedtuple('Action', 'id group icon title desc applies apply')
+
+T, V, D, A = (ENCODE_MAP[c] for c in
+              ('transport', 'vehicle_type', 'diet', 'frequency_of_traveling_by_air'))
+
+# Flying levels ordered from lowest to highest intensity (label codes are alphabetical)
+AIR_ORDER = [A['never'], A['rarely'], A['frequently'], A['very frequently']]
+# Diets ordered from lowest to highest footprint
+DIET_ORDER = [D['vegan'], D['vegetarian'], D['pescatarian'], D['omnivore']]
+# Bag sizes ordered from smallest to largest
+BAG_ORDER = [3, 2, 1, 0]
+
+
+def _drives(x):
+    return x['transport'] == T['private'] and x['vehicle_type'] != V['none']
+
+
+def _scale(col, factor, floor=0):
+    return lambda x: {**x, col: max(floor, int(round(x[col] * factor)))}
+
+
+def _scale_hours(col, hours):
+    return lambda x: {**x, col: max(0, x[col] - hours)}
+
+
+def _step_down(col, order, steps=1):
+    def apply(x):
+        pos = order.index(x[col]) if x[col] in order else len(order) - 1
+        return {**x, col: order[max(0, pos - steps)]}
+    return apply
+
+
+def _set(**values):
+    return lambda x: {**x, **values}
+
+
+def _build_actions():
+    actions = [
+        # ── Vehicle ─────────────────────────────────────────────────────────
+        Action('ev', 'vehicle', '🔌', "Switch to an electric vehicle",
+               "Replace your current car with an EV and keep driving the same distance.",
+               lambda x: _drives(x) and x['vehicle_type'] != V['electric'], _set(vehicle_type=V['electric'])),
+        Action('hybrid', 'vehicle', '🚙', "Switch to a hybrid vehicle",
+               "A hybrid keeps your range while cutting fuel burned per km.",
+               lambda x: _drives(x) and x['vehicle_type'] not in (V['electric'], V['hybrid']),
+               _set(vehicle_type=V['hybrid'])),
+        Action('lpg', 'vehicle', '⛽', "Convert the car to LPG",
+               "LPG conversion lowers tailpipe CO₂ for petrol and diesel cars.",
+               lambda x: _drives(x) and x['vehicle_type'] in (V['petrol'], V['diesel']), _set(vehicle_type=V['lpg'])),
+        # ── Travel mode ─────────────────────────────────────────────────────
+        Action('public', 'mode', '🚆', "Commute by public transport",
+               "Leave the car at home and cover the same distance by bus, tram or train.",
+               lambda x: x['transport'] != T['public'], _set(transport=T['public'], vehicle_type=V['none'])),
+        Action('cycle', 'mode', '🚲', "Walk or cycle for daily trips",
+               "Active travel for short trips — most of the distance disappears along with the engine.",
+               lambda x: x['transport'] != T['walk/bicycle'],
+               lambda x: {**x, 'transport': T['walk/bicycle'], 'vehicle_type': V['none'],
+                          'vehicle_monthly_distance_km': int(x['vehicle_monthly_distance_km'] * 0.3)}),
+    ]
+    for pct in (10, 20, 30, 50):
+        actions.append(Action(
+            f'distance_{pct}', 'distance', '🚗', f"Drive {pct}% fewer km",
+            "Carpool, combine errands or work from home to cut monthly distance.",
+            lambda x: x['vehicle_monthly_distance_km'] > 0,
+            _scale('vehicle_monthly_distance_km', 1 - pct / 100)))
+    actions += [
+        # ── Flights ─────────────────────────────────────────────────────────
+        Action('fly_less', 'air', '✈️', "Take one fewer flight tier",
+               "Swap some flights for rail or video calls — one step down in how often you fly.",
+               lambda x: x['frequency_of_traveling_by_air'] != A['never'],
+               _step_down('frequency_of_traveling_by_air', AIR_ORDER)),
+        Action('fly_rarely', 'air', '🛬', "Fly only rarely",
+               "Keep flying for the trips that matter and drop the rest.",
+               lambda x: AIR_ORDER.index(x['frequency_of_traveling_by_air']) > 1,
+               _set(frequency_of_traveling_by_air=A['rarely'])),
+        Action('fly_never', 'air', '🚄', "Stop flying",
+               "Travel overland only — often the single biggest personal cut.",
+               lambda x: x['frequency_of_traveling_by_air'] != A['never'],
+               _set(frequency_of_traveling_by_air=A['never'])),
+        # ── Diet ────────────────────────────────────────────────────────────
+        Action('pescatarian', 'diet', '🐟', "Switch to a pescatarian diet",
+               "Drop red meat and poultry, keep fish.",
+               lambda x: DIET_ORDER.index(x['diet']) > DIET_ORDER.index(D['pescatarian']),
+               _set(diet=D['pescatarian'])),
+        Action('vegetarian', 'diet', '🥗', "Go vegetarian",
+               "Plant-forward meals with dairy and eggs.",
+               lambda x: DIET_ORDER.index(x['diet']) > DIET_ORDER.index(D['vegetarian']),
+               _set(diet=D['vegetarian'])),
+        Action('vegan', 'diet', '🌱', "Go vegan",
+               "Fully plant-based — the lowest-footprint diet.",
+               lambda x: x['diet'] != D['vegan'], _set(diet=D['vegan'])),
+        # ── Home energy ─────────────────────────────────────────────────────
+        Action('heat_electric', 'heating', '⚡', "Heat with electricity (heat pump)",
+               "Move off combustion heating onto electricity.",
+               lambda x: x['heating_energy_source'] != ENCODE_MAP['heating_energy_source']['electricity'],
+               _set(heating_energy_source=ENCODE_MAP['heating_energy_source']['electricity'])),
+        Action('heat_gas', 'heating', '🔥', "Switch heating to natural gas",
+               "Gas burns cleaner than coal or wood.",
+               lambda x: x['heating_energy_source'] in (ENCODE_MAP['heating_energy_source']['coal'],
+                                                        ENCODE_MAP['heating_energy_source']['wood']),
+               _set(heating_energy_source=ENCODE_MAP['heating_energy_source']['natural gas'])),
+        Action('efficient', 'efficiency', '💡', "Use energy-efficient appliances",
+               "LED lighting, A-rated appliances and smart power strips.",
+               lambda x: x['energy_efficiency'] != ENCODE_MAP['energy_efficiency']['Yes'],
+               _set(energy_efficiency=ENCODE_MAP['energy_efficiency']['Yes'])),
+        Action('shower_daily', 'shower', '🚿', "Shower once a day",
+               "Less hot water means less heating energy.",
+               lambda x: x['how_often_shower'] in (ENCODE_MAP['how_often_shower']['more frequently'],
+                                                   ENCODE_MAP['how_often_shower']['twice a day']),
+               _set(how_often_shower=ENCODE_MAP['how_often_shower']['daily'])),
+        Action('screens', 'screens', '📺', "Cut 2 h of TV / PC time a day",
+               "Fewer screen hours, lower electricity use.",
+               lambda x: x['how_long_tv_pc_daily_hour'] > 0, _scale_hours('how_long_tv_pc_daily_hour', 2)),
+        Action('internet', 'internet', '🌐', "Cut 2 h of internet time a day",
+               "Streaming and browsing draw on data-centre energy.",
+               lambda x: x['how_long_internet_daily_hour'] > 0, _scale_hours('how_long_internet_daily_hour', 2)),
+        # ── Consumption ─────────────────────────────────────────────────────
+        Action('bag_smaller', 'waste_size', '🗑️', "Use a smaller waste bag",
+               "Recycle and compost so a smaller bag is enough.",
+               lambda x: x['waste_bag_size'] != BAG_ORDER[0], _step_down('waste_bag_size', BAG_ORDER)),
+        Action('bags_fewer', 'waste_count', '♻️', "Put out one fewer bag a week",
+               "Recycling and composting shrink what goes to landfill.",
+               lambda x: x['waste_bag_weekly_count'] > 1,
+               lambda x: {**x, 'waste_bag_weekly_count': x['waste_bag_weekly_count'] - 1}),
+        Action('bags_half', 'waste_count', '🧺', "Halve your weekly waste",
+               "Zero-waste shopping and composting halve landfill bags.",
+               lambda x: x['waste_bag_weekly_count'] > 1, _scale('waste_bag_weekly_count', 0.5, floor=1)),
+        Action('grocery_10', 'grocery', '🛒', "Trim the grocery bill by 10%",
+               "Plan meals and waste less food.",
+               lambda x: x['monthly_grocery_bill'] > 50, _scale('monthly_grocery_bill', 0.9, floor=50)),
+        Action('grocery_20', 'grocery', '🥕', "Trim the grocery bill by 20%",
+               "Buy seasonal and local, and cut food waste.",
+               lambda x: x['monthly_grocery_bill'] > 50, _scale('monthly_grocery_bill', 0.8, floor=50)),
+    ]
+    for pct in (25, 50, 75):
+        actions.append(Action(
+            f'clothes_{pct}', 'clothes', '👕', f"Buy {pct}% fewer new clothes",
+            "Buy secondhand, repair and keep clothes longer.",
+            lambda x: x['how_many_new_clothes_monthly'] > 0,
+            _scale('how_many_new_clothes_monthly', 1 - pct / 100)))
+    return actions
+
+
+ACTIONS = _build_actions()
+ACTIONS_BY_ID = {a.id: a for a in ACTIONS}
+
+
+def impact_label(saving):
+    """Badge text + colour for a predicted saving (kg CO₂/year)"""
+    if saving >= 800:
+        return "Critical Impact", "#f87171"
+    if saving >= 400:
+        return "High Impact", "#fbbf24"
+    if saving >= 150:
+        return "Medium Impact", "#a3e635"
+    return "Low Impact", "#2dd4bf"
+
+
+def candidate_rows(inputs, features, actions=ACTIONS):
+    """Baseline row + one row per applicable action that changes the model input"""
+    base = with_interactions(inputs)
+    base_key = tuple(base[f] for f in features)
+    rows, chosen, seen = [base], [], {base_key}
+    for action in actions:
+        if not action.applies(base):
+            continue
+        row = with_interactions(action.apply(base))
+        key = tuple(row[f] for f in features)
+        if key in seen:
+            continue
+        seen.add(key)
+        rows.append(row)
+        chosen.append(action)
+    return rows, chosen
+
+
+def _ranked(preds, chosen):
+    """Baseline prediction + its counterfactuals' predictions → (baseline, ranked list)"""
+    baseline = float(preds[0])
+    savings = baseline - preds[1:]
+
+    ranked = []
+    for i in np.argsort(-savings):
+        ranked.append({
+            'action': chosen[i],
+            'predicted': float(preds[i + 1]),
+            'saving': float(savings[i]),
+            'saving_pct': float(savings[i] / baseline * 100) if baseline else 0.0,
+        })
+    return baseline, ranked
+
+
+def rank_actions(models, inputs, features, actions=ACTIONS):
+    """Score every counterfactual in one batch → (baseline, ranked list, stats)"""
+    t0 = time.perf_counter()
+    rows, chosen = candidate_rows(inputs, features, actions)
+    baseline, ranked = _ranked(predict_ensemble(models, rows_to_frame(rows, features)), chosen)
+    stats = {'candidates': len(chosen), 'ms': (time.perf_counter() - t0) * 1000}
+    return baseline, ranked, stats
+
+
+def rank_actions_batch(models, inputs_list, features, actions=ACTIONS):
+    """rank_actions for many users — every user's counterfactuals in ONE batched predict
+
+    → [(baseline, ranked list)] in input order.
+    """
+    rows, chosen, bounds = [], [], [0]
+    for inputs in inputs_list:
+        user_rows, user_chosen = candidate_rows(inputs, features, actions)
+        rows.extend(user_rows)
+        chosen.append(user_chosen)
+        bounds.append(len(rows))
+    preds = predict_ensemble(models, rows_to_frame(rows, features))
+    return [_ranked(preds[a:b], c) for a, b, c in zip(bounds, bounds[1:], chosen)]
+
+
+def combine(inputs, actions):
+    """Apply several actions in order (later actions see earlier changes)"""
+    x = with_interactions(inputs)
+    for action in actions:
+        if action.applies(x):
+            x = with_interactions(action.apply(x))
+    return x
+
+
+def best_per_group(ranked, limit=5):
+    """Top positive action from each group — a non-conflicting combined plan"""
+    plan, groups = [], set()
+    for r in ranked:
+        if r['saving'] <= 0 or r['action'].group in groups:
+            continue
+        # travel-mode switches already remove the car, so skip vehicle swaps alongside them
+        if {r['action'].group, *groups} >= {'vehicle', 'mode'}:
+            continue
+        plan.append(r)
+        groups.add(r['action'].group)
+        if len(plan) == limit:
+            break
+    return plan
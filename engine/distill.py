@@ -0,0 +1,114 @@
+"""
+Distillation — fit a compact student to the RF + XGBoost ensemble's predictions
+Candidates run from tiny (shallow tree on the top features) to moderate
+(a few dozen boosted rounds). The smallest student whose validation accuracy
+stays inside the loss budget is chosen, refitted on all of train and can be served
+instead of the ensemble; only that refit is measured on the test split.
+"""
+import pickle
+import time
+
+import numpy as np
+
+
+STUDENT_PATH = 'models/student.pkl'
+STUDENT_INFO_PATH = 'models/student.json'
+
+
+class Student:
+    """A small model plus the feature subset it was trained on"""
+
+    def __init__(self, name, model, features):
+        self.name = name
+        self.model = model
+        self.features = list(features)
+
+    def predict(self, X):
+        if hasattr(X, 'columns'):
+            X = X[self.features]
+        return self.model.predict(X)
+
+
+def candidates(ranked_features):
+    """(name, estimator factory, feature subset) — roughly in increasing size"""
+    import xgboost as xgb     # training-only; the app just unpickles the chosen student
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.tree import DecisionTreeRegressor
+
+    top3, top6, top10 = ranked_features[:3], ranked_features[:6], ranked_features[:10]
+    return [
+        ("Tree d6 · top-3", lambda: DecisionTreeRegressor(max_depth=6, random_state=42), top3),
+        ("Tree d8 · top-6", lambda: DecisionTreeRegressor(max_depth=8, min_samples_leaf=5, random_state=42), top6),
+        ("XGB 30×d4 · top-6", lambda: xgb.XGBRegressor(n_estimators=30, max_depth=4, learning_rate=0.2,
+                                                       random_state=42, verbosity=0), top6),
+        ("XGB 40×d5 · top-10", lambda: xgb.XGBRegressor(n_estimators=40, max_depth=5, learning_rate=0.2,
+                                                        random_state=42, verbosity=0), top10),
+        ("RF 20×d10 · top-10", lambda: RandomForestRegressor(n_estimators=20, max_depth=10, min_samples_leaf=3,
+                                                             n_jobs=-1, random_state=42), top10),
+        ("XGB 60×d6 · all", lambda: xgb.XGBRegressor(n_estimators=60, max_depth=6, learning_rate=0.15,
+                                                     random_state=42, verbosity=0), list(ranked_features)),
+    ]
+
+
+def model_bytes(model):
+    return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def predict_latency(predict, X, repeat=20):
+    """Best-of single-row latency (µs) and per-row batch latency (µs)"""
+    row = X.iloc[[0]]
+    single = min(_timed(lambda: predict(row)) for _ in range(repeat))
+    batch = min(_timed(lambda: predict(X)) for _ in range(3))
+    return single * 1e6, batch / len(X) * 1e6
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def accuracy(y, pred):
+    from sklearn.metrics import mean_squared_error, r2_score
+    return {'r2': r2_score(y, pred), 'rmse': float(np.sqrt(mean_squared_error(y, pred)))}
+
+
+def measure(student, X, y):
+    """Accuracy, size and latency of a fitted student on (X, y)"""
+    single_us, batch_us = predict_latency(student.predict, X)
+    return {**accuracy(y, student.predict(X)), 'bytes': model_bytes(student.model),
+            'single_us': single_us, 'batch_us_per_row': batch_us}
+
+
+def refit(student, X_train, teacher_train):
+    """The same configuration retrained on all of train — selection only fitted the fit slice"""
+    from sklearn.base import clone
+    return Student(student.name, clone(student.model).fit(X_train[student.features], teacher_train),
+                   student.features)
+
+
+def distill(teacher_train, X_train, X_val, y_val, teacher_val, ranked_features,
+            r2_budget=0.02, rmse_budget=None):
+    """Fit every candidate to the teacher's train predictions, judge them on a validation set
+    → (chosen Student | None, report, teacher validation metrics)
+
+    Keep X_val out of the test split: the budget check is a selection step.
+    """
+    teacher = accuracy(y_val, teacher_val)
+    report = []
+    for name, make, feats in candidates(ranked_features):
+        model = make()
+        t0 = time.perf_counter()
+        model.fit(X_train[feats], teacher_train)
+        fit_s = time.perf_counter() - t0
+        student = Student(name, model, feats)
+
+        m = measure(student, X_val, y_val)
+        within = bool((r2_budget is None or teacher['r2'] - m['r2'] <= r2_budget) and
+                      (rmse_budget is None or m['rmse'] - teacher['rmse'] <= rmse_budget))
+        report.append({'name': name, 'student': student, 'n_features': len(feats), 'fit_s': fit_s, **m,
+                       'r2_loss': teacher['r2'] - m['r2'], 'within_budget': within})
+
+    fits = [r for r in report if r['within_budget']]
+    chosen = min(fits, key=lambda r: r['bytes'])['student'] if fits else None
+    return chosen, report, teacher
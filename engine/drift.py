@@ -0,0 +1,286 @@
+"""
+Drift — streaming comparison of live inputs against the training distribution
+train_models.py bins every raw input column (and the holdout predictions) into
+a fixed histogram: one bin per category code, or training-quantile edges plus
+under/over-range bins for numeric columns, saved to models/drift_reference.json.
+The monitor drops each scored request — the AI Prediction page once per input
+set, Organization uploads in bulk via observe_many — into the same bins (a dict
+lookup or a bisect over ≤ 12 edges per feature) and compares a sliding window of
+the last WINDOW–2×WINDOW requests with the reference:
+
+- psi   population stability index, scored above its sampling-noise floor
+        ((bins − 1)(1/n + 1/m)), so a small window doesn't read as drift
+- ks    largest gap between the binned CDFs (numeric columns), significant
+        above 1.63·√((n + m)/nm) — α ≈ 0.01
+
+Counts live in fixed-length lists (current window, previous window, lifetime),
+so memory is the same after ten requests or ten million.
+"""
+import bisect
+import json
+import math
+import os
+import threading
+
+import numpy as np
+
+from engine.features import DECODE_MAP, ENCODE_MAP
+from engine.metrics import gauge, inc
+from engine.validation import NUMERIC
+
+
+REFERENCE_PATH = 'models/drift_reference.json'
+PREDICTION = 'prediction'        # the served kg CO₂ / year, monitored like an input
+BINS = 10                        # quantile bins per numeric column (fewer when values repeat)
+
+WINDOW = 500                     # requests per window; statistics cover the last 1–2 windows
+MIN_SAMPLES = 200                # below this a feature reports 'warming up'
+CHECK_EVERY = 20                 # re-score (and publish gauges) every N observations per feature
+PSI_WATCH, PSI_ALERT = 0.10, 0.25
+KS_ALPHA_C = 1.63                # two-sample KS critical coefficient at α = 0.01
+KS_MIN = 0.10                    # ...and a gap this large, so a huge window can't alert on a trivial shift
+
+OK, WATCH, ALERT, WARMING = 'ok', 'watch', 'alert', 'warming up'
+
+
+# ─── REFERENCE ───────────────────────────────────────────────────────────────
+
+def numeric_edges(x, bins=BINS):
+    """Bin edges for one numeric column: training min, inner quantiles, just above the max
+
+    Values below the first edge or from the last one on fall in the out-of-range bins.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    x = x[~np.isnan(x)]
+    lo, hi = float(x.min()), float(x.max())
+    inner = np.unique(np.quantile(x, np.linspace(0, 1, bins + 1)[1:-1], method='lower'))
+    return [lo, *(float(e) for e in inner if lo < e <= hi), float(np.nextafter(hi, np.inf))]
+
+
+def fit_reference(df, predictions=None, columns=None):
+    """{'rows', 'features': {column: {'kind', 'codes' | 'edges', 'counts'}}} from the training rows"""
+    columns = columns or [*ENCODE_MAP, *NUMERIC]
+    features = {}
+    for col in columns:
+        if col not in df:
+            continue
+        x = df[col].to_numpy(dtype=np.float64)
+        if col in ENCODE_MAP:
+            codes = sorted(ENCODE_MAP[col].values())
+            counts = [int((x == c).sum()) for c in codes] + [int((~np.isin(x, codes)).sum())]
+            features[col] = {'kind': 'categorical', 'codes': codes, 'counts': counts}
+        else:
+            features[col] = _numeric(x)
+    if predictions is not None:
+        features[PREDICTION] = _numeric(np.asarray(predictions, dtype=np.float64))
+    return {'rows': len(df), 'features': features}
+
+
+def _numeric(x):
+    edges = numeric_edges(x)
+    idx = np.searchsorted(edges, x, side='right')
+    return {'kind': 'numeric', 'edges': edges, 'counts': np.bincount(idx, minlength=len(edges) + 1).tolist()}
+
+
+def save_reference(reference, path=REFERENCE_PATH):
+    with open(path, 'w') as f:
+        json.dump(reference, f)
+
+
+def load_reference(path=REFERENCE_PATH):
+    """Saved reference, or None before the first training run"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def bin_labels(name, spec):
+    """Readable bin names — category labels, or '< min', 'a – b', '> max' ranges"""
+    if spec['kind'] == 'categorical':
+        return [DECODE_MAP.get(name, {}).get(c, str(c)) for c in spec['codes']] + ['unknown']
+    e = spec['edges']
+    return ([f"< {e[0]:,g}"] + [f"{a:,g} – {b:,g}" for a, b in zip(e[:-2], e[1:-1])]
+            + [f"{e[-2]:,g} – {np.nextafter(e[-1], -np.inf):,g}", f"> {np.nextafter(e[-1], -np.inf):,g}"])
+
+
+# ─── STATISTICS ──────────────────────────────────────────────────────────────
+
+def psi(ref, live, floor=1e-4):
+    """Population stability index between two count vectors (proportions floored at `floor`)"""
+    m, n = sum(ref), sum(live)
+    total = 0.0
+    for a, b in zip(ref, live):
+        q, p = max(a / m, floor), max(b / n, floor)
+        total += (p - q) * math.log(p / q)
+    return total
+
+
+def ks_distance(ref, live):
+    """Largest gap between the two binned CDFs"""
+    m, n = sum(ref), sum(live)
+    ca = cb = gap = 0.0
+    for a, b in zip(ref, live):
+        ca += a / m
+        cb += b / n
+        gap = max(gap, abs(ca - cb))
+    return gap
+
+
+def assess(spec, live):
+    """Compare live counts with one feature's reference → stats dict with a status"""
+    ref = spec['counts']
+    n, m = sum(live), sum(ref)
+    out = {'n': n, 'psi': None, 'ks': None, 'status': WARMING}
+    if n < MIN_SAMPLES or not m:
+        return out
+    noise = (len(ref) - 1) * (1 / n + 1 / m)          # E[PSI] when nothing has changed
+    value = psi(ref, live)
+    out['psi'], out['noise'] = value, noise
+    status = ALERT if value >= PSI_ALERT + noise else WATCH if value >= PSI_WATCH + noise else OK
+    if spec['kind'] == 'numeric':
+        gap = ks_distance(ref, live)
+        out['ks'] = gap
+        if gap >= max(KS_MIN, KS_ALPHA_C * math.sqrt((n + m) / (n * m))):
+            status = ALERT
+    out['status'] = status
+    return out
+
+
+# ─── MONITOR ─────────────────────────────────────────────────────────────────
+
+class _Feature:
+    """Fixed-size counts for one feature — current and previous window plus lifetime"""
+
+    __slots__ = ('spec', 'lookup', 'edges', 'current', 'previous', 'lifetime', 'seen', 'status', 'stats')
+
+    def __init__(self, spec):
+        size = len(spec['counts'])
+        self.spec = spec
+        self.lookup = {float(c): i for i, c in enumerate(spec['codes'])} if spec['kind'] == 'categorical' else None
+        self.edges = spec.get('edges')
+        self.current, self.previous, self.lifetime = [0] * size, [0] * size, [0] * size
+        self.seen = 0
+        self.status = WARMING
+        self.stats = assess(spec, self.previous)
+
+    def bin(self, value):
+        if self.lookup is not None:
+            return self.lookup.get(value, len(self.lookup))
+        return bisect.bisect_right(self.edges, value)
+
+    def bins(self, x):
+        """bin() over an array"""
+        if self.lookup is not None:
+            codes = np.asarray(self.spec['codes'], dtype=np.float64)
+            pos = np.minimum(np.searchsorted(codes, x), len(codes) - 1)
+            return np.where(codes[pos] == x, pos, len(codes))
+        return np.searchsorted(self.edges, x, side='right')
+
+    def window(self):
+        return [a + b for a, b in zip(self.current, self.previous)]
+
+
+class DriftMonitor:
+    """Live histograms for every feature in a reference, scored against it as requests arrive"""
+
+    def __init__(self, reference, window=WINDOW, check_every=CHECK_EVERY, publish=True):
+        self.reference = reference
+        self.window_size = window
+        self.check_every = check_every
+        self.publish = publish
+        self._features = {name: _Feature(spec) for name, spec in reference['features'].items()}
+        self._lock = threading.Lock()
+
+    @property
+    def features(self):
+        return list(self._features)
+
+    def observe(self, values):
+        """Count one request — {feature: value}; columns without a reference are ignored"""
+        rescore = []
+        with self._lock:
+            for name, value in values.items():
+                f = self._features.get(name)
+                if f is None or value is None:
+                    continue
+                value = float(value)
+                if value != value:              # NaN — validation rejects these upstream
+                    continue
+                i = f.bin(value)
+                f.current[i] += 1
+                f.lifetime[i] += 1
+                f.seen += 1
+                if f.seen % self.window_size == 0:
+                    f.previous, f.current = f.current, [0] * len(f.current)
+                if f.seen % self.check_every == 0:
+                    rescore.append((name, f, f.window()))
+        for name, f, live in rescore:           # a few dozen flops per feature, outside the lock
+            self._score(name, f, live)
+
+    def observe_many(self, values):
+        """Count a batch of requests — {feature: array}; same windows as calling observe() per row"""
+        rescore = []
+        with self._lock:
+            for name, x in values.items():
+                f = self._features.get(name)
+                if f is None:
+                    continue
+                x = np.asarray(x, dtype=np.float64)
+                idx = f.bins(x[~np.isnan(x)])
+                size = len(f.current)
+                f.lifetime = [a + int(b) for a, b in zip(f.lifetime, np.bincount(idx, minlength=size))]
+                start = 0
+                while start < len(idx):         # split at window boundaries so windows rotate as per row
+                    take = min(self.window_size - f.seen % self.window_size, len(idx) - start)
+                    counts = np.bincount(idx[start:start + take], minlength=size)
+                    f.current = [a + int(b) for a, b in zip(f.current, counts)]
+                    f.seen += take
+                    start += take
+                    if f.seen % self.window_size == 0:
+                        f.previous, f.current = f.current, [0] * size
+                if len(idx):
+                    rescore.append((name, f, f.window()))
+        for name, f, live in rescore:
+            self._score(name, f, live)
+
+    def _score(self, name, f, live):
+        stats = assess(f.spec, live)
+        entered = stats['status'] == ALERT and f.status != ALERT
+        f.stats, f.status = stats, stats['status']
+        if not self.publish:
+            return
+        if stats['psi'] is not None:
+            gauge('drift_psi', stats['psi'], feature=name)
+            gauge('drift_alert', int(stats['status'] == ALERT), feature=name)
+        if stats['ks'] is not None:
+            gauge('drift_ks', stats['ks'], feature=name)
+        gauge('drift_observations', stats['n'], feature=name)
+        if entered:
+            inc('drift_alerts_total', feature=name)
+
+    def refresh(self):
+        """Re-score every feature now (e.g. before showing a report)"""
+        with self._lock:
+            pending = [(name, f, f.window()) for name, f in self._features.items()]
+        for name, f, live in pending:
+            self._score(name, f, live)
+
+    def report(self):
+        """[{feature, kind, n, seen, psi, ks, status}] — the last scores, alerts first"""
+        order = {ALERT: 0, WATCH: 1, OK: 2, WARMING: 3}
+        with self._lock:
+            rows = [{'feature': name, 'kind': f.spec['kind'], 'seen': f.seen, **f.stats}
+                    for name, f in self._features.items()]
+        return sorted(rows, key=lambda r: (order[r['status']], -(r['psi'] or 0)))
+
+    def histogram(self, name):
+        """(bin labels, reference proportions, window proportions, lifetime proportions)"""
+        f = self._features[name]
+        with self._lock:
+            live, lifetime = f.window(), list(f.lifetime)
+
+        def share(counts):
+            total = sum(counts)
+            return [c / total if total else 0.0 for c in counts]
+        return bin_labels(name, f.spec), share(f.spec['counts']), share(live), share(lifetime)
@@ -0,0 +1,110 @@
+"""
+Explanations — permutation importance of the served blend and precomputed tree-path contributions
+Training ranks features by how much shuffling each one costs the 0.6·RF + 0.4·XGB
+blend on the holdout (engine.selection.permutation_ranking over its Blend). It also
+computes, per row, how much each feature moved the Random Forest's prediction
+along its decision paths (Saabas: prediction = bias + Σ contributions), then
+averages those per cluster and per cohort (cluster × transport × air travel).
+Serving only looks up the user's cohort row in a small float32 array.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# scipy is imported inside the training-time functions: serving only needs
+# Explainer, and the app shouldn't pay for it at startup
+
+
+EXPLAIN_PATH = 'models/explanations.npz'
+PERMUTATION_PATH = 'models/permutation_importance.csv'
+
+COHORT_COLUMNS = ['transport', 'frequency_of_traveling_by_air']
+MIN_COHORT = 30
+
+
+# ── Tree-path contributions ────────────────────────────────────────────────────
+
+def _delta_matrix(forest, n_features):
+    """(total nodes × F) sparse: value[node] − value[parent], in the parent's split feature column"""
+    from scipy import sparse
+    rows, cols, vals = [], [], []
+    offset = 0
+    for est in forest.estimators_:
+        tree = est.tree_
+        value = tree.value[:, 0, 0]
+        left, right = tree.children_left, tree.children_right
+        internal = np.flatnonzero(left >= 0)
+        children = np.concatenate([left[internal], right[internal]])
+        parents = np.concatenate([internal, internal])
+        rows.append(offset + children)
+        cols.append(tree.feature[parents])
+        vals.append(value[children] - value[parents])
+        offset += tree.node_count
+    return sparse.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                             shape=(offset, n_features))
+
+
+def tree_contributions(forest, X, chunk_size=2000):
+    """(bias, n × F contributions) with bias + row sum == forest.predict(X)"""
+    deltas = _delta_matrix(forest, X.shape[1])
+    bias = float(np.mean([est.tree_.value[0, 0, 0] for est in forest.estimators_]))
+    out = np.empty(X.shape, dtype=np.float64)
+    for start in range(0, len(X), chunk_size):
+        indicator, _ = forest.decision_path(X.iloc[start:start + chunk_size])
+        out[start:start + chunk_size] = (indicator @ deltas).toarray()
+    return bias, out / len(forest.estimators_)
+
+
+def _group_means(contrib, inverse, n_groups):
+    sums = np.zeros((n_groups, contrib.shape[1]))
+    np.add.at(sums, inverse, contrib)
+    counts = np.bincount(inverse, minlength=n_groups)
+    return (sums / np.maximum(counts, 1)[:, None]).astype(np.float32), counts
+
+
+def build_explanations(bias, contrib, clusters, cohorts, features, path=EXPLAIN_PATH):
+    """Per-cluster and per-(cluster, *COHORT_COLUMNS) mean contributions → compressed npz"""
+    k = int(clusters.max()) + 1
+    cluster_contrib, cluster_counts = _group_means(contrib, clusters, k)
+    keys = np.column_stack([clusters, np.asarray(cohorts, dtype=np.int64)])
+    cohort_keys, inverse, _ = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    cohort_contrib, cohort_counts = _group_means(contrib, inverse.ravel(), len(cohort_keys))
+    np.savez_compressed(
+        path, features=np.asarray(features), cohort_columns=np.asarray(COHORT_COLUMNS),
+        bias=np.float64(bias),
+        cluster_contrib=cluster_contrib, cluster_counts=cluster_counts,
+        cohort_keys=cohort_keys.astype(np.int16), cohort_contrib=cohort_contrib,
+        cohort_counts=cohort_counts)
+    return len(cohort_keys)
+
+
+class Explainer:
+    """Lookup of precomputed contributions for a (cluster, cohort) — no model calls"""
+
+    def __init__(self, data):
+        self.features = data['features'].tolist()
+        self.cohort_columns = data['cohort_columns'].tolist()
+        self.bias = float(data['bias'])
+        self.cluster_contrib = data['cluster_contrib']
+        self.cluster_counts = data['cluster_counts']
+        self.cohort_contrib = data['cohort_contrib']
+        self.cohort_counts = data['cohort_counts']
+        self._cohorts = {tuple(int(v) for v in key): i for i, key in enumerate(data['cohort_keys'])}
+
+    @classmethod
+    def load(cls, path=EXPLAIN_PATH):
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return cls(data)
+
+    def explain(self, cluster, inputs, min_count=MIN_COHORT):
+        """(contribution Series, 'cohort' | 'cluster', profiles averaged)"""
+        key = (int(cluster), *(int(inputs[c]) for c in self.cohort_columns))
+        i = self._cohorts.get(key)
+        if i is not None and self.cohort_counts[i] >= min_count:
+            values, source, n = self.cohort_contrib[i], 'cohort', int(self.cohort_counts[i])
+        else:
+            values, source, n = self.cluster_contrib[cluster], 'cluster', int(self.cluster_counts[cluster])
+        return pd.Series(values, index=self.features), source, n
@@ -0,0 +1,44 @@
+"""
+Features — encoding maps and derived columns shared by every input path
+Values match data/label_encoders.json (LabelEncoder order from clean_data.py).
+"""
+import re
+
+import numpy as np
+
+
+ENCODE_MAP = {
+    'body_type': {'normal': 0, 'obese': 1, 'overweight': 2, 'underweight': 3},
+    'sex': {'female': 0, 'male': 1},
+    'diet': {'omnivore': 0, 'pescatarian': 1, 'vegan': 2, 'vegetarian': 3},
+    'how_often_shower': {'daily': 0, 'less frequently': 1, 'more frequently': 2, 'twice a day': 3},
+    'heating_energy_source': {'coal': 0, 'electricity': 1, 'natural gas': 2, 'wood': 3},
+    'transport': {'private': 0, 'public': 1, 'walk/bicycle': 2},
+    'vehicle_type': {'diesel': 0, 'electric': 1, 'hybrid': 2, 'lpg': 3, 'none': 4, 'petrol': 5},
+    'social_activity': {'never': 0, 'often': 1, 'sometimes': 2},
+    'frequency_of_traveling_by_air': {'frequently': 0, 'never': 1, 'rarely': 2, 'very frequently': 3},
+    'waste_bag_size': {'extra large': 0, 'large': 1, 'medium': 2, 'small': 3},
+    'energy_efficiency': {'No': 0, 'Sometimes': 1, 'Yes': 2},
+}
+
+DECODE_MAP = {col: {code: label for label, code in m.items()} for col, m in ENCODE_MAP.items()}
+
+
+def normalize_column(name):
+    """'Vehicle Monthly Distance Km' / 'Energy efficiency' → training column names"""
+    return re.sub(r'\W+', '_', str(name).strip().lower()).strip('_')
+
+
+def with_interactions(inputs):
+    """Copy of an encoded input dict with the two engineered columns recomputed"""
+    out = dict(inputs)
+    out['transport_distance_interaction'] = out['transport'] * out['vehicle_monthly_distance_km']
+    out['energy_efficiency_heating'] = out['energy_efficiency'] * out['heating_energy_source']
+    return out
+
+
+def rows_to_frame(rows, features):
+    """List of encoded input dicts → DataFrame in training column order"""
+    import pandas as pd       # deferred: the Calculator page only needs the maps
+    values = np.array([[row[f] for f in features] for row in rows], dtype=np.float64)
+    return pd.DataFrame(values, columns=features)
@@ -0,0 +1,66 @@
+"""
+Figure cache — bounded LRU of serialized Plotly figures shared across sessions
+Figures are keyed by a hash of everything that shapes them (inputs + theme), so
+users with the same profile bucket reuse each other's figure JSON.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def figure_key(name, *parts):
+    """Stable hash of a figure name and the inputs it is built from"""
+    blob = json.dumps([name, parts], sort_keys=True, default=float, separators=(',', ':'))
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+class FigureCache:
+    """Thread-safe LRU: key → figure JSON string, with hit/miss/eviction counters"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, key, build):
+        """Return the cached figure as a dict, calling `build()` (→ go.Figure) only on a miss"""
+        with self._lock:
+            fig_json = self._entries.get(key)
+            if fig_json is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(fig_json)
+
+        # Build outside the lock — two sessions racing on one key just both build
+        fig_json = build().to_json()
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = fig_json
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return json.loads(fig_json)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'bytes': sum(len(v) for v in self._entries.values()),
+            }
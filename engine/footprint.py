@@ -0,0 +1,48 @@
+"""
+Footprint — emission-factor breakdown by category, vectorised over users
+The rough per-category split behind the Analytics pie and radar: kg CO₂ / year
+from distance, flights, heating, diet, spending and screen time. Works on one
+encoded input dict or on whole columns, so the dashboard and the batch report
+generator share the same factors.
+"""
+import numpy as np
+
+
+CATEGORIES = ('Car Travel', 'Public Transport', 'Flights', 'Home Energy', 'Diet', 'Shopping', 'Electronics')
+
+CAR_KG_PER_KM = 0.21                  # average petrol car
+PUBLIC_TRANSPORT_KG = 300
+# kg / year by encoded answer (codes follow ENCODE_MAP)
+AIR_KG = {0: 510, 1: 0, 2: 255, 3: 1020}            # frequently, never, rarely, very frequently
+DIET_KG = {0: 1825, 1: 1095, 2: 365, 3: 730}         # omnivore, pescatarian, vegan, vegetarian
+HEATING_KG = {0: 1200, 1: 800, 2: 600, 3: 500}       # coal, electricity, natural gas, wood
+GROCERY_KG_PER_UNIT, CLOTHES_KG = 3, 25
+TV_KG_PER_HOUR, INTERNET_KG_PER_HOUR = 0.05 * 365, 0.03 * 365
+
+
+def _lookup(table, codes, default):
+    out = np.full(codes.shape, float(default))
+    for code, kg in table.items():
+        out[codes == code] = kg
+    return out
+
+
+def breakdown_arrays(values):
+    """{column: array} of encoded inputs → {category: kg array}"""
+    col = {k: np.asarray(v, dtype=np.float64) for k, v in values.items()}
+    transport = col['transport']
+    return {
+        'Car Travel': np.where(transport == 0, col['vehicle_monthly_distance_km'] * CAR_KG_PER_KM * 12, 0.0),
+        'Public Transport': np.where(transport == 1, float(PUBLIC_TRANSPORT_KG), 0.0),
+        'Flights': _lookup(AIR_KG, col['frequency_of_traveling_by_air'], 255),
+        'Home Energy': _lookup(HEATING_KG, col['heating_energy_source'], 800),
+        'Diet': _lookup(DIET_KG, col['diet'], 1095),
+        'Shopping': col['monthly_grocery_bill'] * GROCERY_KG_PER_UNIT + col['how_many_new_clothes_monthly'] * CLOTHES_KG,
+        'Electronics': col['how_long_tv_pc_daily_hour'] * TV_KG_PER_HOUR
+                       + col['how_long_internet_daily_hour'] * INTERNET_KG_PER_HOUR,
+    }
+
+
+def breakdown(inputs):
+    """One user's encoded inputs → {category: kg}"""
+    return {k: float(v[0]) for k, v in breakdown_arrays({c: [x] for c, x in inputs.items()}).items()}
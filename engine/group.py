@@ -0,0 +1,94 @@
+"""
+Group — household and team profiles scored as one batch
+A GroupProfile keeps every member's encoded answers as one float64 array
+(members × input columns). Scoring builds a single frame from it, so the whole
+group costs one predict per model and one cluster assignment — N members take
+about as long as one — and the breakdown and counterfactuals run on the same
+rows.
+"""
+import hashlib
+
+import numpy as np
+
+from engine.counterfactual import best_per_group, rank_actions_batch
+from engine.features import ENCODE_MAP
+from engine.footprint import CATEGORIES, breakdown_arrays
+from engine.scoring import assign_clusters, predict_models
+from engine.validation import DERIVED, NUMERIC
+
+
+COLUMNS = (*ENCODE_MAP, *NUMERIC)
+MAX_MEMBERS = 12
+
+
+class GroupProfile:
+    """Named members' encoded inputs as one (members × COLUMNS) array"""
+
+    def __init__(self, names=(), X=None):
+        self.names = list(names)
+        self.X = np.empty((0, len(COLUMNS))) if X is None else np.asarray(X, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name, inputs):
+        """Append one member from an encoded input dict (the Calculator's user_inputs)"""
+        if len(self) >= MAX_MEMBERS:
+            raise ValueError(f"A group holds at most {MAX_MEMBERS} members")
+        self.names.append(name)
+        self.X = np.vstack([self.X, [float(inputs[c]) for c in COLUMNS]])
+
+    def remove(self, i):
+        del self.names[i]
+        self.X = np.delete(self.X, i, axis=0)
+
+    def values(self):
+        """{column: array over members}, interaction columns included"""
+        out = {c: self.X[:, j] for j, c in enumerate(COLUMNS)}
+        for col, (a, b) in DERIVED.items():
+            out[col] = out[a] * out[b]
+        return out
+
+    def rows(self):
+        """One encoded input dict per member — what the per-person code paths take"""
+        values = self.values()
+        return [{c: float(v[i]) for c, v in values.items()} for i in range(len(self))]
+
+    def frame(self, features):
+        import pandas as pd
+        values = self.values()
+        return pd.DataFrame({f: values[f] for f in features}, columns=features)
+
+    def digest(self):
+        h = hashlib.sha1('\x1f'.join(self.names).encode())
+        h.update(self.X.tobytes())
+        return h.hexdigest()
+
+    def score(self, models):
+        """Predictions, clusters and breakdown for every member → per-member arrays + group totals"""
+        X = self.frame(models['features'])
+        kg = predict_models(models, X)['ensemble']
+        _, clusters = assign_clusters(models, X)
+        parts = breakdown_arrays(self.values())
+        return {
+            'names': list(self.names), 'kg': kg, 'clusters': clusters,
+            'breakdown': {c: parts[c] for c in CATEGORIES},
+            'total_kg': float(kg.sum()), 'mean_kg': float(kg.mean()),
+            'group_breakdown': {c: float(parts[c].sum()) for c in CATEGORIES},
+        }
+
+    def rank(self, models):
+        """Each member's counterfactuals (one predict for all) plus group-wide totals per action
+
+        A member counts towards only their best action per lever (best_per_group), so
+        alternatives like buying half vs a quarter of the clothes are never summed together.
+        → (per-member [(baseline, ranked)], [{'action', 'saving', 'members'}] largest first)
+        """
+        per_member = rank_actions_batch(models, self.rows(), models['features'])
+        totals = {}
+        for _, ranked in per_member:
+            for r in best_per_group(ranked, limit=None):
+                t = totals.setdefault(r['action'].id, {'action': r['action'], 'saving': 0.0, 'members': 0})
+                t['saving'] += r['saving']
+                t['members'] += 1
+        return per_member, sorted(totals.values(), key=lambda t: t['saving'], reverse=True)
@@ -0,0 +1,182 @@
+"""
+History store — persistent per-user footprint history (SQLite in WAL mode)
+Every prediction the user saves is appended with a timestamp, and
+monthly / yearly rollups are maintained incrementally in the same transaction,
+so trend charts read a handful of pre-aggregated rows instead of raw events.
+
+Sessions never wait on the SQLite write lock: `record()` only enqueues, and a
+single writer thread per process drains the queue in batched transactions.
+WAL lets readers run concurrently with that writer.
+"""
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from engine.metrics import inc
+
+
+log = logging.getLogger(__name__)
+
+HISTORY_PATH = os.environ.get('CARBON_HISTORY_PATH', 'data/history.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id       INTEGER PRIMARY KEY,
+    user_id  TEXT    NOT NULL,
+    ts       REAL    NOT NULL,
+    kind     TEXT    NOT NULL,
+    co2      REAL    NOT NULL,
+    cluster  TEXT,
+    inputs   TEXT
+);
+CREATE INDEX IF NOT EXISTS events_user_ts ON events(user_id, ts);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    user_id  TEXT    NOT NULL,
+    kind     TEXT    NOT NULL,
+    grain    TEXT    NOT NULL,
+    period   TEXT    NOT NULL,
+    n        INTEGER NOT NULL,
+    co2_sum  REAL    NOT NULL,
+    co2_min  REAL    NOT NULL,
+    co2_max  REAL    NOT NULL,
+    last_ts  REAL    NOT NULL,
+    co2_last REAL    NOT NULL,
+    PRIMARY KEY (user_id, kind, grain, period)
+) WITHOUT ROWID;
+"""
+
+UPSERT_ROLLUP = """
+INSERT INTO rollups (user_id, kind, grain, period, n, co2_sum, co2_min, co2_max, last_ts, co2_last)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (user_id, kind, grain, period) DO UPDATE SET
+    n        = n + excluded.n,
+    co2_sum  = co2_sum + excluded.co2_sum,
+    co2_min  = min(co2_min, excluded.co2_min),
+    co2_max  = max(co2_max, excluded.co2_max),
+    co2_last = CASE WHEN excluded.last_ts >= last_ts THEN excluded.co2_last ELSE co2_last END,
+    last_ts  = max(last_ts, excluded.last_ts)
+"""
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    conn.execute("PRAGMA cache_size=-65536")
+    return conn
+
+
+@lru_cache(maxsize=4096)
+def _day_periods(day):
+    d = datetime.fromtimestamp(day * 86400, tz=timezone.utc)
+    return f"{d.year:04d}-{d.month:02d}", f"{d.year:04d}"
+
+
+def _periods(ts):
+    """(month, year) period keys for a UTC timestamp — memoized per day"""
+    return _day_periods(int(ts // 86400))
+
+
+def _rollup_rows(events):
+    """Fold a batch of events into one upsert row per (user, kind, grain, period)"""
+    acc = {}
+    for user_id, ts, kind, co2, _, _ in events:
+        month, year = _periods(ts)
+        for grain, period in (('month', month), ('year', year)):
+            key = (user_id, kind, grain, period)
+            row = acc.get(key)
+            if row is None:
+                acc[key] = [1, co2, co2, co2, ts, co2]
+            else:
+                row[0] += 1
+                row[1] += co2
+                row[2] = min(row[2], co2)
+                row[3] = max(row[3], co2)
+                if ts >= row[4]:
+                    row[4], row[5] = ts, co2
+    return [key + tuple(vals) for key, vals in acc.items()]
+
+
+class HistoryStore:
+    """Append-only event log + incrementally maintained rollups"""
+
+    def __init__(self, path=HISTORY_PATH, batch_size=10000):
+        self.path = path
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self.dropped = 0                  # events lost to failed write batches
+        with _connect(path) as conn:
+            conn.executescript(SCHEMA)
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name='history-writer', daemon=True)
+        self._writer.start()
+
+    # ── writes ────────────────────────────────────────────────────────────────
+
+    def record(self, user_id, kind, co2, cluster=None, inputs=None, ts=None):
+        """Queue one event; returns immediately"""
+        ts = time.time() if ts is None else ts
+        payload = json.dumps(inputs, separators=(',', ':')) if inputs is not None else None
+        self._queue.put((user_id, ts, kind, float(co2), cluster, payload))
+
+    def flush(self):
+        """Block until every queued event is committed"""
+        self._queue.join()
+
+    def _write_loop(self):
+        conn = None
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                conn = conn or _connect(self.path)
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO events (user_id, ts, kind, co2, cluster, inputs) "
+                        "VALUES (?, ?, ?, ?, ?, ?)", batch)
+                    conn.executemany(UPSERT_ROLLUP, _rollup_rows(batch))
+            except Exception:
+                # Anything — a locked or corrupt file, a bad event — loses this batch,
+                # never the writer thread, so flush() keeps returning
+                self.dropped += len(batch)
+                inc('history_events_dropped_total', len(batch))
+                log.exception("history: dropped %d events", len(batch))
+                if conn is not None:
+                    conn.close()
+                    conn = None
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    # ── reads ─────────────────────────────────────────────────────────────────
+
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = _connect(self.path)
+        return conn
+
+    def trend(self, user_id, kind, grain='month', limit=12):
+        """Latest `limit` rollup rows for one user, oldest first"""
+        rows = self._reader().execute(
+            "SELECT period, n, co2_sum / n, co2_min, co2_max, co2_last FROM rollups "
+            "WHERE user_id = ? AND kind = ? AND grain = ? ORDER BY period DESC LIMIT ?",
+            (user_id, kind, grain, limit)).fetchall()
+        return [dict(zip(('period', 'n', 'mean', 'min', 'max', 'last'), r)) for r in reversed(rows)]
+
+    def count_events(self, user_id=None):
+        if user_id is None:
+            return self._reader().execute("SELECT count(*) FROM events").fetchone()[0]
+        return self._reader().execute(
+            "SELECT count(*) FROM events WHERE user_id = ?", (user_id,)).fetchone()[0]
@@ -0,0 +1,52 @@
+"""
+Manifest — one JSON record of how the artifacts in models/ were produced
+Training mode, row count, feature list, holdout metrics, hyperparameters and the
+CLI arguments of the last full run, so incremental updates and tuning can build
+on (and fall back to) it.
+
+The holdout is a hash split: a row is held out when the hash of its values falls
+in the first HOLDOUT_FRACTION of the range. Membership depends on the row alone,
+so appending batches never moves existing rows between train and holdout.
+"""
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+
+MANIFEST_PATH = 'models/manifest.json'
+HOLDOUT_FRACTION = 0.2
+HOLDOUT_SALT = 'carbon-holdout-1'         # pandas hash key, exactly 16 bytes
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Manifest dict, or {} when models were trained before it existed"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def update_manifest(path=MANIFEST_PATH, **sections):
+    """Merge top-level sections into the manifest and write it atomically"""
+    manifest = load_manifest(path)
+    manifest.update(sections)
+    manifest['updated'] = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, default=float)
+    os.replace(tmp, path)
+    return manifest
+
+
+def holdout_mask(df, fraction=HOLDOUT_FRACTION, salt=HOLDOUT_SALT):
+    """Boolean mask of held-out rows — a deterministic hash of every column's value"""
+    import pandas as pd
+    h = pd.util.hash_pandas_object(df.astype(np.float64), index=False, hash_key=salt)
+    return (h.to_numpy() % 10_000) < fraction * 10_000
+
+
+def holdout_spec(fraction=HOLDOUT_FRACTION, salt=HOLDOUT_SALT):
+    """How the holdout was drawn, for the manifest"""
+    return {'split': 'hash', 'fraction': fraction, 'salt': salt}
@@ -0,0 +1,237 @@
+"""
+Metrics — in-process counters, gauges and latency histograms, Prometheus text format
+One registry per server process, shared by every session. Updates are a bisect
+plus a short locked increment; reading renders the text exposition format,
+served on CARBON_METRICS_PORT (/metrics) and/or rewritten to CARBON_METRICS_FILE
+(node-exporter textfile style). CARBON_METRICS=0 turns `timed`, `inc` and `gauge` into no-ops.
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+ENABLED = os.environ.get('CARBON_METRICS', '1') != '0'
+PREFIX = 'carbon_'
+
+# seconds — finer than Prometheus' defaults at the low end for single-row predicts
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    'page_render_seconds': "Wall time of a page's show() per rerun",
+    'model_predict_seconds': "One batched predict call per model",
+    'model_predict_rows_total': "Rows scored per model",
+    'load_models_seconds': "Loading every model artifact (cache misses only)",
+    'figure_build_seconds': "Building a Plotly figure on a figure-cache miss",
+    'figure_requests_total': "Figures requested from the figure cache",
+    'calculator_encode_seconds': "Encoding the calculator's answers into model inputs",
+    'precompute_seconds': "One stage of a background precompute job",
+    'precompute_jobs_total': "Precompute requests by outcome (started, shared, cached, cancelled)",
+    'org_batch_seconds': "Streaming an organization upload through the models",
+    'org_rows_total': "Employee rows scored from organization uploads",
+    'history_events_dropped_total': "History events lost to a failed write batch",
+    'drift_psi': "Population stability index of live inputs vs the training reference",
+    'drift_ks': "Binned Kolmogorov–Smirnov distance of live inputs vs the training reference",
+    'drift_alert': "1 while a feature's drift is over threshold",
+    'drift_alerts_total': "Times a feature crossed into drift alert",
+    'drift_observations': "Live requests in the drift window",
+}
+
+
+class Registry:
+    """Thread-safe counters and fixed-bucket histograms keyed by (name, labels)"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}     # key → [count per bucket..., count over the last bucket, sum, min, max]
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            h = self._histograms.get(key)
+            if h is None:
+                h = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0, seconds, seconds]
+            h[i] += 1
+            h[-3] += seconds
+            if seconds < h[-2]:
+                h[-2] = seconds
+            elif seconds > h[-1]:
+                h[-1] = seconds
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def counters(self):
+        """[(name, labels dict, value)] sorted by name"""
+        with self._lock:
+            items = list(self._counters.items())
+        return [(name, dict(labels), value) for (name, labels), value in sorted(items)]
+
+    def gauges(self):
+        """[(name, labels dict, value)] sorted by name"""
+        with self._lock:
+            items = list(self._gauges.items())
+        return [(name, dict(labels), value) for (name, labels), value in sorted(items)]
+
+    def histograms(self):
+        """[(name, labels dict, summary)] — count, sum, mean, min, max and p50/p95/p99 from the buckets"""
+        with self._lock:
+            items = [(key, list(h)) for key, h in self._histograms.items()]
+        out = []
+        for (name, labels), h in sorted(items):
+            counts, (total, lo, hi) = h[:-3], h[-3:]
+            n = sum(counts)
+            summary = {'count': n, 'sum': total, 'mean': total / n if n else 0.0,
+                       'min': lo, 'max': hi, 'buckets': counts}
+            for q in (0.5, 0.95, 0.99):
+                # bucket interpolation can't know the extremes — clamp to what was observed
+                summary[f'p{int(q * 100)}'] = min(max(self._quantile(q, counts), lo), hi)
+            out.append((name, dict(labels), summary))
+        return out
+
+    def _quantile(self, q, counts):
+        """Linear interpolation inside the bucket holding the q-th observation (histogram_quantile)"""
+        n = sum(counts)
+        if not n:
+            return 0.0
+        rank, seen = q * n, 0
+        for i, c in enumerate(counts):
+            if seen + c >= rank and c:
+                lo = self.buckets[i - 1] if i else 0.0
+                hi = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lo + (hi - lo) * (rank - seen) / c
+            seen += c
+        return self.buckets[-1]
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines, typed = [], set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                short = name[len(PREFIX):]
+                if short in HELP:
+                    lines.append(f"# HELP {name} {HELP[short]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        def fmt(labels, **extra):
+            pairs = {**labels, **extra}
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{k}="{v}"' for k, v in pairs.items()) + '}'
+
+        for name, labels, value in self.counters():
+            header(PREFIX + name, 'counter')
+            lines.append(f"{PREFIX}{name}{fmt(labels)} {value}")
+        for name, labels, value in self.gauges():
+            header(PREFIX + name, 'gauge')
+            lines.append(f"{PREFIX}{name}{fmt(labels)} {value:.6g}")
+        for name, labels, s in self.histograms():
+            full = PREFIX + name
+            header(full, 'histogram')
+            cumulative = 0
+            for le, c in zip(self.buckets + ('+Inf',), s['buckets']):
+                cumulative += c
+                lines.append(f"{full}_bucket{fmt(labels, le=le)} {cumulative}")
+            lines.append(f"{full}_sum{fmt(labels)} {s['sum']:.6f}")
+            lines.append(f"{full}_count{fmt(labels)} {s['count']}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def inc(name, value=1, **labels):
+    if ENABLED:
+        REGISTRY.inc(name, value, **labels)
+
+
+def gauge(name, value, **labels):
+    if ENABLED:
+        REGISTRY.set(name, value, **labels)
+
+
+@contextmanager
+def timed(name, **labels):
+    """Observe the block's wall time (seconds) in histogram `name` — also when it raises"""
+    if not ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(name, time.perf_counter() - t0, **labels)
+
+
+# ── Exposition ─────────────────────────────────────────────────────────────────
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def write_textfile(path):
+    """Atomically replace `path` with the current exposition"""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        f.write(REGISTRY.render())
+    os.replace(tmp, path)
+
+
+_exporter_lock = threading.Lock()
+_exporters = {}
+
+
+def start_exporter(port=None, path=None, interval=15.0):
+    """Serve /metrics on `port` and/or rewrite `path` every `interval` s — started once per process
+
+    Defaults come from CARBON_METRICS_PORT / CARBON_METRICS_FILE; with neither set nothing starts.
+    """
+    port = port or os.environ.get('CARBON_METRICS_PORT')
+    path = path or os.environ.get('CARBON_METRICS_FILE')
+    with _exporter_lock:
+        if port and 'http' not in _exporters:
+            server = ThreadingHTTPServer(('127.0.0.1', int(port)), _Handler)
+            threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+            _exporters['http'] = server
+        if path and 'file' not in _exporters:
+            def loop():
+                while True:
+                    write_textfile(path)
+                    time.sleep(interval)
+            thread = threading.Thread(target=loop, name='metrics-file', daemon=True)
+            thread.start()
+            _exporters['file'] = thread
+    return _exporters
@@ -0,0 +1,96 @@
+"""
+Neighbours — "people like you" over the scaled profile space
+A KD-tree over the StandardScaler feature space is built at train time and
+saved together with the raw profiles. joblib memory-maps every array inside
+the pickle on load, so workers share the OS page cache instead of rebuilding
+or copying the index.
+"""
+import os
+
+import joblib
+import numpy as np
+
+from engine.features import DECODE_MAP
+
+
+NN_INDEX_PATH = 'models/nn_index.pkl'
+
+DERIVED = ('transport_distance_interaction', 'energy_efficiency_heating')
+
+NUMERIC_UNITS = {
+    'monthly_grocery_bill': '$/month groceries',
+    'vehicle_monthly_distance_km': 'km/month driven',
+    'waste_bag_weekly_count': 'waste bags/week',
+    'how_long_tv_pc_daily_hour': 'h/day TV & PC',
+    'how_many_new_clothes_monthly': 'new clothes/month',
+    'how_long_internet_daily_hour': 'h/day online',
+}
+
+
+def build_index(X_scaled, profiles, columns, path=NN_INDEX_PATH, leaf_size=40):
+    """Fit the KD-tree and persist it with the raw profile rows (float32)"""
+    from sklearn.neighbors import KDTree     # unpickling the saved index imports it on load
+    tree = KDTree(np.ascontiguousarray(X_scaled, dtype=np.float64), leaf_size=leaf_size)
+    joblib.dump({'tree': tree,
+                 'profiles': np.ascontiguousarray(profiles, dtype=np.float32),
+                 'columns': list(columns)}, path)
+    return tree
+
+
+def load_index(path=NN_INDEX_PATH):
+    """Memory-mapped index, or None when it hasn't been built"""
+    if not os.path.exists(path):
+        return None
+    return joblib.load(path, mmap_mode='r')
+
+
+def query(index, x_scaled, k=25):
+    """Indices and distances of the k nearest profiles for each row of x_scaled"""
+    dist, idx = index['tree'].query(np.atleast_2d(x_scaled), k=k)
+    return idx, dist
+
+
+def lower_emitters(index, idx, reference_co2):
+    """Neighbour rows (as a dict of columns) whose real emissions beat `reference_co2`"""
+    cols = index['columns']
+    rows = np.asarray(index['profiles'][np.sort(idx)])
+    co2 = rows[:, cols.index('carbonemission')]
+    keep = rows[co2 < reference_co2]
+    return {c: keep[:, j] for j, c in enumerate(cols)}, rows
+
+
+def differences(user, lower, min_share=0.3, min_rel=0.15, limit=5):
+    """What lower-emitting neighbours do differently — ranked by how consistent the difference is"""
+    out = []
+    n = len(next(iter(lower.values()))) if lower else 0
+    if n == 0:
+        return out
+
+    for col, values in lower.items():
+        if col in DERIVED or col == 'carbonemission' or col not in user:
+            continue
+        mine = user[col]
+        if col in DECODE_MAP:
+            codes, counts = np.unique(values.astype(np.int64), return_counts=True)
+            others = codes != mine
+            if not others.any():
+                continue
+            share = counts[others].sum() / n
+            top = codes[others][np.argmax(counts[others])]
+            if share >= min_share:
+                out.append({
+                    'feature': col, 'score': float(share),
+                    'text': f"{share * 100:.0f}% differ on {col.replace('_', ' ')} — most often "
+                            f"“{DECODE_MAP[col].get(int(top), top)}” (you: “{DECODE_MAP[col].get(int(mine), mine)}”)",
+                })
+        else:
+            median = float(np.median(values))
+            rel = (median - mine) / max(abs(mine), 1)
+            if rel <= -min_rel:   # only "they do less of it" is actionable
+                unit = NUMERIC_UNITS.get(col, col.replace('_', ' '))
+                out.append({
+                    'feature': col, 'score': float(min(1.0, -rel)),
+                    'text': f"Median {median:,.0f} {unit} (you: {mine:,.0f})",
+                })
+    out.sort(key=lambda d: -d['score'])
+    return out[:limit]
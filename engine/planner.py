@@ -0,0 +1,138 @@
+"""
+Planner — smallest set of changes that brings a footprint under a target
+Level-synchronous best-first search over combinations of counterfactual
+actions (at most one per group). Depth = number of changes, so the first
+level that reaches the target gives minimal plans. Each level's frontier is
+scored in one vectorized ensemble predict; evaluated states are memoized, the
+frontier is trimmed to the most promising `beam` states, and an optimistic
+additive bound prunes branches that cannot reach the target.
+"""
+import time
+
+from engine.counterfactual import ACTIONS, rank_actions
+from engine.features import rows_to_frame, with_interactions
+from engine.scoring import predict_ensemble
+
+
+PARIS_TARGET = 2000
+
+CONFLICTS = {frozenset({'vehicle', 'mode'})}
+
+# Trees are not additive, so the bound gets slack before it prunes anything
+BOUND_SLACK = 1.25
+
+
+def _compatible(groups, group):
+    if group in groups:
+        return False
+    return not any(frozenset({group, g}) in CONFLICTS for g in groups)
+
+
+def _apply(inputs, actions):
+    x = with_interactions(inputs)
+    for action in actions:
+        if not action.applies(x):
+            return None
+        x = with_interactions(action.apply(x))
+    return x
+
+
+def plan_to_target(models, inputs, features, target=PARIS_TARGET, actions=ACTIONS,
+                   max_changes=5, beam=48, max_evals=4000, time_budget=1.5, n_plans=5):
+    """Ranked plans (fewest changes, then lowest footprint) plus search stats"""
+    t0 = time.perf_counter()
+    baseline, ranked, first = rank_actions(models, inputs, features, actions)
+    evals, batches = first['candidates'] + 1, 1
+
+    # Only actions that help on their own are worth combining
+    useful = [r['action'] for r in ranked if r['saving'] > 0]
+    order = {a.id: i for i, a in enumerate(actions)}
+    single = {r['action'].id: r['saving'] for r in ranked}
+    savings_desc = sorted((max(0.0, s) for s in single.values()), reverse=True)
+
+    memo = {(): baseline}
+    vec_memo = {}
+    for r in ranked:
+        memo[(r['action'].id,)] = r['predicted']
+
+    def bound_ok(pred, depth):
+        remaining = max_changes - depth
+        return pred - BOUND_SLACK * sum(savings_desc[:remaining]) <= target
+
+    reached, frontier, depth, truncated = [], [], 1, False
+    if baseline <= target:
+        reached.append(((), baseline))
+    else:
+        level = sorted(((a.id,) for a in useful), key=lambda s: memo[s])
+        reached += [(s, memo[s]) for s in level if memo[s] <= target]
+        frontier = [s for s in level if bound_ok(memo[s], 1)][:beam]
+
+    by_id = {a.id: a for a in actions}
+    while not reached and frontier and depth < max_changes:
+        depth += 1
+        children = {}
+        for state in frontier:
+            groups = {by_id[i].group for i in state}
+            for action in useful:
+                if not _compatible(groups, action.group):
+                    continue
+                child = tuple(sorted(state + (action.id,), key=order.get))
+                if child in memo or child in children:
+                    continue
+                row = _apply(inputs, [by_id[i] for i in child])
+                if row is not None:
+                    children[child] = row
+
+        if not children:
+            break
+
+        # Score only feature vectors we haven't seen; identical vectors share a result
+        pending = {}
+        for state, row in children.items():
+            key = tuple(row[f] for f in features)
+            if key in vec_memo:
+                memo[state] = vec_memo[key]
+            else:
+                pending.setdefault(key, []).append(state)
+        if pending:
+            rows = [children[states[0]] for states in pending.values()]
+            preds = predict_ensemble(models, rows_to_frame(rows, features))
+            evals += len(rows)
+            batches += 1
+            for (key, states), pred in zip(pending.items(), preds):
+                vec_memo[key] = float(pred)
+                for state in states:
+                    memo[state] = float(pred)
+
+        level = sorted(children, key=memo.get)
+        reached += [(s, memo[s]) for s in level if memo[s] <= target]
+        frontier = [s for s in level if bound_ok(memo[s], depth)][:beam]
+
+        if evals >= max_evals or time.perf_counter() - t0 > time_budget:
+            truncated = True
+            break
+
+    found = bool(reached)
+    if not found:
+        # Nothing reached the target — return the closest states we evaluated
+        reached = sorted(((s, p) for s, p in memo.items() if s), key=lambda sp: sp[1])
+    else:
+        reached.sort(key=lambda sp: (len(sp[0]), sp[1]))
+    plans = [{
+        'actions': [by_id[i] for i in state],
+        'predicted': pred,
+        'saving': baseline - pred,
+    } for state, pred in reached[:n_plans]]
+
+    stats = {
+        'baseline': baseline,
+        'target': target,
+        'reached': found,
+        'evaluations': evals,
+        'batches': batches,
+        'states': len(memo),
+        'depth': depth,
+        'truncated': truncated,
+        'ms': (time.perf_counter() - t0) * 1000,
+    }
+    return plans, stats
@@ -0,0 +1,145 @@
+"""
+Precompute — background inference shared across sessions
+The Calculator submits a job as soon as its inputs settle; a process-wide thread
+pool runs the model scores, cluster, projection, counterfactual ranking and
+target plan while the user is still on that page. Jobs are keyed by (inputs
+hash, served model), so sessions with identical inputs share one in-flight job
+and recently finished results. A session that changes its inputs releases its
+old job, which is cancelled when nobody else is waiting on it — before it
+starts, or at the next stage boundary once running. Each stage publishes its
+result as it finishes, so a page waits only for the stages it renders.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from engine.counterfactual import rank_actions
+from engine.features import rows_to_frame
+from engine.manifest import load_manifest
+from engine.metrics import inc, timed
+from engine.planner import PARIS_TARGET, plan_to_target
+from engine.projection import DEFAULT_RMSE, simulate
+from engine.scoring import assign_clusters, predict_models, serving
+
+
+WORKERS = int(os.environ.get('CARBON_PRECOMPUTE_WORKERS', max(2, os.cpu_count() or 1)))
+SETTLE_S = 0.3          # slider drags rerun the Calculator many times a second
+STAGES = ('scores', 'cluster', 'projection', 'ranking', 'plan')
+
+
+class Job:
+    """One background computation; stages publish their results as they finish"""
+
+    def __init__(self, key):
+        self.key = key
+        self.results = {}
+        self.refs = 0
+        self.cancelled = threading.Event()
+        self.future = None
+        self._cond = threading.Condition()
+
+    def check(self):
+        if self.cancelled.is_set():
+            raise CancelledError(f"precompute {self.key[0][:8]} superseded")
+
+    def publish(self, name, value):
+        with self._cond:
+            self.results[name] = value
+            self._cond.notify_all()
+
+    def _finished(self, _future):
+        with self._cond:
+            self._cond.notify_all()
+
+    def wait(self, stages=STAGES, timeout=None):
+        """Results once `stages` are all published → dict, or None if cancelled, failed or timed out first"""
+        def ready():
+            return all(s in self.results for s in stages) or self.future.done()
+        with self._cond:
+            self._cond.wait_for(ready, timeout)
+            if all(s in self.results for s in stages):
+                return dict(self.results)
+        return None
+
+
+class Precomputer:
+    """Thread pool plus the in-flight / recently finished jobs, keyed by (inputs hash, serving)"""
+
+    def __init__(self, workers=WORKERS, keep=256):
+        self.keep = keep
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix='precompute')
+        self._lock = threading.RLock()
+        self._running = {}            # key → Job still queued or running
+        self._done = OrderedDict()    # key → finished Job, least recently used first
+
+    def submit(self, key, fn, *args):
+        """Job for `key`, starting fn(job, *args) only when no identical job is running or cached"""
+        with self._lock:
+            if key in self._done:
+                self._done.move_to_end(key)
+                inc('precompute_jobs_total', outcome='cached')
+                return self._done[key]
+            job = self._running.get(key)
+            if job is None:
+                job = self._running[key] = Job(key)
+                job.future = self._pool.submit(fn, job, *args)
+                job.future.add_done_callback(self._finish(job))
+                inc('precompute_jobs_total', outcome='started')
+            else:
+                inc('precompute_jobs_total', outcome='shared')
+            job.refs += 1
+            return job
+
+    def _finish(self, job):
+        def callback(future):
+            with self._lock:
+                if self._running.get(job.key) is job:
+                    del self._running[job.key]
+                if not future.cancelled() and future.exception() is None:
+                    self._done[job.key] = job
+                    while len(self._done) > self.keep:
+                        self._done.popitem(last=False)
+            job._finished(future)
+        return callback
+
+    def release(self, key):
+        """A session no longer wants `key` — cancel the job if it was the last one waiting"""
+        with self._lock:
+            job = self._running.get(key)
+            if job is None:
+                return
+            job.refs -= 1
+            if job.refs > 0:
+                return
+            del self._running[key]
+            job.cancelled.set()
+            job.future.cancel()           # only succeeds while still queued
+            inc('precompute_jobs_total', outcome='cancelled')
+
+    def stats(self):
+        with self._lock:
+            return {'running': len(self._running), 'cached': len(self._done)}
+
+
+def pipeline(models, inputs, digest, job, settle_s=0.0, projection_budget_s=1.0):
+    """Everything the result pages render for one input set, published stage by stage"""
+    if job.cancelled.wait(settle_s):
+        job.check()
+    features = models['features']
+    job.publish('serving', serving(models))
+    X = rows_to_frame([inputs], features)
+
+    def stage(name, fn, *args, **kwargs):
+        job.check()
+        with timed('precompute_seconds', stage=name):
+            job.publish(name, fn(*args, **kwargs))
+
+    stage('scores', predict_models, models, X)
+    stage('cluster', assign_clusters, models, X)
+    holdout = load_manifest().get('holdout', {}).get('ensemble', {})
+    stage('projection', simulate, models, inputs, features, rmse=holdout.get('rmse', DEFAULT_RMSE),
+          budget_s=projection_budget_s, seed=int(digest[:8], 16))
+    stage('ranking', rank_actions, models, inputs, features)
+    stage('plan', plan_to_target, models, inputs, features, target=PARIS_TARGET)
+    return job.results
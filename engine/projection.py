@@ -0,0 +1,181 @@
+"""
+Projection — Monte Carlo footprint trajectories
+Every trajectory drifts the user's encoded inputs year by year: continuous
+habits take a log-normal random walk, categorical choices (flights, diet,
+vehicle, waste, appliances) step greener or worse with scenario probabilities.
+Continuous walks stay inside the training ranges (or today's value, if that is
+already outside), so the model isn't asked to extrapolate further than the user.
+All perturbed rows are re-scored in one batched predict — deduplicated first,
+since quantized draws repeat — and a model error with the holdout RMSE is drawn
+per year: an AR(1) series, so a trajectory's error persists but isn't frozen.
+Percentiles per year give the fan chart.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from engine.features import with_interactions
+from engine.scoring import predict_ensemble, serving
+from engine.validation import load_schema
+
+
+YEARS = 5
+PERCENTILES = (10, 25, 50, 75, 90)
+DEFAULT_RMSE = 240.0
+ERROR_PERSISTENCE = 0.8          # AR(1) coefficient of the yearly model error
+MAX_TRAJECTORIES = 20_000
+
+_COSTS = {}
+
+# log-drift per year, yearly volatility, P(step greener), P(step worse)
+SCENARIOS = {
+    'Business as Usual': dict(drift=0.015, sigma=0.10, greener=0.03, worse=0.03),
+    'With Actions': dict(drift=-0.08, sigma=0.10, greener=0.25, worse=0.01),
+}
+
+# feature → (min, max, rounding step) for the random walk — narrowed to the training ranges by _bounds
+CONTINUOUS = {
+    'vehicle_monthly_distance_km': (0, 9999, 50),
+    'monthly_grocery_bill': (50, 500, 10),
+    'how_many_new_clothes_monthly': (0, 50, 1),
+    'waste_bag_weekly_count': (0, 10, 1),
+    'how_long_tv_pc_daily_hour': (0, 24, 1),
+    'how_long_internet_daily_hour': (0, 24, 1),
+}
+
+# feature → codes from highest to lowest footprint (see ENCODE_MAP)
+CATEGORICAL = {
+    'frequency_of_traveling_by_air': [3, 0, 2, 1],   # very frequently → never
+    'diet': [0, 1, 3, 2],                             # omnivore → vegan
+    'vehicle_type': [5, 0, 3, 2, 1],                  # petrol → electric ('none' stays)
+    'waste_bag_size': [0, 1, 2, 3],                   # extra large → small
+    'energy_efficiency': [0, 1, 2],                   # No → Yes
+}
+
+
+def _bounds(base, columns):
+    """CONTINUOUS with (min, max) clamped to the saved training ranges, widened to reach today's value"""
+    ranges = load_schema().ranges
+    col = {c: i for i, c in enumerate(columns)}
+    bounds = {}
+    for name, (lo, hi, step) in CONTINUOUS.items():
+        if name in ranges:
+            lo, hi = max(lo, ranges[name]['min']), min(hi, ranges[name]['max'])
+        if name in col:
+            lo, hi = min(lo, base[col[name]]), max(hi, base[col[name]])
+        bounds[name] = (lo, hi, step)
+    return bounds
+
+
+def _walk(base, columns, n, years, scenario, rng, bounds=CONTINUOUS):
+    """(n, years, len(columns)) encoded inputs — one scenario's trajectories"""
+    col = {c: i for i, c in enumerate(columns)}
+    X = np.repeat(np.repeat(base[None, None, :], n, axis=0), years, axis=1)
+
+    for name, (lo, hi, step) in bounds.items():
+        if name not in col:
+            continue
+        shocks = rng.normal(scenario['drift'], scenario['sigma'], size=(n, years))
+        path = base[col[name]] * np.exp(np.cumsum(shocks, axis=1))
+        X[:, :, col[name]] = np.clip(np.round(path / step) * step, lo, hi)
+
+    for name, order in CATEGORICAL.items():
+        if name not in col or base[col[name]] not in order:
+            continue
+        u = rng.random((n, years))
+        moves = (u < scenario['greener']).astype(np.int64) - (u > 1 - scenario['worse'])
+        rank = order.index(base[col[name]]) + np.cumsum(moves, axis=1)
+        X[:, :, col[name]] = np.asarray(order)[np.clip(rank, 0, len(order) - 1)]
+
+    if 'transport_distance_interaction' in col:
+        X[:, :, col['transport_distance_interaction']] = \
+            X[:, :, col['transport']] * X[:, :, col['vehicle_monthly_distance_km']]
+    if 'energy_efficiency_heating' in col:
+        X[:, :, col['energy_efficiency_heating']] = \
+            X[:, :, col['energy_efficiency']] * X[:, :, col['heating_energy_source']]
+    return X
+
+
+def score_unique(models, X, features):
+    """Batched ensemble predictions for rows of X, predicting each distinct row once"""
+    unique, inverse = np.unique(X, axis=0, return_inverse=True)
+    preds = predict_ensemble(models, pd.DataFrame(unique, columns=features))
+    return preds[inverse.ravel()], len(unique)
+
+
+def _base(inputs, features):
+    """Full encoded input vector (walked) and the model-column positions (scored)"""
+    full = with_interactions(inputs)
+    columns = list(full)
+    return np.array([full[c] for c in columns], dtype=np.float64), columns, [columns.index(f) for f in features]
+
+
+def predict_cost(models, inputs, features, sizes=(64, 1024), repeat=3):
+    """(fixed seconds, seconds per simulated row) for the served model — measured once per process"""
+    key = (serving(models), id(models.get('student') if serving(models) == 'student' else models['rf']))
+    if key not in _COSTS:
+        base, columns, model_cols = _base(inputs, features)
+        bounds = _bounds(base, columns)
+        X = _walk(base, columns, max(sizes), 1, SCENARIOS['Business as Usual'], np.random.default_rng(0), bounds)[:, 0]
+        timings = []
+        for n in sizes:
+            frame = pd.DataFrame(X[:n, model_cols], columns=features)
+            runs = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                predict_ensemble(models, frame)
+                runs.append(time.perf_counter() - t0)
+            timings.append(min(runs))
+        # the slope can't be below the large batch's share once the small batch's cost is removed
+        per_row = max((timings[1] - timings[0]) / (sizes[1] - sizes[0]), timings[1] / sizes[1] / 4)
+        fixed = max(timings[0] - per_row * sizes[0], 0.0)
+
+        # walking, deduplicating and percentiles cost per row too — it dominates for cheap models
+        t0 = time.perf_counter()
+        walk = _walk(base, columns, 2000, YEARS, SCENARIOS['Business as Usual'], np.random.default_rng(0), bounds)
+        np.unique(walk.reshape(-1, len(columns))[:, model_cols], axis=0, return_inverse=True)
+        _COSTS[key] = (fixed, per_row + (time.perf_counter() - t0) / (2000 * YEARS))
+    return _COSTS[key]
+
+
+def _yearly_error(rng, rmse, n, years, rho=ERROR_PERSISTENCE):
+    """(n, years) AR(1) model error — stationary sd `rmse`, correlation rho between consecutive years"""
+    shocks = rng.normal(0.0, rmse, size=(n, years))
+    error = np.empty_like(shocks)
+    error[:, 0] = shocks[:, 0]
+    for t in range(1, years):
+        error[:, t] = rho * error[:, t - 1] + np.sqrt(1 - rho ** 2) * shocks[:, t]
+    return error
+
+
+def simulate(models, inputs, features, n=2000, years=YEARS, rmse=DEFAULT_RMSE,
+             budget_s=None, seed=0, scenarios=SCENARIOS):
+    """{scenario: (len(PERCENTILES), years + 1) kg array}, stats — year 0 is today's prediction"""
+    t0 = time.perf_counter()
+    base, columns, model_cols = _base(inputs, features)
+    if budget_s is not None:
+        # cap trajectories so the (undeduplicated) batch fits in what's left of the budget
+        fixed, per_row = predict_cost(models, inputs, features)
+        remaining = budget_s - (time.perf_counter() - t0) - fixed
+        n = int(max(100, min(n, MAX_TRAJECTORIES, remaining * 0.8 / per_row // (years * len(scenarios)))))
+
+    rng = np.random.default_rng(seed)
+    bounds = _bounds(base, columns)
+    walks = [_walk(base, columns, n, years, scenarios[s], rng, bounds) for s in scenarios]
+    X = np.concatenate([base[None, :]] + [w.reshape(-1, len(columns)) for w in walks])[:, model_cols]
+    preds, n_unique = score_unique(models, X, features)
+
+    today = float(preds[0])
+    error = _yearly_error(rng, rmse, n, years)
+    fans, offset = {}, 1
+    for name in scenarios:
+        paths = preds[offset:offset + n * years].reshape(n, years) + error
+        offset += n * years
+        paths = np.maximum(np.hstack([np.full((n, 1), today), paths]), 0.0)
+        fans[name] = np.percentile(paths, PERCENTILES, axis=0)
+
+    elapsed = time.perf_counter() - t0
+    stats = {'trajectories': n * len(scenarios), 'rows': len(X), 'unique_rows': n_unique,
+             'ms': elapsed * 1000, 'per_second': n * len(scenarios) / elapsed}
+    return fans, stats
@@ -0,0 +1,301 @@
+"""
+Reports — static per-user HTML footprint reports, scored and rendered in batches
+Each chunk of users goes through the same logic as the app, batched: one
+ensemble predict over every user's counterfactuals (the first row per user is
+the baseline prediction), one cluster assignment, the vectorised emission-factor
+breakdown and one more predict for the combined plans. Rendering fills a
+string.Template compiled once per process; the Analytics figures are built once
+with Plotly and kept as JSON, so each report only swaps in its own numbers.
+Chunks are spread over a process pool whose workers load the models once.
+"""
+import html
+import json
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from string import Template
+
+import numpy as np
+
+from engine.counterfactual import best_per_group, combine, impact_label, rank_actions_batch
+from engine.features import rows_to_frame, with_interactions
+from engine.footprint import CATEGORIES, breakdown_arrays
+from engine.planner import PARIS_TARGET
+from engine.scoring import assign_clusters, predict_ensemble
+
+
+REPORTS_DIR = 'reports'
+CHUNK_USERS = 250
+TOP_ACTIONS = 5
+GLOBAL_AVG = 4800
+PLOTLY_MODES = ('cdn', 'inline', 'directory')    # script tag: CDN, the whole library per file, or one shared copy
+
+
+# ─── SCORING ─────────────────────────────────────────────────────────────────
+
+def score_users(models, values):
+    """{column: array} of encoded, validated inputs → one result dict per user"""
+    features = models['features']
+    columns = list(values)
+    rows = [with_interactions(dict(zip(columns, r))) for r in zip(*(np.asarray(values[c]).tolist() for c in columns))]
+
+    ranking = rank_actions_batch(models, rows, features)
+    _, clusters = assign_clusters(models, rows_to_frame(rows, features))
+    parts = breakdown_arrays(values)
+    plans = [best_per_group(ranked) for _, ranked in ranking]
+    planned = [combine(row, [p['action'] for p in plan]) for row, plan in zip(rows, plans) if plan]
+    after = iter(predict_ensemble(models, rows_to_frame(planned, features)) if planned else ())
+
+    results = []
+    for i, ((kg, ranked), plan) in enumerate(zip(ranking, plans)):
+        results.append({
+            'kg': kg, 'cluster': clusters[i],
+            'breakdown': {c: float(parts[c][i]) for c in CATEGORIES},
+            'actions': [r for r in ranked if r['saving'] > 0][:TOP_ACTIONS],
+            'plan': plan, 'plan_kg': float(next(after)) if plan else kg,
+        })
+    return results
+
+
+# ─── FIGURES ─────────────────────────────────────────────────────────────────
+
+def compile_figures():
+    """The Analytics pie, benchmark and radar figures as JSON-ready dicts (built once)"""
+    import plotly.io as pio
+    from pages.analytics import build_benchmarks, build_pie, build_radar
+    sample = dict.fromkeys(CATEGORIES, 1.0)
+    figures = {}
+    for name, fig in (('pie', build_pie(sample, 0)), ('benchmarks', build_benchmarks(0)),
+                      ('radar', build_radar(sample))):
+        spec = json.loads(pio.to_json(fig))
+        spec['layout'].pop('template', None)       # colours are all explicit; saves ~8 KB a figure
+        figures[name] = spec
+    return figures
+
+
+def figure_json(figures, result):
+    """This user's figures as one JSON object, safe inside a <script> tag"""
+    from pages.analytics import RADAR_MAX
+    kg, parts = result['kg'], result['breakdown']
+    pie, bench, radar = (json.loads(json.dumps(figures[n])) for n in ('pie', 'benchmarks', 'radar'))
+    pie['data'][0]['values'] = [round(parts[c], 1) for c in CATEGORIES]
+    pie['layout']['annotations'][0]['text'] = f"<b>{sum(parts.values()):,.0f}</b><br>kg CO₂"
+    bench['data'][0]['y'][0] = round(kg)
+    bench['data'][0]['text'][0] = f"{kg:,.0f}"
+    scores = [min(10, round(parts[c] / RADAR_MAX[c] * 10, 1)) for c in RADAR_MAX]
+    radar['data'][0]['r'] = scores + scores[:1]
+    return json.dumps({'pie': pie, 'benchmarks': bench, 'radar': radar}, separators=(',', ':')).replace('</', '<\\/')
+
+
+# ─── TEMPLATE ────────────────────────────────────────────────────────────────
+
+REPORT = Template("""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Carbon footprint — $name</title>
+<style>
+body{margin:0;padding:2rem;background:#0a0f0a;color:#e8f5e9;font-family:Inter,system-ui,sans-serif}
+main{max-width:1100px;margin:auto}
+h1{font-size:1.9rem;margin:0;color:#22c55e}h2{font-size:1.1rem;margin:2rem 0 .75rem;color:#e8f5e9}
+.muted{color:#6b7280;font-size:.85rem}
+.grid{display:grid;grid-template-columns:repeat(auto-fit,minmax(220px,1fr));gap:1rem;margin-top:1.5rem}
+.card{background:#111a11;border:1px solid #1f3320;border-radius:14px;padding:1.1rem 1.3rem}
+.label{font-size:.7rem;color:#6b7280;text-transform:uppercase;letter-spacing:.12em}
+.value{font-size:1.8rem;font-weight:800;margin-top:.2rem}
+.figs{display:grid;grid-template-columns:repeat(auto-fit,minmax(340px,1fr));gap:1rem}
+table{width:100%;border-collapse:collapse;font-size:.9rem}
+td,th{padding:.45rem .6rem;border-bottom:1px solid #1f3320;text-align:left}th{color:#6b7280;font-weight:500}
+td.num,th.num{text-align:right}
+.badge{font-size:.7rem;padding:.15rem .5rem;border-radius:999px;border:1px solid}
+</style>
+$plotly</head>
+<body><main>
+<div class="label">Carbon footprint report · generated $generated</div>
+<h1>$name</h1>
+<div class="muted">$group</div>
+
+<div class="grid">
+<div class="card"><div class="label">ML predicted</div><div class="value" style="color:$color">$kg</div><div class="muted">kg CO₂ / year</div></div>
+<div class="card"><div class="label">Segment</div><div class="value" style="color:$color">$cluster</div><div class="muted">$headline</div></div>
+<div class="card"><div class="label">vs global average</div><div class="value">$vs_avg</div><div class="muted">global average $global_avg kg</div></div>
+<div class="card"><div class="label">Paris target 2050</div><div class="value">$vs_target</div><div class="muted">target $target kg / year</div></div>
+</div>
+<p class="muted" style="margin-top:1rem">$summary</p>
+
+<h2>Where it comes from</h2>
+<div class="figs"><div class="card" id="pie"></div><div class="card" id="benchmarks"></div><div class="card" id="radar"></div></div>
+<div class="card" style="margin-top:1rem"><table>
+<tr><th>Category</th><th class="num">kg CO₂ / year</th><th class="num">share</th></tr>
+$breakdown
+</table><div class="muted" style="margin-top:.5rem">Emission-factor estimate; the headline figure is the trained model's prediction.</div></div>
+
+<h2>Your highest-impact changes</h2>
+<div class="card"><table>
+<tr><th></th><th>Action</th><th class="num">Predicted saving</th><th></th></tr>
+$actions
+</table></div>
+<p>$plan</p>
+</main>
+<script>
+const FIGURES = $figures;
+for (const [id, fig] of Object.entries(FIGURES)) {
+  Plotly.newPlot(id, fig.data, fig.layout, {displayModeBar: false, responsive: true});
+}
+</script>
+</body></html>
+""")
+
+BREAKDOWN_ROW = Template('<tr><td>$category</td><td class="num">$kg</td><td class="num">$share</td></tr>')
+ACTION_ROW = Template('<tr><td>$icon</td><td><b>$title</b><br><span class="muted">$desc</span></td>'
+                      '<td class="num">$saving kg ($pct%)</td>'
+                      '<td><span class="badge" style="color:$impact_color;border-color:$impact_color">$impact</span></td></tr>')
+
+
+def plotly_script(mode, out_dir=None):
+    """<script> tag that loads plotly.js for `mode` — writes the shared copy for 'directory'"""
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
+    if mode == 'cdn':
+        return f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js" charset="utf-8"></script>'
+    if mode == 'inline':
+        return f'<script>{get_plotlyjs()}</script>'
+    if mode == 'directory':
+        path = os.path.join(out_dir, 'plotly.min.js')
+        if not os.path.exists(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(get_plotlyjs())
+        return '<script src="plotly.min.js" charset="utf-8"></script>'
+    raise ValueError(f"plotly mode must be one of {', '.join(PLOTLY_MODES)}")
+
+
+def render_report(result, name, group, figures, script, generated):
+    """One self-contained HTML page for a scored user"""
+    from pages.recommendations import RECOMMENDATIONS
+    recs = RECOMMENDATIONS.get(result['cluster'], RECOMMENDATIONS['Medium Emitter'])
+    kg, parts = result['kg'], result['breakdown']
+    total = sum(parts.values()) or 1.0
+    breakdown = '\n'.join(BREAKDOWN_ROW.substitute(category=c, kg=f"{parts[c]:,.0f}", share=f"{parts[c] / total:.0%}")
+                          for c in sorted(parts, key=parts.get, reverse=True))
+    actions = []
+    for r in result['actions']:
+        impact, impact_color = impact_label(r['saving'])
+        a = r['action']
+        actions.append(ACTION_ROW.substitute(icon=a.icon, title=html.escape(a.title), desc=html.escape(a.desc),
+                                             saving=f"{r['saving']:,.0f}", pct=f"{r['saving_pct']:.1f}",
+                                             impact=impact, impact_color=impact_color))
+    if not actions:
+        actions.append('<tr><td></td><td colspan="3">None of the candidate changes lowers the predicted '
+                       'footprint — already near the floor.</td></tr>')
+    plan = ''
+    if result['plan']:
+        saving = max(0, kg - result['plan_kg'])
+        plan = (f"Following the top {len(result['plan'])} changes together brings the prediction to "
+                f"<b>{result['plan_kg']:,.0f} kg</b> — {saving:,.0f} kg ({saving / kg:.0%}) less each year."
+                if kg else '')
+    return REPORT.substitute(
+        name=html.escape(name), group=html.escape(group or ''), generated=generated, plotly=script,
+        kg=f"{kg:,.0f}", cluster=html.escape(result['cluster']), color=recs['color'],
+        headline=recs['headline'], summary=recs['summary'],
+        vs_avg=f"{(kg - GLOBAL_AVG) / GLOBAL_AVG:+.0%}", global_avg=f"{GLOBAL_AVG:,}",
+        vs_target=f"{kg - PARIS_TARGET:+,.0f} kg", target=f"{PARIS_TARGET:,}",
+        breakdown=breakdown, actions='\n'.join(actions), plan=plan, figures=figure_json(figures, result))
+
+
+def file_name(ident):
+    return re.sub(r'[^\w.-]+', '_', str(ident)).strip('._')[:100] or 'user'
+
+
+def unique_names(ids, lines, taken):
+    """'<id>.html' per user — a name already in `taken` (case-insensitively) gets '-<CSV line>'
+
+    `taken` is updated in place, so calling this per chunk keeps names unique across the run.
+    """
+    names = []
+    for ident, line in zip(ids, lines):
+        base = file_name(ident)
+        name, n = base, 1
+        while name.lower() in taken:
+            name = f"{base}-{line}" + (f"-{n}" if n > 1 else '')
+            n += 1
+        taken.add(name.lower())
+        names.append(name + '.html')
+    return names
+
+
+# ─── PROCESS POOL ────────────────────────────────────────────────────────────
+
+_WORKER = {}
+
+
+def _init_worker(out_dir, plotly_mode):
+    """Per process: models, compiled figures and the script tag, loaded once"""
+    from pages.predictions import _load_models
+    models, error = _load_models()
+    if error:
+        raise FileNotFoundError(error)
+    _WORKER.update(models=models, out_dir=out_dir, figures=compile_figures(),
+                   script=plotly_script(plotly_mode, out_dir), generated=time.strftime('%Y-%m-%d'))
+
+
+def render_chunk(values, ids, groups, names):
+    """Score, render and write one chunk of users to their file `names` → (index entries, timings)"""
+    w = _WORKER
+    t0 = time.perf_counter()
+    results = score_users(w['models'], values)
+    t1 = time.perf_counter()
+    entries, size = [], 0
+    for result, ident, group, name in zip(results, ids, groups if groups is not None else [None] * len(ids), names):
+        page = render_report(result, str(ident), group, w['figures'], w['script'], w['generated']).encode('utf-8')
+        with open(os.path.join(w['out_dir'], name), 'wb') as f:
+            f.write(page)
+        size += len(page)
+        entries.append({'id': str(ident), 'group': group, 'file': name, 'kg': result['kg'],
+                        'cluster': result['cluster']})
+    return entries, {'score_s': t1 - t0, 'render_s': time.perf_counter() - t1, 'bytes': size}
+
+
+def generate(chunks, out_dir=REPORTS_DIR, workers=None, plotly_mode='cdn'):
+    """Render every chunk of (values, ids, groups, CSV lines) across a process pool → yields (entries, timings)
+
+    File names are settled here, in order, so duplicate or look-alike ids never overwrite
+    each other. At most two chunks per worker are in flight, so memory doesn't grow with
+    the user count.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    taken = {'index'}
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(out_dir, plotly_mode)) as pool:
+        pending = set()
+        for values, ids, groups, lines in chunks:
+            names = unique_names(ids, lines, taken)
+            pending.add(pool.submit(render_chunk, values, ids, groups, names))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in pending:
+            yield future.result()
+
+
+INDEX = Template("""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Carbon footprint reports</title>
+<style>body{margin:0;padding:2rem;background:#0a0f0a;color:#e8f5e9;font-family:Inter,system-ui,sans-serif}
+table{border-collapse:collapse;font-size:.9rem}td,th{padding:.35rem .8rem;border-bottom:1px solid #1f3320;text-align:left}
+a{color:#22c55e}td.num{text-align:right}</style></head>
+<body><h1>Carbon footprint reports</h1><p>$count reports · generated $generated</p>
+<table><tr><th>User</th><th>Group</th><th>kg CO₂ / year</th><th>Segment</th></tr>
+$rows
+</table></body></html>
+""")
+
+
+def write_index(entries, out_dir=REPORTS_DIR):
+    """index.html linking every report, highest predicted footprint first"""
+    rows = '\n'.join(
+        f'<tr><td><a href="{html.escape(e["file"])}">{html.escape(e["id"])}</a></td><td>{html.escape(e["group"] or "")}'
+        f'</td><td class="num">{e["kg"]:,.0f}</td><td>{html.escape(e["cluster"])}</td></tr>'
+        for e in sorted(entries, key=lambda e: e['kg'], reverse=True))
+    path = os.path.join(out_dir, 'index.html')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(INDEX.substitute(count=f"{len(entries):,}", generated=time.strftime('%Y-%m-%d %H:%M'), rows=rows))
+    return path
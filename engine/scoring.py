@@ -0,0 +1,54 @@
+"""
+Scoring — batched ensemble prediction and cluster assignment
+Everything takes a DataFrame in training column order and returns arrays, so a
+single user, a list of counterfactuals and a whole upload share one code path.
+`models['serving'] == 'student'` swaps the ensemble for the distilled student.
+"""
+import numpy as np
+
+from engine.metrics import inc, timed
+
+
+ENSEMBLE_WEIGHTS = {'rf': 0.6, 'xgb': 0.4}
+
+
+def serving(models):
+    """'student' when the distilled student is loaded and selected, else 'ensemble'"""
+    if models.get('serving') == 'student' and models.get('student') is not None:
+        return 'student'
+    return 'ensemble'
+
+
+def _predict(models, name, X):
+    with timed('model_predict_seconds', model=name):
+        out = np.asarray(models[name].predict(X), dtype=np.float64)
+    inc('model_predict_rows_total', len(out), model=name)
+    return out
+
+
+def predict_models(models, X):
+    """One batched predict per model → dict(rf, xgb, ensemble) of float arrays
+
+    When the student is served only it runs → dict(student, ensemble).
+    """
+    if serving(models) == 'student':
+        student = _predict(models, 'student', X)
+        return {'student': student, 'ensemble': student}
+    rf = _predict(models, 'rf', X)
+    xgb = _predict(models, 'xgb', X)
+    ensemble = rf * ENSEMBLE_WEIGHTS['rf'] + xgb * ENSEMBLE_WEIGHTS['xgb']
+    return {'rf': rf, 'xgb': xgb, 'ensemble': ensemble}
+
+
+def predict_ensemble(models, X):
+    return predict_models(models, X)['ensemble']
+
+
+def assign_clusters(models, X):
+    """Cluster ids (int array) and their emitter labels (list of str)"""
+    if models.get('assigner') is not None:
+        ids = np.asarray(models['assigner'].predict(X), dtype=np.int64)
+    else:
+        ids = np.asarray(models['kmeans'].predict(models['scaler'].transform(X)), dtype=np.int64)
+    labels = [models['cluster_map'].get(str(c), 'Medium Emitter') for c in ids]
+    return ids, labels
@@ -0,0 +1,74 @@
+"""
+Segmentation — mini-batch K-Means streamed over chunks + parallel k sweep
+Keeps memory bounded by the chunk size (plus the scaled matrix, which joblib
+memory-maps into the sweep workers) and validates k with inertia and a sampled
+silhouette score instead of hard-coding k=3.
+"""
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+
+
+CHUNK_SIZE = 8192
+EPOCHS = 3
+SILHOUETTE_SAMPLE = 10_000
+
+SEGMENT_NAMES = ['Low Emitter', 'Medium Emitter', 'High Emitter']
+
+
+def iter_chunks(n_rows, chunk_size=CHUNK_SIZE, rng=None):
+    """Row slices covering [0, n_rows); shuffled chunk order when rng is given"""
+    starts = np.arange(0, n_rows, chunk_size)
+    if rng is not None:
+        rng.shuffle(starts)
+    for start in starts:
+        yield slice(int(start), int(min(start + chunk_size, n_rows)))
+
+
+def fit_minibatch(X, k, chunk_size=CHUNK_SIZE, epochs=EPOCHS, random_state=42):
+    """MiniBatchKMeans fitted by partial_fit over shuffled chunks"""
+    km = MiniBatchKMeans(n_clusters=k, batch_size=chunk_size, random_state=random_state, n_init=3)
+    rng = np.random.default_rng(random_state)
+    for _ in range(epochs):
+        for chunk in iter_chunks(len(X), chunk_size, rng):
+            km.partial_fit(X[chunk])
+    return km
+
+
+def predict_chunked(km, X, chunk_size=65536):
+    """Labels and total inertia without materialising an n × k distance matrix"""
+    labels = np.empty(len(X), dtype=np.int64)
+    inertia = 0.0
+    for chunk in iter_chunks(len(X), chunk_size):
+        labels[chunk] = km.predict(X[chunk])
+        inertia -= km.score(X[chunk])
+    return labels, inertia
+
+
+def _evaluate_k(X, k, sample_size, random_state):
+    t0 = time.perf_counter()
+    km = fit_minibatch(X, k, random_state=random_state)
+    fit_s = time.perf_counter() - t0
+    labels, inertia = predict_chunked(km, X)
+    sample = min(sample_size, len(X))
+    sil = silhouette_score(X, labels, sample_size=sample, random_state=random_state)
+    return {'k': k, 'inertia': inertia, 'silhouette': float(sil), 'fit_s': fit_s}
+
+
+def sweep_k(X, ks=range(2, 9), n_jobs=-1, sample_size=SILHOUETTE_SAMPLE, random_state=42):
+    """Fit every k in parallel → list of dict(k, inertia, silhouette, fit_s) ordered by k"""
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluate_k)(X, k, sample_size, random_state) for k in ks)
+    return sorted(results, key=lambda r: r['k'])
+
+
+def label_clusters(labels, y, k):
+    """{cluster_id: 'Low'/'Medium'/'High Emitter'} by mean CO₂ — lowest is Low, highest High, the rest spread between"""
+    sums = np.bincount(labels, weights=np.asarray(y, dtype=np.float64), minlength=k)
+    counts = np.maximum(np.bincount(labels, minlength=k), 1)
+    order = np.argsort(sums / counts)
+    # any k ≠ 3 (e.g. --k 2) must still name the top segment High — rank * 3 // k gave Low/Medium for k=2
+    return {int(c): SEGMENT_NAMES[round(rank * 2 / max(k - 1, 1))] for rank, c in enumerate(order)}
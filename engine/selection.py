@@ -0,0 +1,92 @@
+"""
+Feature selection — parallel permutation importance + budgeted backward elimination
+Features are ranked by how much validation R² drops when each one is shuffled
+(features run in parallel). The weakest are then dropped cumulatively — every
+prefix refitted in parallel — and the longest prefix that keeps R² within the
+budget is removed from the model inputs.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.inspection import permutation_importance
+from sklearn.metrics import r2_score
+
+
+class Blend(RegressorMixin, BaseEstimator):
+    """Already-fitted models + weights as one regressor — e.g. to rank features for the served ensemble"""
+
+    def __init__(self, models, weights):
+        self.models = models
+        self.weights = weights
+
+    def fit(self, X, y=None):
+        return self
+
+    def predict(self, X):
+        return sum(w * np.asarray(m.predict(X), dtype=np.float64) for m, w in zip(self.models, self.weights))
+
+
+def permutation_ranking(model, X, y, n_repeats=5, n_jobs=-1, random_state=42):
+    """DataFrame(feature, importance, std) sorted strongest first"""
+    result = permutation_importance(model, X, y, scoring='r2', n_repeats=n_repeats,
+                                    n_jobs=n_jobs, random_state=random_state)
+    return pd.DataFrame({
+        'feature': list(X.columns),
+        'importance': result.importances_mean,
+        'std': result.importances_std,
+    }).sort_values('importance', ascending=False, ignore_index=True)
+
+
+def _score_without(make_model, X_train, y_train, X_val, y_val, dropped):
+    keep = [c for c in X_train.columns if c not in dropped]
+    model = make_model().fit(X_train[keep], y_train)
+    return r2_score(y_val, model.predict(X_val[keep]))
+
+
+def prune_features(make_model, X_train, y_train, X_val, y_val, ranking, budget,
+                   max_drop=None, n_jobs=-1):
+    """Weakest-first cumulative elimination → (kept features in original order, steps)"""
+    order = ranking['feature'].tolist()[::-1]
+    max_drop = len(order) - 1 if max_drop is None else min(max_drop, len(order) - 1)
+    prefixes = [order[:i] for i in range(max_drop + 1)]
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_score_without)(make_model, X_train, y_train, X_val, y_val, p) for p in prefixes)
+
+    base = scores[0]
+    n_drop, steps = 0, []
+    for i, score in enumerate(scores):
+        within = base - score <= budget
+        steps.append({'dropped': i, 'feature': order[i - 1] if i else None,
+                      'r2': score, 'r2_loss': base - score, 'within_budget': within})
+        if within and n_drop == i - 1:
+            n_drop = i
+    dropped = set(order[:n_drop])
+    return [c for c in X_train.columns if c not in dropped], steps
+
+
+def predict_us_per_row(model, X, repeat=7):
+    """Best of `repeat` warm batch predicts on one thread, µs per row"""
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=1)        # the parallel pool's start-up and scheduling swamp the model
+    model.predict(X)
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        model.predict(X)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(X) * 1e6
+
+
+def speedup(make_model, X_train, y_train, X_test, y_test, kept, repeat=7):
+    """Fit time, batch predict time (best of `repeat`, one thread) and test R² on all vs kept features"""
+    out = {}
+    for name, cols in (('full', list(X_train.columns)), ('pruned', kept)):
+        t0 = time.perf_counter()
+        model = make_model().fit(X_train[cols], y_train)
+        fit_s = time.perf_counter() - t0
+        out[name] = {'fit_s': fit_s, 'r2': r2_score(y_test, model.predict(X_test[cols])),
+                     'predict_us_per_row': predict_us_per_row(model, X_test[cols], repeat)}
+    return out
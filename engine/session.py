@@ -0,0 +1,161 @@
+"""
+Session glue — per-browser identity and process-wide shared resources
+"""
+import hashlib
+import json
+import os
+import uuid
+
+import streamlit as st
+
+from engine.history import HISTORY_PATH, HistoryStore
+from engine.planner import PARIS_TARGET
+
+
+def user_id():
+    """Stable anonymous id for this browser, kept in the URL (?uid=) so it survives a refresh"""
+    uid = st.query_params.get('uid')
+    if not uid:
+        uid = uuid.uuid4().hex[:16]
+        st.query_params['uid'] = uid
+    return uid
+
+
+def inputs_hash(inputs):
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=float).encode()).hexdigest()
+
+
+@st.cache_resource
+def get_history_store():
+    """One store (and writer thread) per server process"""
+    return HistoryStore(HISTORY_PATH)
+
+
+@st.cache_resource
+def _drift_monitor(stamp):
+    from engine.drift import DriftMonitor, load_reference
+    reference = load_reference()
+    return DriftMonitor(reference) if reference else None
+
+
+def get_drift_monitor():
+    """Process-wide drift monitor, rebuilt when a retrain rewrites the reference; None before training"""
+    from engine.drift import REFERENCE_PATH
+    return _drift_monitor(os.path.getmtime(REFERENCE_PATH) if os.path.exists(REFERENCE_PATH) else None)
+
+
+PRECOMPUTE = os.environ.get('CARBON_PRECOMPUTE', '1') != '0'
+
+
+def serving_choice():
+    """Model this session asked to serve — the Prediction page's picker, else CARBON_SERVING_MODEL"""
+    return st.session_state.get('serving_model', os.environ.get('CARBON_SERVING_MODEL', 'ensemble'))
+
+
+@st.cache_resource
+def get_precomputer():
+    """One background pool per server process, shared by every session"""
+    from engine.precompute import Precomputer
+    return Precomputer()
+
+
+def _precompute_job(job, inputs, requested, settle_s):
+    from engine.precompute import pipeline
+    from pages.predictions import PROJECTION_BUDGET_S, load_models   # first load happens off the UI thread
+    models, error = load_models()
+    if error:
+        raise FileNotFoundError(error)
+    return pipeline({**models, 'serving': requested}, inputs, inputs_hash(inputs), job,
+                    settle_s=settle_s, projection_budget_s=PROJECTION_BUDGET_S)
+
+
+def precompute(inputs, settle_s=0.0):
+    """This session's background job for `inputs`, releasing the one for its previous inputs
+
+    None when CARBON_PRECOMPUTE=0 — pages then compute inline as they render.
+    """
+    if not PRECOMPUTE:
+        return None
+    key = (inputs_hash(inputs), serving_choice())
+    current = st.session_state.get('precompute')
+    if current is None or current.key != key:
+        pool = get_precomputer()
+        if current is not None:
+            pool.release(current.key)
+        current = st.session_state['precompute'] = pool.submit(key, _precompute_job, inputs, key[1], settle_s)
+    return current
+
+
+def precomputed(inputs, stages=(), wait=True, timeout=30.0):
+    """Land the background results for `inputs` in session state → results dict, or None
+
+    Waits up to `timeout` s for `stages`; with wait=False lands whatever has finished so far.
+    """
+    job = precompute(inputs)
+    if job is None:
+        return None
+    results = job.wait(stages, timeout) if wait else dict(job.results)
+    if results is None:
+        return None
+    digest, served = job.key[0], results.get('serving')
+    state = st.session_state
+    if 'scores' in results:
+        scores = results['scores']
+        state['ensemble_pred'] = float(scores['ensemble'][0])
+        state['rf_pred'] = float(scores['rf'][0]) if 'rf' in scores else state['ensemble_pred']
+    if 'cluster' in results:
+        state['cluster'] = results['cluster'][1][0]
+    for stage, name, key_name, key in (('projection', 'projection', 'projection_key', (digest, served)),
+                                       ('ranking', 'ranking', 'ranking_key', (digest, served)),
+                                       ('plan', 'plan_result', 'plan_key', (digest, PARIS_TARGET, served))):
+        held = state.get(key_name)
+        # keep what a page already computed for these inputs (e.g. a plan for a custom target)
+        if stage in results and (held is None or (held[0], held[-1]) != (digest, served)):
+            state[name], state[key_name] = results[stage], key
+    return results
+
+
+def history_saved(kind, inputs):
+    """True when `inputs` are the last ones this session saved under `kind`"""
+    return st.session_state.get(f'_history_{kind}') == inputs_hash(inputs)
+
+
+def record_history(kind, co2, inputs, cluster=None):
+    """Append to the user's history once per distinct input set — call on an explicit save only"""
+    if history_saved(kind, inputs):
+        return
+    st.session_state[f'_history_{kind}'] = inputs_hash(inputs)
+    get_history_store().record(user_id(), kind, co2, cluster=cluster, inputs=inputs)
+
+
+def observe_scored(inputs, prediction):
+    """Feed one served prediction — the inputs scored and its output — to the drift monitor
+
+    Once per distinct input set per session, so reruns and model switches don't recount it.
+    """
+    digest = inputs_hash(inputs)
+    if st.session_state.get('_drift_observed') == digest:
+        return
+    st.session_state['_drift_observed'] = digest
+    monitor = get_drift_monitor()
+    if monitor is not None:
+        from engine.drift import PREDICTION
+        monitor.observe({**inputs, PREDICTION: prediction})
+
+
+def session_group():
+    """This session's household / team profile — empty until members are added on the Calculator"""
+    if 'group' not in st.session_state:
+        from engine.group import GroupProfile
+        st.session_state['group'] = GroupProfile()
+    return st.session_state['group']
+
+
+def scored_group(models):
+    """Scores for the session's group, recomputed only when members or the served model change"""
+    from engine.scoring import serving
+    group = session_group()
+    key = (group.digest(), serving(models))
+    if st.session_state.get('group_key') != key:
+        st.session_state['group_result'], st.session_state['group_key'] = group.score(models), key
+    return st.session_state['group_result']
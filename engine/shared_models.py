@@ -0,0 +1,138 @@
+"""
+Shared models — one memory-mapped bundle of serving arrays for every worker
+The compact forests' node arrays, the cluster assigner's centroids / weights and
+the scaler's mean / scale are written once as raw 64-byte-aligned arrays behind
+a small JSON header, on tmpfs (/dev/shm) when the host has it. Each Streamlit
+process maps the file read-only and wraps views over it, so the page cache
+holds a single copy however many workers attach.
+
+The first worker to find the bundle missing or older than the model files
+publishes it under a file lock; the rest just attach. Workers that attached
+before a retrain keep serving the old mapping until they restart.
+"""
+import fcntl
+import json
+import mmap
+import os
+
+import numpy as np
+
+from engine.assign import ASSIGNER_PATH, ClusterAssigner
+from engine.compact_trees import CompactForest, compact_path
+
+
+SHARED_PATH = os.environ.get('CARBON_SHARED_PATH', os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else 'models', 'carbon_models.bin'))
+SCALER_PATH = 'models/scaler.pkl'
+FORESTS = ('random_forest', 'xgboost')
+FOREST_ARRAYS = ('feature', 'split', 'right', 'roots', 'offset', 'scale')
+MAGIC = b'CARBONSM'
+ALIGN = 64
+
+
+class Standardizer:
+    """StandardScaler.transform on raw feature rows, from its mean_ / scale_"""
+
+    def __init__(self, mean, scale, features):
+        self.mean_, self.scale_ = mean, scale
+        self.features = list(features)
+
+    def transform(self, X):
+        if hasattr(X, 'columns'):
+            X = X[self.features]
+        return (np.atleast_2d(np.asarray(X, dtype=np.float64)) - self.mean_) / self.scale_
+
+
+def _sources(fmt):
+    return [compact_path(name, fmt) for name in FORESTS] + [ASSIGNER_PATH, SCALER_PATH]
+
+
+def publish(path=SHARED_PATH, fmt='float32'):
+    """Write the bundle from the saved compact forests, assigner and scaler → bytes written"""
+    import joblib
+    arrays, meta = {}, {'fmt': fmt, 'forests': {}}
+    for name in FORESTS:
+        forest = CompactForest.load(compact_path(name, fmt))
+        meta['forests'][name] = {'kind': forest.kind, 'features': forest.features,
+                                 'leaf_scale': forest.leaf_scale, 'base': forest.base}
+        for a in FOREST_ARRAYS:
+            if getattr(forest, a) is not None:
+                arrays[f'{name}.{a}'] = getattr(forest, a)
+
+    assigner = ClusterAssigner.load()
+    if assigner is None:
+        raise FileNotFoundError(ASSIGNER_PATH)
+    scaler = joblib.load(SCALER_PATH)
+    arrays.update({'assigner.centroids': assigner.centroids, 'assigner.weights': assigner.weights,
+                   'scaler.mean': np.asarray(scaler.mean_, dtype=np.float64),
+                   'scaler.scale': np.asarray(scaler.scale_, dtype=np.float64)})
+    meta['features'] = assigner.features
+
+    # header: MAGIC, 8-byte header length, JSON; then each array at an ALIGN boundary
+    layout, offset = {}, 0
+    for key, arr in arrays.items():
+        layout[key] = {'dtype': arr.dtype.str, 'shape': list(arr.shape), 'offset': offset}
+        offset += -(-arr.nbytes // ALIGN) * ALIGN
+    header = json.dumps({'meta': meta, 'arrays': layout}).encode()
+    start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC + len(header).to_bytes(8, 'little') + header)
+        for key, arr in arrays.items():
+            f.seek(start + layout[key]['offset'])
+            f.write(np.ascontiguousarray(arr).tobytes())
+        f.truncate(start + offset)
+    os.replace(tmp, path)     # workers already attached keep the old inode
+    return start + offset
+
+
+def attach(path=SHARED_PATH):
+    """{'random_forest', 'xgboost': CompactForest, 'assigner', 'scaler'} as read-only views into the bundle"""
+    with open(path, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if buf[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a shared model bundle")
+    size = int.from_bytes(buf[len(MAGIC):len(MAGIC) + 8], 'little')
+    header = json.loads(buf[len(MAGIC) + 8:len(MAGIC) + 8 + size])
+    start = -(-(len(MAGIC) + 8 + size) // ALIGN) * ALIGN
+
+    def view(key):
+        spec = header['arrays'].get(key)
+        if spec is None:
+            return None
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape'], dtype=np.int64))
+        return np.frombuffer(buf, dtype, count, start + spec['offset']).reshape(spec['shape'])
+
+    meta = header['meta']
+    out = {}
+    for name, m in meta['forests'].items():
+        arrays = {a: view(f'{name}.{a}') for a in FOREST_ARRAYS}
+        out[name] = CompactForest(m['kind'], meta['fmt'], m['features'], arrays['feature'], arrays['split'],
+                                  arrays['right'], arrays['roots'], m['leaf_scale'], m['base'],
+                                  arrays['offset'], arrays['scale'])
+    out['assigner'] = ClusterAssigner(view('assigner.centroids'), view('assigner.weights'), meta['features'])
+    out['scaler'] = Standardizer(view('scaler.mean'), view('scaler.scale'), meta['features'])
+    return out
+
+
+def _stale(path, sources):
+    if not os.path.exists(path):
+        return True
+    mtimes = [os.path.getmtime(s) for s in sources if os.path.exists(s)]
+    return bool(mtimes) and os.path.getmtime(path) < max(mtimes)
+
+
+def load_shared(path=SHARED_PATH, fmt='float32'):
+    """Attach to the bundle, publishing it first when missing or older than the model files"""
+    sources = _sources(fmt)
+    missing = [s for s in sources if not os.path.exists(s)]
+    if missing and not os.path.exists(path):
+        raise FileNotFoundError(missing[0])
+    if _stale(path, sources):
+        with open(f'{path}.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if _stale(path, sources):      # another worker may have published while we waited
+                publish(path, fmt)
+    return attach(path)
@@ -0,0 +1,91 @@
+"""
+Tuning — successive halving over a shared, memory-mapped dataset
+Every rung gives the surviving configurations a bigger budget (training rows
+for the Random Forest, boosting rounds with early stopping for XGBoost) and
+keeps the best 1/eta. Workers open X/y from .npy files with mmap_mode='r', so
+the process pool shares one copy of the data instead of pickling it per task.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import xgboost as xgb
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score
+
+
+RF_SPACE = {
+    'n_estimators': [100, 200, 300],
+    'max_depth': [10, 15, 20, None],
+    'min_samples_split': [2, 5, 10, 20],
+    'max_features': [1.0, 0.6, 0.33],
+}
+XGB_SPACE = {
+    'learning_rate': [0.03, 0.05, 0.1, 0.2],
+    'max_depth': [4, 5, 6, 7, 8],
+    'subsample': [0.7, 0.8, 1.0],
+    'colsample_bytree': [0.6, 0.8, 1.0],
+    'min_child_weight': [1, 3, 5],
+}
+EARLY_STOPPING_ROUNDS = 30
+
+
+def sample_configs(space, n, seed=42):
+    """n distinct random configurations from a {param: choices} space"""
+    rng = np.random.default_rng(seed)
+    configs, seen = [], set()
+    while len(configs) < n and len(seen) < np.prod([len(v) for v in space.values()]):
+        config = {name: choices[rng.integers(len(choices))] for name, choices in space.items()}
+        key = tuple(config.values())
+        if key not in seen:
+            seen.add(key)
+            configs.append({k: (v.item() if hasattr(v, 'item') else v) for k, v in config.items()})
+    return configs
+
+
+def share_arrays(directory, **arrays):
+    """Write arrays to .npy once → {name: path} for workers to memory-map"""
+    paths = {}
+    for name, values in arrays.items():
+        paths[name] = os.path.join(directory, f"{name}.npy")
+        np.save(paths[name], np.ascontiguousarray(values, dtype=np.float64))
+    return paths
+
+
+def _evaluate(kind, params, paths, budget, seed):
+    X_tr, y_tr, X_val, y_val = (np.load(paths[n], mmap_mode='r') for n in ('X_train', 'y_train', 'X_val', 'y_val'))
+    t0 = time.perf_counter()
+    if kind == 'rf':
+        rows = np.random.default_rng(seed).permutation(len(X_tr))[:budget]
+        model = RandomForestRegressor(**params, n_jobs=1, random_state=seed).fit(X_tr[rows], y_tr[rows])
+        rounds = None
+    else:
+        model = xgb.XGBRegressor(**params, n_estimators=budget, early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+                                 n_jobs=1, random_state=seed, verbosity=0)
+        model.fit(X_tr, y_tr, eval_set=[(X_val, y_val)], verbose=False)
+        rounds = int(model.best_iteration) + 1
+    return {'r2': float(r2_score(y_val, model.predict(X_val))), 'rounds': rounds,
+            'seconds': time.perf_counter() - t0}
+
+
+def budgets(max_budget, n_configs, eta=3):
+    """Rung budgets ending exactly at max_budget: …, max/eta², max/eta, max"""
+    n_rungs = max(0, int(np.log(n_configs) / np.log(eta) + 1e-9))
+    return [max(1, max_budget // eta ** (n_rungs - r)) for r in range(n_rungs + 1)]
+
+
+def successive_halving(kind, configs, paths, max_budget, eta=3, max_workers=None, seed=42):
+    """Race configs up the budget ladder → (best config, best result, rungs)"""
+    alive = list(range(len(configs)))
+    rungs = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for budget in budgets(max_budget, len(configs), eta):
+            futures = {pool.submit(_evaluate, kind, configs[i], paths, budget, seed): i for i in alive}
+            results = {futures[f]: f.result() for f in as_completed(futures)}
+            rungs.append({'budget': budget, 'results': results})
+            alive = sorted(alive, key=lambda i: -results[i]['r2'])[:max(1, len(alive) // eta)]
+
+    last = rungs[-1]['results']
+    best = max(last, key=lambda i: last[i]['r2'])
+    return configs[best], last[best], rungs
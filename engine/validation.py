@@ -0,0 +1,237 @@
+"""
+Validation — vectorised schema and range checks for model inputs
+Every check runs on whole columns as NumPy masks, so one calculator answer, a
+20K-row upload chunk and a service request all go through the same code:
+
+- missing   required column absent                                  error
+- type      value is not a number                                   error
+- code      categorical code not in data/label_encoders.json        error
+- limit     physically impossible (negative, > 24 h a day, ...)     error
+- derived   an interaction column disagrees with its inputs         error
+- range     outside what the models saw in training                 warning
+            (models/feature_ranges.json, written by train_models.py)
+- consistency  transport and vehicle type contradict each other     warning
+
+A Report keeps one mask per (column, check) and only expands to per-row dicts
+for the rows a caller asks about.
+"""
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from engine.features import ENCODE_MAP, normalize_column
+
+
+LABEL_ENCODERS_PATH = 'data/label_encoders.json'
+RANGES_PATH = 'models/feature_ranges.json'
+
+NUMERIC = ('monthly_grocery_bill', 'vehicle_monthly_distance_km', 'waste_bag_weekly_count',
+           'how_long_tv_pc_daily_hour', 'how_many_new_clothes_monthly', 'how_long_internet_daily_hour')
+DERIVED = {'transport_distance_interaction': ('transport', 'vehicle_monthly_distance_km'),
+           'energy_efficiency_heating': ('energy_efficiency', 'heating_energy_source')}
+
+# hard bounds whatever the training data — beyond these the answer can't be real
+LIMITS = {
+    'monthly_grocery_bill': (0, 100_000),
+    'vehicle_monthly_distance_km': (0, 90_000),        # 24 h a day at ~120 km/h
+    'waste_bag_weekly_count': (0, 100),
+    'how_long_tv_pc_daily_hour': (0, 24),
+    'how_many_new_clothes_monthly': (0, 1_000),
+    'how_long_internet_daily_hour': (0, 24),
+}
+
+LABELS = {
+    'monthly_grocery_bill': "Monthly grocery bill",
+    'vehicle_monthly_distance_km': "Monthly distance (km)",
+    'waste_bag_weekly_count': "Waste bags per week",
+    'how_long_tv_pc_daily_hour': "Daily TV/PC hours",
+    'how_many_new_clothes_monthly': "New clothes per month",
+    'how_long_internet_daily_hour': "Daily internet hours",
+}
+
+ERROR, WARNING = 'error', 'warning'
+PRIVATE, NO_VEHICLE = ENCODE_MAP['transport']['private'], ENCODE_MAP['vehicle_type']['none']
+
+Issue = namedtuple('Issue', 'column check severity mask message')
+
+
+class ValidationError(ValueError):
+    """Inputs failed one or more error-level checks; `.report` has the details"""
+
+    def __init__(self, report):
+        self.report = report
+        super().__init__('; '.join(f"{c}: {n:,} row{'s' if n > 1 else ''}"
+                                   for c, n in report.counts(ERROR).items()))
+
+
+class Report:
+    """Per-(column, check) masks over n rows plus the coerced float64 columns"""
+
+    def __init__(self, n, values):
+        self.n = n
+        self.values = values
+        self.issues = []
+
+    def add(self, column, check, severity, mask, message):
+        if mask.any():
+            self.issues.append(Issue(column, check, severity, mask, message))
+
+    def _any(self, severity):
+        out = np.zeros(self.n, dtype=bool)
+        for issue in self.issues:
+            if issue.severity == severity:
+                out |= issue.mask
+        return out
+
+    @property
+    def valid(self):
+        """Rows without errors (warnings allowed)"""
+        return ~self._any(ERROR)
+
+    @property
+    def warned(self):
+        return self._any(WARNING)
+
+    @property
+    def ok(self):
+        return not any(i.severity == ERROR for i in self.issues)
+
+    def counts(self, severity=None):
+        """{'column: check': rows affected}"""
+        return {f"{i.column}: {i.check}": int(i.mask.sum())
+                for i in self.issues if severity in (None, i.severity)}
+
+    def messages(self, severity=None):
+        """One line per (column, check) — what a single-row caller shows"""
+        return [i.message for i in self.issues if severity in (None, i.severity)]
+
+    def rows(self, limit=100, severity=None):
+        """Structured per-row issues for the first `limit` affected rows, in row order"""
+        issues = [i for i in self.issues if severity in (None, i.severity)]
+        if not issues:
+            return []
+        hit = np.zeros(self.n, dtype=bool)
+        for i in issues:
+            hit |= i.mask
+        out = []
+        for row in np.flatnonzero(hit)[:limit]:
+            for i in issues:
+                if i.mask[row]:
+                    value = self.values.get(i.column)
+                    out.append({'row': int(row), 'column': i.column, 'check': i.check, 'severity': i.severity,
+                                'value': None if value is None else float(value[row]), 'message': i.message})
+        return out
+
+
+def _column(data, name, n):
+    """float64 array for one column (NaN where not a number), or None when absent"""
+    if name not in data:
+        return None
+    x = data[name]
+    x = x.to_numpy() if hasattr(x, 'to_numpy') else np.asarray(x)
+    if x.ndim == 0:
+        x = np.full(n, x, dtype=x.dtype if x.dtype.kind in 'biuf' else object)
+    if x.dtype.kind in 'biuf':
+        return x.astype(np.float64, copy=False)
+    import pandas as pd          # only strings / mixed objects need parsing
+    return pd.to_numeric(pd.Series(x, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+
+
+class Schema:
+    """Code sets, training ranges and hard limits for the model's input columns"""
+
+    def __init__(self, codes, ranges=None, limits=LIMITS):
+        self.codes = {c: np.asarray(sorted(v), dtype=np.float64) for c, v in codes.items()}
+        self.ranges = ranges or {}
+        self.limits = limits
+
+    @classmethod
+    def load(cls, encoders_path=LABEL_ENCODERS_PATH, ranges_path=RANGES_PATH):
+        codes = {c: list(m.values()) for c, m in ENCODE_MAP.items()}
+        if os.path.exists(encoders_path):
+            with open(encoders_path) as f:
+                codes = {normalize_column(c): [int(k) for k in m] for c, m in json.load(f).items()}
+        ranges = None
+        if os.path.exists(ranges_path):
+            with open(ranges_path) as f:
+                ranges = json.load(f)
+        return cls(codes, ranges)
+
+    @property
+    def columns(self):
+        return list(self.codes) + list(NUMERIC)
+
+    def check(self, data, required=None):
+        """Validate a DataFrame or {column: scalar | array} → Report
+
+        `required` lists the columns that must be present (default: every raw input
+        column). Derived interaction columns are checked when given, filled in when not.
+        """
+        n = len(data) if hasattr(data, 'columns') else max((np.size(v) for v in data.values()), default=0)
+        required = [c for c in (required or self.columns) if c not in DERIVED]
+        values = {}
+        report = Report(n, values)
+
+        for col in dict.fromkeys([*required, *(c for c in self.columns if c in data)]):
+            x = _column(data, col, n)
+            if x is None:
+                report.add(col, 'missing', ERROR, np.ones(n, dtype=bool), f"{col} is missing")
+                continue
+            values[col] = x
+            nan = np.isnan(x)
+            if col in self.codes:
+                bad = np.ones(n, dtype=bool)
+                for code in self.codes[col]:       # ≤ 6 codes: a few elementwise passes beat np.isin
+                    bad &= x != code
+                report.add(col, 'code', ERROR, bad, f"{col}: unknown category")
+                continue
+            report.add(col, 'type', ERROR, nan, f"{LABELS.get(col, col)} is not a number")
+            lo, hi = self.limits.get(col, (0, np.inf))
+            impossible = ~nan & ((x < lo) | (x > hi))
+            report.add(col, 'limit', ERROR, impossible, f"{LABELS.get(col, col)} must be between {lo:,} and {hi:,}")
+            if col in self.ranges:
+                lo, hi = self.ranges[col]['min'], self.ranges[col]['max']
+                outside = ~nan & ~impossible & ((x < lo) | (x > hi))
+                report.add(col, 'range', WARNING, outside,
+                           f"{LABELS.get(col, col)} outside the training range {lo:,g}–{hi:,g}; "
+                           f"the prediction is an extrapolation")
+
+        if 'transport' in values and 'vehicle_type' in values:
+            t, v = values['transport'], values['vehicle_type']
+            report.add('vehicle_type', 'consistency', WARNING, (t == PRIVATE) == (v == NO_VEHICLE),
+                       "Vehicle type doesn't match the transport mode (private ⇔ a vehicle)")
+
+        for col, (a, b) in DERIVED.items():
+            if a not in values or b not in values:
+                continue
+            expected = values[a] * values[b]
+            given = _column(data, col, n)
+            if given is not None:
+                report.add(col, 'derived', ERROR, ~np.isclose(given, expected, equal_nan=True),
+                           f"{col} must equal {a} × {b}")
+            values[col] = expected
+        return report
+
+
+_SCHEMAS = {}
+
+
+def load_schema(encoders_path=LABEL_ENCODERS_PATH, ranges_path=RANGES_PATH):
+    """Schema cached per process, reloaded when either file changes (e.g. after a retrain)"""
+    stamp = tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in (encoders_path, ranges_path))
+    key = (encoders_path, ranges_path)
+    if key not in _SCHEMAS or _SCHEMAS[key][0] != stamp:
+        _SCHEMAS[key] = (stamp, Schema.load(encoders_path, ranges_path))
+    return _SCHEMAS[key][1]
+
+
+def fit_ranges(df, columns=NUMERIC):
+    """{column: {'min', 'max'}} from the training rows"""
+    return {c: {'min': float(df[c].min()), 'max': float(df[c].max())} for c in columns if c in df}
+
+
+def save_ranges(ranges, path=RANGES_PATH):
+    with open(path, 'w') as f:
+        json.dump(ranges, f, indent=2)
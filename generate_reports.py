@@ -0,0 +1,77 @@
+"""
+Report Generation - one static HTML footprint report per user
+Reads an employee CSV (the Organization page's format: raw answers or encoded
+codes, optional employee_id / department), scores users in batches with the
+trained models and writes reports/<id>.html plus reports/index.html, rendered
+across a process pool. Ids that clash once made file-safe get their CSV line
+number appended.
+
+Run (after python train_models.py):
+    python generate_reports.py --input employees.csv [--out reports] [--workers 4]
+                               [--plotly cdn|inline|directory] [--limit 10000]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from engine.batch import REQUIRED, encoded_chunks
+from engine.reports import CHUNK_USERS, PLOTLY_MODES, REPORTS_DIR, generate, write_index
+import warnings
+warnings.filterwarnings('ignore')
+
+parser = argparse.ArgumentParser(description="Render a static HTML footprint report per user")
+parser.add_argument('--input', default='data/carbon_data_cleaned.csv', help="employee CSV (default: the training data)")
+parser.add_argument('--out', default=REPORTS_DIR)
+parser.add_argument('--workers', type=int, default=None, help="process pool size (default: CPU count)")
+parser.add_argument('--plotly', default='cdn', choices=PLOTLY_MODES,
+                    help="load plotly.js from the CDN, inline it in every file, or share one copy in --out")
+parser.add_argument('--chunk', type=int, default=CHUNK_USERS, help="users scored per batch")
+parser.add_argument('--limit', type=int, default=None, help="stop after this many users")
+args = parser.parse_args()
+
+print("=" * 55)
+print("  FOOTPRINT REPORTS")
+print("=" * 55)
+
+counts = {'read': 0, 'skipped': 0}
+
+
+def chunks():
+    """Validated users from the CSV as (values, ids, groups, CSV lines), args.chunk at a time"""
+    with open(args.input, 'rb') as f:
+        for chunk, report, ids, groups, start in encoded_chunks(f, args.chunk):
+            valid = report.valid
+            if args.limit is not None:
+                valid[max(0, args.limit - counts['read']):] = False
+            counts['read'] += len(chunk)
+            counts['skipped'] += int((~report.valid).sum())
+            if valid.any():
+                lines = np.arange(start, start + len(chunk)) + 2        # header is line 1
+                yield ({c: report.values[c][valid] for c in REQUIRED}, ids[valid],
+                       groups[valid] if groups is not None else None, lines[valid])
+            if args.limit is not None and counts['read'] >= args.limit:
+                return
+
+
+t0 = time.perf_counter()
+entries, score_s, render_s, size = [], 0.0, 0.0, 0
+for done, timings in generate(chunks(), args.out, args.workers, args.plotly):
+    entries.extend(done)
+    score_s += timings['score_s']
+    render_s += timings['render_s']
+    size += timings['bytes']
+    print(f"  {len(entries):>8,} reports · {len(entries) / (time.perf_counter() - t0):,.0f}/s", end='\r')
+index = write_index(entries, args.out)
+wall = time.perf_counter() - t0
+
+print(f"\n\n📄 Reports     : {len(entries):,} in {args.out}/ ({counts['skipped']:,} rows failed validation)")
+print(f"   Wall        : {wall:.1f}s → {len(entries) / wall:,.0f} reports/s with "
+      f"{args.workers or os.cpu_count()} worker(s)")
+if entries:
+    print(f"   Worker time : scoring {score_s:.1f}s, rendering + writing {render_s:.1f}s")
+    print(f"   Output      : {size / 1e6:,.1f} MB, {size / len(entries) / 1024:,.1f} KB per report "
+          f"(plotly.js: {args.plotly})")
+print(f"\n  ✅ {index}")
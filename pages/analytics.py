@@ -7,6 +7,13 @@ import plotly.express as px
 import pandas as pd
 import numpy as np
 
+from engine.binning import POPULATION_PATH, dataset_version, population_bins
+from engine.figure_cache import FigureCache, figure_key
+from engine.footprint import breakdown as footprint_breakdown
+from engine.metrics import inc, timed
+from engine.scoring import assign_clusters
+from engine.session import get_history_store, precomputed, scored_group, session_group, user_id
+
 
 PLOTLY_THEME = dict(
     paper_bgcolor='rgba(0,0,0,0)',
@@ -17,6 +24,348 @@ PLOTLY_THEME = dict(
     margin=dict(l=20, r=20, t=40, b=20),
 )
 
+CLUSTER_COLORS = {'Low Emitter': '#22c55e', 'Medium Emitter': '#fbbf24', 'High Emitter': '#f87171'}
+
+
+@st.cache_resource
+def get_figure_cache():
+    """One figure cache per server process, shared by every session"""
+    return FigureCache(max_entries=512)
+
+
+# ── Population aggregates (binned server-side, cached per dataset version) ────
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_population_bins(version):
+    """Histogram / heatmap arrays for the population charts — `version` keys the cache"""
+    df = pd.read_csv(POPULATION_PATH)
+
+    from pages.predictions import load_models
+    models, error = load_models()
+    if error:
+        return population_bins(df)
+
+    clusters, _ = assign_clusters(models, df[models['features']])
+    names = [models['cluster_map'].get(str(c), str(c)) for c in range(int(clusters.max()) + 1)]
+    return population_bins(df, clusters=clusters, cluster_names=names)
+
+
+def show_population(total, inputs):
+    st.markdown("<hr style='border-color:#1f3320'>", unsafe_allow_html=True)
+    st.markdown("##### 👥 Where You Sit in the Population")
+
+    try:
+        bins = load_population_bins(dataset_version(POPULATION_PATH))
+    except FileNotFoundError:
+        st.info("Population charts need `data/carbon_data_cleaned.csv` — run `python clean_data.py`.")
+        return
+
+    summary = bins['summary']
+    st.markdown(f"<p style='color:#6b7280; font-size:0.82rem; margin-bottom:1rem'>"
+                f"{summary['n']:,} profiles · median {summary['p50']:,.0f} kg · "
+                f"middle half {summary['p25']:,.0f}–{summary['p75']:,.0f} kg CO₂/year</p>",
+                unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2, gap="medium")
+
+    with col1:
+        hist = bins['co2_hist']
+        width = float(hist['edges'][1] - hist['edges'][0])
+        inc('figure_requests_total', figure='population_hist')
+        with timed('figure_build_seconds', figure='population_hist'):
+            fig_hist = go.Figure(go.Bar(
+                x=hist['centers'], y=hist['counts'], width=width,
+                marker=dict(color='#374b38', line=dict(color='#0a0f0a', width=0.5)),
+                hovertemplate='%{x:,.0f} kg<br>%{y:,} people<extra></extra>'
+            ))
+            fig_hist.add_vline(x=total, line=dict(color='#2dd4bf', width=2),
+                               annotation_text="You", annotation_font=dict(color='#2dd4bf'))
+            fig_hist.update_layout(**PLOTLY_THEME, height=340, bargap=0,
+                                   xaxis_title='kg CO₂ / year', yaxis_title='People')
+        st.plotly_chart(fig_hist, use_container_width=True)
+
+    with col2:
+        heat = bins['distance_heatmap']
+        inc('figure_requests_total', figure='population_heatmap')
+        with timed('figure_build_seconds', figure='population_heatmap'):
+            fig_heat = go.Figure(go.Heatmap(
+                x=heat['x'], y=heat['y'], z=heat['z'],
+                colorscale=[[0, 'rgba(13,21,13,0)'], [0.2, '#14532d'], [0.6, '#22c55e'], [1, '#a3e635']],
+                showscale=False,
+                hovertemplate='%{x:,.0f} km/mo · %{y:,.0f} kg<br>%{z:,} people<extra></extra>'
+            ))
+            fig_heat.add_trace(go.Scatter(
+                x=[inputs.get('vehicle_monthly_distance_km', 0)], y=[total], mode='markers',
+                marker=dict(color='#2dd4bf', size=12, line=dict(color='white', width=1.5)),
+                name='You', hovertemplate='You<extra></extra>'
+            ))
+            fig_heat.update_layout(**PLOTLY_THEME, height=340, showlegend=False,
+                                   xaxis_title='Vehicle km / month', yaxis_title='kg CO₂ / year')
+        st.plotly_chart(fig_heat, use_container_width=True)
+
+    if 'cluster_hist' in bins:
+        ch = bins['cluster_hist']
+        inc('figure_requests_total', figure='population_segments')
+        with timed('figure_build_seconds', figure='population_segments'):
+            fig_clusters = go.Figure()
+            for counts, name in zip(ch['counts'], bins['cluster_names']):
+                fig_clusters.add_trace(go.Scatter(
+                    x=ch['centers'], y=counts, mode='lines', line_shape='hvh', name=name,
+                    line=dict(color=CLUSTER_COLORS.get(name, '#9ca3af'), width=2),
+                    hovertemplate='%{x:,.0f} kg<br>%{y:,} people<extra>' + name + '</extra>'
+                ))
+            fig_clusters.add_vline(x=total, line=dict(color='#2dd4bf', width=2, dash='dot'))
+            fig_clusters.update_layout(**PLOTLY_THEME, height=300,
+                                       legend=dict(orientation='h', y=-0.25),
+                                       xaxis_title='kg CO₂ / year', yaxis_title='People')
+        st.markdown("##### 🧩 Distribution by Segment")
+        st.plotly_chart(fig_clusters, use_container_width=True)
+
+
+# ── Figure builders (pure functions of their arguments → cacheable) ─────────
+
+def build_pie(breakdown, total):
+    labels  = list(breakdown.keys())
+    values  = list(breakdown.values())
+    colors  = ['#22c55e','#2dd4bf','#a3e635','#fbbf24','#fb923c','#f87171','#a78bfa']
+
+    fig_pie = go.Figure(go.Pie(
+        labels=labels, values=values,
+        hole=0.55,
+        marker=dict(colors=colors, line=dict(color='#0a0f0a', width=2)),
+        textinfo='label+percent',
+        textfont=dict(size=11, color='white'),
+        hovertemplate='<b>%{label}</b><br>%{value:,.0f} kg CO₂<br>%{percent}<extra></extra>'
+    ))
+    fig_pie.add_annotation(
+        text=f"<b>{total:,.0f}</b><br>kg CO₂",
+        x=0.5, y=0.5, font=dict(size=14, color='white'), showarrow=False
+    )
+    fig_pie.update_layout(**PLOTLY_THEME, showlegend=True,
+                           legend=dict(orientation='h', y=-0.15, font=dict(size=10)),
+                           height=380)
+    return fig_pie
+
+
+def build_benchmarks(total):
+    benchmarks = {
+        'You': total,
+        'Global Avg': 4800,
+        'US Avg': 14600,
+        'EU Avg': 6700,
+        'India Avg': 1900,
+        'Paris Target 2050': 2000,
+    }
+    bench_colors = ['#2dd4bf' if k == 'You' else
+                    ('#22c55e' if k == 'Paris Target 2050' else '#374b38')
+                    for k in benchmarks]
+
+    fig_bar = go.Figure(go.Bar(
+        x=list(benchmarks.keys()),
+        y=list(benchmarks.values()),
+        marker=dict(color=bench_colors, line=dict(color='#0a0f0a', width=1)),
+        text=[f'{v:,}' for v in benchmarks.values()],
+        textposition='outside',
+        textfont=dict(color='white', size=10),
+        hovertemplate='<b>%{x}</b><br>%{y:,} kg CO₂/year<extra></extra>'
+    ))
+    fig_bar.update_layout(**PLOTLY_THEME, height=380,
+                           yaxis_title='kg CO₂ / year',
+                           bargap=0.3)
+    return fig_bar
+
+
+# kg / year that scores 10 on the radar, per category
+RADAR_MAX = {
+    'Car Travel': 8000, 'Public Transport': 500, 'Flights': 3000,
+    'Home Energy': 4000, 'Diet': 1700, 'Shopping': 1600, 'Electronics': 300
+}
+
+
+def build_radar(breakdown):
+    # Normalize each category 0–10 scale
+    max_values = RADAR_MAX
+    radar_scores = [
+        min(10, round(breakdown.get(k, 0) / max_values.get(k, 1) * 10, 1))
+        for k in max_values
+    ]
+
+    cats = list(max_values.keys())
+    cats_closed = cats + [cats[0]]
+    scores_closed = radar_scores + [radar_scores[0]]
+
+    fig_radar = go.Figure()
+    fig_radar.add_trace(go.Scatterpolar(
+        r=scores_closed, theta=cats_closed,
+        fill='toself',
+        fillcolor='rgba(34,197,94,0.15)',
+        line=dict(color='#22c55e', width=2),
+        name='You'
+    ))
+    # Global average radar
+    avg_scores = [4.5, 3.0, 2.5, 4.0, 7.0, 2.5, 5.0]
+    fig_radar.add_trace(go.Scatterpolar(
+        r=avg_scores + [avg_scores[0]], theta=cats_closed,
+        fill='toself',
+        fillcolor='rgba(251,191,36,0.05)',
+        line=dict(color='#fbbf24', width=1.5, dash='dot'),
+        name='Global Avg'
+    ))
+    fig_radar.update_layout(
+        polar=dict(
+            bgcolor='rgba(13,21,13,0.6)',
+            radialaxis=dict(visible=True, range=[0,10],
+                            gridcolor='#1f3320', linecolor='#1f3320',
+                            tickfont=dict(color='#6b7280', size=9)),
+            angularaxis=dict(gridcolor='#1f3320', linecolor='#1f3320',
+                             tickfont=dict(color='#9ca3af', size=10))
+        ),
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#9ca3af'),
+        legend=dict(orientation='h', y=-0.1),
+        height=380, margin=dict(l=30,r=30,t=30,b=30)
+    )
+    return fig_radar
+
+
+def build_gauge(total, global_avg):
+    # Gauge meter
+    fig_gauge = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        value=total,
+        delta={'reference': global_avg, 'suffix': ' kg',
+               'font': {'size': 14, 'color': '#9ca3af'}},
+        number={'suffix': ' kg/yr', 'font': {'size': 22, 'color': 'white'}},
+        title={'text': "Your CO₂ vs Global Avg", 'font': {'size': 13, 'color': '#9ca3af'}},
+        gauge={
+            'axis': {'range': [0, 16000], 'tickwidth': 1, 'tickcolor': '#374b38',
+                     'tickfont': {'color': '#6b7280', 'size': 9}},
+            'bar': {'color': '#2dd4bf', 'thickness': 0.25},
+            'bgcolor': '#111a11',
+            'bordercolor': '#1f3320',
+            'steps': [
+                {'range': [0, 2000],    'color': 'rgba(34,197,94,0.2)'},
+                {'range': [2000, 6000], 'color': 'rgba(251,191,36,0.15)'},
+                {'range': [6000, 16000],'color': 'rgba(248,113,113,0.15)'},
+            ],
+            'threshold': {
+                'line': {'color': '#fbbf24', 'width': 3},
+                'thickness': 0.8,
+                'value': global_avg
+            }
+        }
+    ))
+    fig_gauge.update_layout(paper_bgcolor='rgba(0,0,0,0)',
+                             font=dict(color='white'),
+                             height=380,
+                             margin=dict(l=30,r=30,t=50,b=30))
+    return fig_gauge
+
+
+def build_monthly(total):
+    months = ['Jan','Feb','Mar','Apr','May','Jun','Jul','Aug','Sep','Oct','Nov','Dec']
+    seasonal = np.array([1.18, 1.10, 1.00, 0.92, 0.88, 0.95, 1.05, 1.02, 0.90, 0.93, 1.05, 1.20])
+    monthly_vals = ((total / 12) * seasonal).round(0)
+
+    fig_monthly = go.Figure()
+    fig_monthly.add_trace(go.Bar(
+        x=months, y=monthly_vals,
+        marker=dict(
+            color=monthly_vals,
+            colorscale=[[0,'#22c55e'], [0.5,'#fbbf24'], [1,'#f87171']],
+            showscale=False
+        ),
+        text=[f'{v:.0f}' for v in monthly_vals],
+        textposition='outside',
+        textfont=dict(color='white', size=9),
+        hovertemplate='<b>%{x}</b><br>%{y:,.0f} kg CO₂<extra></extra>'
+    ))
+    fig_monthly.add_hline(
+        y=total/12,
+        line=dict(color='#fbbf24', dash='dash', width=1.5),
+        annotation_text=f"Monthly avg: {total/12:,.0f} kg",
+        annotation_font=dict(color='#fbbf24', size=11)
+    )
+    fig_monthly.update_layout(**PLOTLY_THEME, height=300,
+                               yaxis_title='kg CO₂ / month', xaxis_title='Month')
+    return fig_monthly
+
+
+def build_history(periods, means, counts):
+    monthly_vals = np.round(np.asarray(means) / 12, 0)
+
+    fig_history = go.Figure()
+    fig_history.add_trace(go.Bar(
+        x=periods, y=monthly_vals,
+        marker=dict(
+            color=monthly_vals,
+            colorscale=[[0,'#22c55e'], [0.5,'#fbbf24'], [1,'#f87171']],
+            showscale=False
+        ),
+        text=[f'{v:.0f}' for v in monthly_vals],
+        textposition='outside',
+        textfont=dict(color='white', size=9),
+        customdata=counts,
+        hovertemplate='<b>%{x}</b><br>%{y:,.0f} kg CO₂ / month<br>%{customdata} submissions<extra></extra>'
+    ))
+    fig_history.update_layout(**PLOTLY_THEME, height=300,
+                              yaxis_title='kg CO₂ / month', xaxis_title='Month')
+    return fig_history
+
+
+def build_members(names, breakdown, kg, clusters):
+    """Stacked emission-factor categories per member, with the model's prediction as a marker"""
+    colors = ['#22c55e','#2dd4bf','#a3e635','#fbbf24','#fb923c','#f87171','#a78bfa']
+    fig_members = go.Figure()
+    for (category, values), color in zip(breakdown.items(), colors):
+        fig_members.add_trace(go.Bar(
+            x=names, y=values, name=category, marker_color=color,
+            hovertemplate='<b>%{x}</b><br>' + category + ': %{y:,.0f} kg<extra></extra>'
+        ))
+    fig_members.add_trace(go.Scatter(
+        x=names, y=kg, mode='markers', name='ML predicted',
+        marker=dict(symbol='diamond', size=13, color=[CLUSTER_COLORS.get(c, '#9ca3af') for c in clusters],
+                    line=dict(color='white', width=1.5)),
+        customdata=clusters,
+        hovertemplate='<b>%{x}</b><br>ML predicted %{y:,.0f} kg<br>%{customdata}<extra></extra>'
+    ))
+    fig_members.update_layout(**PLOTLY_THEME, barmode='stack', height=380, yaxis_title='kg CO₂ / year',
+                              legend=dict(orientation='h', y=-0.2, font=dict(size=10)))
+    return fig_members
+
+
+def show_group(chart):
+    """Household / team view — one batched score for every member, per member and combined"""
+    from pages.predictions import session_models
+    group = session_group()
+    if not len(group):
+        return
+    models, error = session_models()
+    if error:
+        return
+    result = scored_group(models)
+    names, kg = result['names'], result['kg']
+
+    st.markdown("<hr style='border-color:#1f3320'>", unsafe_allow_html=True)
+    st.markdown(f"##### 👪 Household & Team — {len(names)} member{'s' if len(names) > 1 else ''}")
+    top = int(np.argmax(kg))
+    cols = st.columns(4)
+    cols[0].metric("Group Total", f"{result['total_kg']:,.0f} kg", "ML predicted, per year", delta_color="off")
+    cols[1].metric("Per Member", f"{result['mean_kg']:,.0f} kg", f"{result['mean_kg'] - 4800:+,.0f} vs global avg",
+                   delta_color="inverse")
+    cols[2].metric("Highest", names[top], f"{kg[top]:,.0f} kg", delta_color="off")
+    cols[3].metric("Segments", len(set(result['clusters'])),
+                   ', '.join(sorted(set(result['clusters']))), delta_color="off")
+
+    col1, col2 = st.columns([3, 2], gap="medium")
+    with col1:
+        st.markdown("##### 🧍 By Member")
+        chart('members', build_members, names, {c: v.tolist() for c, v in result['breakdown'].items()},
+              kg.tolist(), result['clusters'])
+    with col2:
+        st.markdown("##### 🥧 Combined by Category")
+        chart('group_pie', build_pie, result['group_breakdown'], result['total_kg'])
+
 
 def show():
     st.markdown("<div class='hero-title' style='font-size:2rem'>📊 Analytics Dashboard</div>",
@@ -37,26 +386,21 @@ def show():
     
     # Create a simple breakdown based on inputs
     inputs = st.session_state['user_inputs']
+    precomputed(inputs, wait=False)     # land whatever the background job has finished; never block here
     
-    # Estimate breakdown (rough approximation)
-    car_emissions = inputs['vehicle_monthly_distance_km'] * 0.21 * 12 if inputs['transport'] == 0 else 0
-    air_emissions = {0: 510, 1: 0, 2: 255, 3: 1020}.get(inputs['frequency_of_traveling_by_air'], 255)
-    diet_emissions = {0: 1825, 1: 1095, 2: 365, 3: 730}.get(
-    inputs.get('diet_type', 1), 
-    1095
-)
-    energy_emissions = {0: 1200, 1: 800, 2: 600, 3: 500}.get(inputs['heating_energy_source'], 800)
-    lifestyle_emissions = inputs.get('monthly_grocery_bill', 150) * 3 + inputs.get('how_many_new_clothes_monthly', 3) * 25
-    
-    breakdown = {
-        'Car Travel': max(0, car_emissions),
-        'Public Transport': 300 if inputs.get('transport', 0) == 1 else 0,
-        'Flights': air_emissions,
-        'Home Energy': energy_emissions,
-        'Diet': diet_emissions,
-        'Shopping': lifestyle_emissions,
-        'Electronics': inputs.get('how_long_tv_pc_daily_hour', 5) * 0.05 * 365 + inputs.get('how_long_internet_daily_hour', 8) * 0.03 * 365,
-    }
+    # Estimate breakdown (rough emission-factor approximation, shared with generate_reports.py)
+    breakdown = footprint_breakdown(inputs)
+
+    cache = get_figure_cache()
+    theme = figure_key('theme', PLOTLY_THEME)
+
+    def cached_chart(name, build, *args):
+        def timed_build():
+            with timed('figure_build_seconds', figure=name):
+                return build(*args)
+        inc('figure_requests_total', figure=name)
+        fig = cache.get_or_build(figure_key(name, theme, *args), timed_build)
+        st.plotly_chart(fig, use_container_width=True)
 
     # ── ROW 1: Pie + Bar comparison ──────────────────────────────────────────
 
@@ -64,54 +408,11 @@ def show():
 
     with col1:
         st.markdown("##### 🥧 Your Emissions by Category")
-        labels  = list(breakdown.keys())
-        values  = list(breakdown.values())
-        colors  = ['#22c55e','#2dd4bf','#a3e635','#fbbf24','#fb923c','#f87171','#a78bfa']
-
-        fig_pie = go.Figure(go.Pie(
-            labels=labels, values=values,
-            hole=0.55,
-            marker=dict(colors=colors, line=dict(color='#0a0f0a', width=2)),
-            textinfo='label+percent',
-            textfont=dict(size=11, color='white'),
-            hovertemplate='<b>%{label}</b><br>%{value:,.0f} kg CO₂<br>%{percent}<extra></extra>'
-        ))
-        fig_pie.add_annotation(
-            text=f"<b>{total:,.0f}</b><br>kg CO₂",
-            x=0.5, y=0.5, font=dict(size=14, color='white'), showarrow=False
-        )
-        fig_pie.update_layout(**PLOTLY_THEME, showlegend=True,
-                               legend=dict(orientation='h', y=-0.15, font=dict(size=10)),
-                               height=380)
-        st.plotly_chart(fig_pie, use_container_width=True)
+        cached_chart('pie', build_pie, breakdown, total)
 
     with col2:
         st.markdown("##### 🌍 You vs The World")
-        benchmarks = {
-            'You': total,
-            'Global Avg': 4800,
-            'US Avg': 14600,
-            'EU Avg': 6700,
-            'India Avg': 1900,
-            'Paris Target 2050': 2000,
-        }
-        bench_colors = ['#2dd4bf' if k == 'You' else
-                        ('#22c55e' if k == 'Paris Target 2050' else '#374b38')
-                        for k in benchmarks]
-
-        fig_bar = go.Figure(go.Bar(
-            x=list(benchmarks.keys()),
-            y=list(benchmarks.values()),
-            marker=dict(color=bench_colors, line=dict(color='#0a0f0a', width=1)),
-            text=[f'{v:,}' for v in benchmarks.values()],
-            textposition='outside',
-            textfont=dict(color='white', size=10),
-            hovertemplate='<b>%{x}</b><br>%{y:,} kg CO₂/year<extra></extra>'
-        ))
-        fig_bar.update_layout(**PLOTLY_THEME, height=380,
-                               yaxis_title='kg CO₂ / year',
-                               bargap=0.3)
-        st.plotly_chart(fig_bar, use_container_width=True)
+        cached_chart('benchmarks', build_benchmarks, total)
 
     # ── ROW 2: Radar + Gauge ─────────────────────────────────────────────────
 
@@ -119,121 +420,33 @@ def show():
 
     with col3:
         st.markdown("##### 🕸️ Emission Profile Radar")
-
-        # Normalize each category 0–10 scale
-        max_values = {
-            'Car Travel': 8000, 'Public Transport': 500, 'Flights': 3000,
-            'Home Energy': 4000, 'Diet': 1700, 'Shopping': 1600, 'Electronics': 300
-        }
-        radar_scores = [
-            min(10, round(breakdown.get(k, 0) / max_values.get(k, 1) * 10, 1))
-            for k in max_values
-        ]
-
-        cats = list(max_values.keys())
-        cats_closed = cats + [cats[0]]
-        scores_closed = radar_scores + [radar_scores[0]]
-
-        fig_radar = go.Figure()
-        fig_radar.add_trace(go.Scatterpolar(
-            r=scores_closed, theta=cats_closed,
-            fill='toself',
-            fillcolor='rgba(34,197,94,0.15)',
-            line=dict(color='#22c55e', width=2),
-            name='You'
-        ))
-        # Global average radar
-        avg_scores = [4.5, 3.0, 2.5, 4.0, 7.0, 2.5, 5.0]
-        fig_radar.add_trace(go.Scatterpolar(
-            r=avg_scores + [avg_scores[0]], theta=cats_closed,
-            fill='toself',
-            fillcolor='rgba(251,191,36,0.05)',
-            line=dict(color='#fbbf24', width=1.5, dash='dot'),
-            name='Global Avg'
-        ))
-        fig_radar.update_layout(
-            polar=dict(
-                bgcolor='rgba(13,21,13,0.6)',
-                radialaxis=dict(visible=True, range=[0,10],
-                                gridcolor='#1f3320', linecolor='#1f3320',
-                                tickfont=dict(color='#6b7280', size=9)),
-                angularaxis=dict(gridcolor='#1f3320', linecolor='#1f3320',
-                                 tickfont=dict(color='#9ca3af', size=10))
-            ),
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='#9ca3af'),
-            legend=dict(orientation='h', y=-0.1),
-            height=380, margin=dict(l=30,r=30,t=30,b=30)
-        )
-        st.plotly_chart(fig_radar, use_container_width=True)
+        cached_chart('radar', build_radar, breakdown)
 
     with col4:
         st.markdown("##### 🎯 Carbon Gauge")
-        # Gauge meter
-        fig_gauge = go.Figure(go.Indicator(
-            mode="gauge+number+delta",
-            value=total,
-            delta={'reference': global_avg, 'suffix': ' kg',
-                   'font': {'size': 14, 'color': '#9ca3af'}},
-            number={'suffix': ' kg/yr', 'font': {'size': 22, 'color': 'white'}},
-            title={'text': "Your CO₂ vs Global Avg", 'font': {'size': 13, 'color': '#9ca3af'}},
-            gauge={
-                'axis': {'range': [0, 16000], 'tickwidth': 1, 'tickcolor': '#374b38',
-                         'tickfont': {'color': '#6b7280', 'size': 9}},
-                'bar': {'color': '#2dd4bf', 'thickness': 0.25},
-                'bgcolor': '#111a11',
-                'bordercolor': '#1f3320',
-                'steps': [
-                    {'range': [0, 2000],    'color': 'rgba(34,197,94,0.2)'},
-                    {'range': [2000, 6000], 'color': 'rgba(251,191,36,0.15)'},
-                    {'range': [6000, 16000],'color': 'rgba(248,113,113,0.15)'},
-                ],
-                'threshold': {
-                    'line': {'color': '#fbbf24', 'width': 3},
-                    'thickness': 0.8,
-                    'value': global_avg
-                }
-            }
-        ))
-        fig_gauge.update_layout(paper_bgcolor='rgba(0,0,0,0)',
-                                 font=dict(color='white'),
-                                 height=380,
-                                 margin=dict(l=30,r=30,t=50,b=30))
-        st.plotly_chart(fig_gauge, use_container_width=True)
+        cached_chart('gauge', build_gauge, total, global_avg)
 
     # ── ROW 3: Monthly breakdown ──────────────────────────────────────────────
 
     st.markdown("<hr style='border-color:#1f3320'>", unsafe_allow_html=True)
-    st.markdown("##### 📅 Monthly Carbon Trend (Simulated)")
-    st.markdown("<p style='color:#6b7280; font-size:0.82rem; margin-bottom:1rem'>"
-                "Estimated monthly variation based on seasonal patterns (heating in winter, AC in summer, holiday travel peaks)</p>",
-                unsafe_allow_html=True)
+    trend = get_history_store().trend(user_id(), 'prediction')      # ML predictions the user saved
 
-    months = ['Jan','Feb','Mar','Apr','May','Jun','Jul','Aug','Sep','Oct','Nov','Dec']
-    seasonal = np.array([1.18, 1.10, 1.00, 0.92, 0.88, 0.95, 1.05, 1.02, 0.90, 0.93, 1.05, 1.20])
-    monthly_vals = ((total / 12) * seasonal).round(0)
+    if len(trend) >= 2:
+        st.markdown("##### 📅 Your Monthly Carbon Trend")
+        st.markdown("<p style='color:#6b7280; font-size:0.82rem; margin-bottom:1rem'>"
+                    "Average of the ML predictions you saved in each month (pre-aggregated history)</p>",
+                    unsafe_allow_html=True)
+        cached_chart('history', build_history,
+                     [r['period'] for r in trend], [r['mean'] for r in trend], [r['n'] for r in trend])
+    else:
+        st.markdown("##### 📅 Monthly Carbon Trend (Simulated)")
+        st.markdown("<p style='color:#6b7280; font-size:0.82rem; margin-bottom:1rem'>"
+                    "Estimated monthly variation based on seasonal patterns (heating in winter, AC in summer, holiday travel peaks). "
+                    "Your real trend appears here once you've saved predictions in two or more months.</p>",
+                    unsafe_allow_html=True)
+        cached_chart('monthly', build_monthly, total)
 
-    fig_monthly = go.Figure()
-    fig_monthly.add_trace(go.Bar(
-        x=months, y=monthly_vals,
-        marker=dict(
-            color=monthly_vals,
-            colorscale=[[0,'#22c55e'], [0.5,'#fbbf24'], [1,'#f87171']],
-            showscale=False
-        ),
-        text=[f'{v:.0f}' for v in monthly_vals],
-        textposition='outside',
-        textfont=dict(color='white', size=9),
-        hovertemplate='<b>%{x}</b><br>%{y:,.0f} kg CO₂<extra></extra>'
-    ))
-    fig_monthly.add_hline(
-        y=total/12,
-        line=dict(color='#fbbf24', dash='dash', width=1.5),
-        annotation_text=f"Monthly avg: {total/12:,.0f} kg",
-        annotation_font=dict(color='#fbbf24', size=11)
-    )
-    fig_monthly.update_layout(**PLOTLY_THEME, height=300,
-                               yaxis_title='kg CO₂ / month', xaxis_title='Month')
-    st.plotly_chart(fig_monthly, use_container_width=True)
+    show_population(total, inputs)
+    show_group(cached_chart)
 
     st.info("💡 Go to **📊 Analytics** page and **💡 Recommendations** to see what actions will move your needle the most.")
\ No newline at end of file
@@ -3,9 +3,14 @@ Calculator Page — Real-time carbon footprint calculator
 Works with the actual Carbon Emission dataset features
 """
 import streamlit as st
-import pandas as pd
 import json
 
+from engine.features import ENCODE_MAP
+from engine.metrics import timed
+from engine.precompute import SETTLE_S
+from engine.session import precompute
+from engine.validation import load_schema
+
 
 def show():
     st.markdown("<div class='hero-title' style='font-size:2rem'>🧮 Carbon Calculator</div>",
@@ -130,43 +135,29 @@ def show():
 
     # ── ENCODE VALUES (matching the training data encoding) ─────────────────
 
-    # Map categorical values to encoded integers
-    encode_map = {
-        'body_type': {'normal': 0, 'obese': 1, 'overweight': 2, 'underweight': 3},
-        'sex': {'female': 0, 'male': 1},
-        'diet': {'omnivore': 0, 'pescatarian': 1, 'vegan': 2, 'vegetarian': 3},
-        'how_often_shower': {'daily': 0, 'less frequently': 1, 'more frequently': 2, 'twice a day': 3},
-        'heating_energy_source': {'coal': 0, 'electricity': 1, 'natural gas': 2, 'wood': 3},
-        'transport': {'private': 0, 'public': 1, 'walk/bicycle': 2},
-        'vehicle_type': {'diesel': 0, 'electric': 1, 'hybrid': 2, 'lpg': 3, 'none': 4, 'petrol': 5},
-        'social_activity': {'never': 0, 'often': 1, 'sometimes': 2},
-        'frequency_of_traveling_by_air': {'frequently': 0, 'never': 1, 'rarely': 2, 'very frequently': 3},
-        'waste_bag_size': {'extra large': 0, 'large': 1, 'medium': 2, 'small': 3},
-        'energy_efficiency': {'No': 0, 'Sometimes': 1, 'Yes': 2},
-    }
-
-    # Create input dictionary with encoded values
-    user_inputs = {
-        'body_type': encode_map['body_type'][body_type],
-        'sex': encode_map['sex'][sex],
-        'diet': encode_map['diet'][diet],
-        'how_often_shower': encode_map['how_often_shower'][shower_freq],
-        'heating_energy_source': encode_map['heating_energy_source'][heating_source],
-        'transport': encode_map['transport'][transport],
-        'vehicle_type': encode_map['vehicle_type'][vehicle_type],
-        'social_activity': encode_map['social_activity'][social_activity],
-        'monthly_grocery_bill': grocery_bill,
-        'frequency_of_traveling_by_air': encode_map['frequency_of_traveling_by_air'][air_travel],
-        'vehicle_monthly_distance_km': vehicle_distance,
-        'waste_bag_size': encode_map['waste_bag_size'][waste_bag_size],
-        'waste_bag_weekly_count': waste_bags_weekly,
-        'how_long_tv_pc_daily_hour': tv_pc_hours,
-        'how_many_new_clothes_monthly': new_clothes_monthly,
-        'how_long_internet_daily_hour': internet_hours,
-        'energy_efficiency': encode_map['energy_efficiency'][energy_efficient],
-        'transport_distance_interaction': encode_map['transport'][transport] * vehicle_distance,
-        'energy_efficiency_heating': encode_map['energy_efficiency'][energy_efficient] * encode_map['heating_energy_source'][heating_source],
-    }
+    with timed('calculator_encode_seconds'):
+        # Create input dictionary with encoded values (ENCODE_MAP is shared with the batch paths)
+        user_inputs = {
+            'body_type': ENCODE_MAP['body_type'][body_type],
+            'sex': ENCODE_MAP['sex'][sex],
+            'diet': ENCODE_MAP['diet'][diet],
+            'how_often_shower': ENCODE_MAP['how_often_shower'][shower_freq],
+            'heating_energy_source': ENCODE_MAP['heating_energy_source'][heating_source],
+            'transport': ENCODE_MAP['transport'][transport],
+            'vehicle_type': ENCODE_MAP['vehicle_type'][vehicle_type],
+            'social_activity': ENCODE_MAP['social_activity'][social_activity],
+            'monthly_grocery_bill': grocery_bill,
+            'frequency_of_traveling_by_air': ENCODE_MAP['frequency_of_traveling_by_air'][air_travel],
+            'vehicle_monthly_distance_km': vehicle_distance,
+            'waste_bag_size': ENCODE_MAP['waste_bag_size'][waste_bag_size],
+            'waste_bag_weekly_count': waste_bags_weekly,
+            'how_long_tv_pc_daily_hour': tv_pc_hours,
+            'how_many_new_clothes_monthly': new_clothes_monthly,
+            'how_long_internet_daily_hour': internet_hours,
+            'energy_efficiency': ENCODE_MAP['energy_efficiency'][energy_efficient],
+            'transport_distance_interaction': ENCODE_MAP['transport'][transport] * vehicle_distance,
+            'energy_efficiency_heating': ENCODE_MAP['energy_efficiency'][energy_efficient] * ENCODE_MAP['heating_energy_source'][heating_source],
+        }
 
     # Store in session state
     st.session_state['user_inputs'] = user_inputs
@@ -181,6 +172,7 @@ def show():
 
     estimated_total = car_emissions + air_emissions + diet_emissions + energy_emissions + lifestyle_emissions
     st.session_state['estimated_co2'] = estimated_total
+    precompute(user_inputs, settle_s=SETTLE_S)     # models run in the background while the user reads on
 
     # ── RESULT DISPLAY ───────────────────────────────────────────────────────
 
@@ -229,8 +221,49 @@ def show():
         st.metric("Time Equivalent", f"{months:.1f} mo", "of avg person")
 
     st.markdown("<br>", unsafe_allow_html=True)
+    # the sliders allow answers the models never saw (e.g. a $450 grocery bill) — say so
+    for message in load_schema().check(user_inputs).messages():
+        st.warning(f"⚠️ {message}")
     st.success("✅ Your data is saved! Go to **🤖 AI Prediction** to see what the trained ML models predict for you.")
     
     st.info("💡 **How the estimate works:** We use emission factors from IPCC/IEA for each category. "
             "The ML model in the next page uses your exact input pattern to predict more accurately based on "
-            "10,000 real profiles.")
\ No newline at end of file
+            "10,000 real profiles.")
+    show_group(user_inputs)
+
+
+def show_group(user_inputs):
+    """Household / team members — each one the answers above at the time they were added"""
+    from engine.features import DECODE_MAP
+    from engine.group import MAX_MEMBERS
+    from engine.session import session_group
+
+    group = session_group()
+    st.markdown("<hr style='border-color:#1f3320'>", unsafe_allow_html=True)
+    st.markdown("#### 👪 Household & Team")
+    st.markdown("<p style='color:#6b7280; font-size:0.85rem'>Fill in the form for each person and add them "
+                "here — Analytics and Recommendations then compare members and show the group total.</p>",
+                unsafe_allow_html=True)
+
+    c1, c2 = st.columns([3, 1], gap="medium")
+    with c1:
+        name = st.text_input("Member name", value=f"Member {len(group) + 1}", max_chars=40,
+                             key=f"member_name_{len(group)}")
+    with c2:
+        st.markdown("<div style='height:1.75rem'></div>", unsafe_allow_html=True)
+        if st.button("➕ Add member", disabled=len(group) >= MAX_MEMBERS, use_container_width=True):
+            group.add(name.strip() or f"Member {len(group) + 1}", user_inputs)
+            st.rerun()
+
+    for i, (member, row) in enumerate(zip(group.names, group.rows())):
+        c1, c2, c3 = st.columns([2, 4, 1])
+        c1.markdown(f"**{member}**")
+        c2.markdown(f"<span style='color:#9ca3af; font-size:0.85rem'>"
+                    f"{DECODE_MAP['transport'][int(row['transport'])]} · "
+                    f"{row['vehicle_monthly_distance_km']:,.0f} km/mo · "
+                    f"{DECODE_MAP['diet'][int(row['diet'])]} · "
+                    f"flies {DECODE_MAP['frequency_of_traveling_by_air'][int(row['frequency_of_traveling_by_air'])]}"
+                    f"</span>", unsafe_allow_html=True)
+        if c3.button("✕", key=f"remove_member_{i}", help=f"Remove {member}"):
+            group.remove(i)
+            st.rerun()
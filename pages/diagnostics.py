@@ -0,0 +1,99 @@
+"""
+Diagnostics Page — hidden operator view (open the app with ?diagnostics=1)
+"""
+import streamlit as st
+
+
+def show():
+    st.markdown("<div class='hero-title' style='font-size:2rem'>🩺 Diagnostics</div>",
+                unsafe_allow_html=True)
+    st.markdown(
+        "<p style='color:#6b7280; margin-bottom:1.5rem'>"
+        "Process-wide caches and counters. Numbers are shared by every session on this server.</p>",
+        unsafe_allow_html=True)
+
+    # ── FIGURE CACHE ─────────────────────────────────────────────────────────
+
+    from pages.analytics import get_figure_cache
+    stats = get_figure_cache().stats()
+
+    st.markdown("#### 🖼️ Analytics Figure Cache")
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Hit Rate", f"{stats['hit_rate'] * 100:.1f}%", f"{stats['hits']:,} hits")
+    c2.metric("Misses", f"{stats['misses']:,}", "figures built")
+    c3.metric("Entries", f"{stats['entries']:,}", f"of {stats['max_entries']:,} max")
+    c4.metric("Evictions", f"{stats['evictions']:,}", f"{stats['bytes'] / 1024:,.0f} KB held")
+
+    if st.button("Clear figure cache"):
+        get_figure_cache().clear()
+        st.rerun()
+
+    # ── INPUT DRIFT ──────────────────────────────────────────────────────────
+
+    from engine.drift import ALERT, MIN_SAMPLES, PSI_ALERT, PSI_WATCH, WATCH, WINDOW
+    from engine.session import get_drift_monitor
+
+    st.markdown("#### 📉 Input Drift")
+    monitor = get_drift_monitor()
+    if monitor is None:
+        st.info("No training reference yet — `python train_models.py` writes models/drift_reference.json.")
+    else:
+        monitor.refresh()
+        report = monitor.report()
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Requests Seen", f"{max(r['seen'] for r in report if r['feature'] != 'prediction'):,}",
+                  f"window {WINDOW:,}–{2 * WINDOW:,}", delta_color="off")
+        c2.metric("Alerts", sum(r['status'] == ALERT for r in report), f"PSI ≥ {PSI_ALERT} or KS",
+                  delta_color="off")
+        c3.metric("Watch", sum(r['status'] == WATCH for r in report), f"PSI ≥ {PSI_WATCH}", delta_color="off")
+        st.dataframe([{
+            'feature': r['feature'], 'status': r['status'], 'window n': r['n'],
+            'PSI': None if r['psi'] is None else round(r['psi'], 4),
+            'noise floor': None if r['psi'] is None else round(r['noise'], 4),
+            'KS': None if r['ks'] is None else round(r['ks'], 4),
+        } for r in report], hide_index=True, use_container_width=True)
+        st.caption(f"Scores need {MIN_SAMPLES:,} scored requests in the window; PSI thresholds apply above the "
+                   f"noise floor a window that size shows with no drift at all.")
+
+        feature = st.selectbox("Compare with training", monitor.features)
+        import plotly.graph_objects as go
+        from pages.analytics import PLOTLY_THEME
+        labels, reference, live, lifetime = monitor.histogram(feature)
+        fig = go.Figure()
+        for name, share, color in (("Training", reference, '#6b7280'), ("Live window", live, '#22c55e'),
+                                   ("Lifetime", lifetime, '#2dd4bf')):
+            fig.add_trace(go.Bar(x=labels, y=share, name=name, marker_color=color,
+                                 hovertemplate='%{x}: %{y:.1%}<extra>' + name + '</extra>'))
+        fig.update_layout(**PLOTLY_THEME, height=320, barmode='group', yaxis_tickformat='.0%')
+        st.plotly_chart(fig, use_container_width=True)
+
+    # ── LATENCY & COUNTERS ───────────────────────────────────────────────────
+
+    from engine.metrics import ENABLED, REGISTRY
+
+    st.markdown("#### ⏱️ Latency")
+    if not ENABLED:
+        st.info("Instrumentation is off (`CARBON_METRICS=0`).")
+    histograms = [{
+        'metric': name,
+        'labels': ', '.join(f"{k}={v}" for k, v in labels.items()),
+        'count': s['count'],
+        'mean ms': round(s['mean'] * 1000, 2),
+        'p50 ms': round(s['p50'] * 1000, 2),
+        'p95 ms': round(s['p95'] * 1000, 2),
+        'p99 ms': round(s['p99'] * 1000, 2),
+    } for name, labels, s in REGISTRY.histograms()]
+    if histograms:
+        st.dataframe(histograms, hide_index=True, use_container_width=True)
+    else:
+        st.caption("Nothing recorded yet on this server.")
+
+    counters = [{'metric': name, 'labels': ', '.join(f"{k}={v}" for k, v in labels.items()), 'value': value}
+                for name, labels, value in REGISTRY.counters()]
+    if counters:
+        st.markdown("#### 🔢 Counters")
+        st.dataframe(counters, hide_index=True, use_container_width=True)
+
+    with st.expander("Prometheus exposition"):
+        st.caption("Also served on `CARBON_METRICS_PORT` (/metrics) or written to `CARBON_METRICS_FILE` when set.")
+        st.code(REGISTRY.render(), language="text")
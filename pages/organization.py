@@ -0,0 +1,158 @@
+"""
+Organization Page — bulk employee CSV scored in streaming batches
+"""
+import streamlit as st
+
+from engine.batch import CHUNK_ROWS, REQUIRED, score_csv, template_csv
+from engine.metrics import inc, timed
+from engine.scoring import serving
+
+
+def build_cluster_mix(clusters):
+    import plotly.graph_objects as go
+    from pages.analytics import CLUSTER_COLORS, PLOTLY_THEME
+    names = [n for n, c in clusters.items() if c['count']]
+    fig = go.Figure(go.Pie(
+        labels=names, values=[clusters[n]['count'] for n in names], hole=0.55,
+        marker=dict(colors=[CLUSTER_COLORS.get(n, '#2dd4bf') for n in names]),
+        customdata=[clusters[n]['mean_kg'] for n in names],
+        hovertemplate='<b>%{label}</b><br>%{value:,} employees<br>mean %{customdata:,.0f} kg<extra></extra>'))
+    fig.update_layout(**PLOTLY_THEME, height=320, showlegend=True)
+    return fig
+
+
+def build_distribution(edges, counts):
+    import plotly.graph_objects as go
+    from pages.analytics import PLOTLY_THEME
+    fig = go.Figure(go.Bar(x=edges + 50, y=counts, marker_color='#22c55e', width=90,
+                           hovertemplate='%{x:,.0f} kg: %{y:,} employees<extra></extra>'))
+    fig.update_layout(**PLOTLY_THEME, height=320, xaxis_title='kg CO₂ / year', yaxis_title='Employees')
+    return fig
+
+
+def build_groups(groups, limit=20):
+    import plotly.graph_objects as go
+    from pages.analytics import PLOTLY_THEME
+    top = sorted(groups.items(), key=lambda g: g[1]['total_kg'], reverse=True)[:limit][::-1]
+    fig = go.Figure(go.Bar(
+        x=[g['total_kg'] / 1000 for _, g in top], y=[name for name, _ in top], orientation='h',
+        marker_color='#2dd4bf', customdata=[[g['count'], g['mean_kg']] for _, g in top],
+        hovertemplate='<b>%{y}</b><br>%{x:,.1f} t CO₂ / year<br>%{customdata[0]:,} employees · '
+                      'mean %{customdata[1]:,.0f} kg<extra></extra>'))
+    fig.update_layout(**PLOTLY_THEME, height=max(260, 28 * len(top)), xaxis_title='t CO₂ / year')
+    return fig
+
+
+def score_upload(upload, models, monitor=None):
+    """Stream the upload through the models with a progress bar → (summary dict, stats) or None"""
+    bar = st.progress(0.0, text="Reading upload…")
+    summary = stats = None
+    try:
+        with timed('org_batch_seconds'):
+            for summary, stats in score_csv(upload, models, monitor=monitor):
+                bar.progress(stats['fraction'], text=f"Scored {stats['rows_read']:,} rows · "
+                                                     f"{stats['rows_per_s']:,.0f} rows/s")
+    except ValueError as e:          # missing columns, empty or unparsable file
+        bar.empty()
+        st.error(f"❌ {e}")
+        return None
+    bar.empty()
+    if summary is None or not (summary.rows or summary.invalid):
+        st.warning("⚠️ The file has a header but no rows.")
+        return None
+    inc('org_rows_total', summary.rows)
+    return summary.to_dict(), dict(stats)
+
+
+def show():
+    st.markdown("<div class='hero-title' style='font-size:2rem'>🏢 Organization Footprint</div>",
+                unsafe_allow_html=True)
+    st.markdown(
+        "<p style='color:#6b7280; margin-bottom:1.5rem'>"
+        "Upload one row per employee — the same questions as the Calculator — and every row is "
+        "scored by the trained ensemble and clustered, in streaming batches.</p>",
+        unsafe_allow_html=True)
+
+    from pages.predictions import session_models
+    models, error = session_models()
+    if error:
+        st.error(error)
+        st.code("python train_models.py", language="bash")
+        return
+
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        upload = st.file_uploader("Employee CSV", type=['csv'],
+                                  help="Raw answers ('private', 'petrol', …) or encoded codes both work. "
+                                       "Optional columns: employee_id, department.")
+    with c2:
+        st.download_button("⬇️ CSV template", template_csv(), file_name='employees_template.csv', mime='text/csv')
+        with st.popover("Required columns"):
+            st.markdown('\n'.join(f"- `{c}`" for c in REQUIRED))
+
+    if upload is None:
+        st.info(f"💡 Files are read {CHUNK_ROWS:,} rows at a time, so uploads of hundreds of "
+                f"thousands of employees stay within a fixed memory budget.")
+        return
+
+    key = (upload.file_id, serving(models))
+    if st.session_state.get('org_key') != key:
+        from engine.session import get_drift_monitor
+        # each upload feeds the drift monitor once, not again when the served model changes
+        first = st.session_state.get('org_observed') != upload.file_id
+        scored = score_upload(upload, models, get_drift_monitor() if first else None)
+        if scored is None:
+            return
+        st.session_state['org_observed'] = upload.file_id
+        st.session_state['org_result'], st.session_state['org_key'] = scored, key
+    result, stats = st.session_state['org_result']
+
+    # ── ORG AGGREGATES ───────────────────────────────────────────────────────
+
+    cols = st.columns(4)
+    cols[0].metric("Employees Scored", f"{result['rows']:,}",
+                   f"{result['invalid']:,} rejected" if result['invalid'] else "all rows valid",
+                   delta_color="inverse" if result['invalid'] else "normal")
+    cols[1].metric("Total Footprint", f"{result['total_kg'] / 1000:,.0f} t", "CO₂ per year")
+    cols[2].metric("Per Employee", f"{result['mean_kg']:,.0f} kg",
+                   f"median ≈ {result['p50']:,.0f} kg", delta_color="off")
+    cols[3].metric("Throughput", f"{stats['rows_per_s']:,.0f}", "rows / s")
+
+    if result['invalid']:
+        with st.expander(f"⚠️ {result['invalid']:,} rows skipped by validation"):
+            st.dataframe([{'check': c, 'rows': n} for c, n in result['errors'].items()],
+                         hide_index=True, use_container_width=True)
+            st.markdown("First rejected rows")
+            st.dataframe([{k: e[k] for k in ('line', 'column', 'value', 'message')} for e in result['examples']],
+                         hide_index=True, use_container_width=True)
+    if result['warned']:
+        with st.expander(f"ℹ️ {result['warned']:,} rows scored with warnings"):
+            st.caption("Outside the training data's range or internally inconsistent — these "
+                       "predictions are extrapolations.")
+            st.dataframe([{'check': c, 'rows': n} for c, n in result['warnings'].items()],
+                         hide_index=True, use_container_width=True)
+
+    if not result['rows']:
+        return
+
+    c1, c2 = st.columns(2, gap="large")
+    with c1:
+        st.markdown("##### 🧩 Cluster Mix")
+        st.plotly_chart(build_cluster_mix(result['clusters']), use_container_width=True)
+    with c2:
+        st.markdown("##### 📈 Footprint Distribution")
+        st.plotly_chart(build_distribution(*result['hist']), use_container_width=True)
+        st.caption(f"10th–90th percentile: {result['p10']:,.0f} – {result['p90']:,.0f} kg (±50 kg)")
+
+    if result['groups']:
+        st.markdown("##### 🏬 By Department")
+        st.plotly_chart(build_groups(result['groups']), use_container_width=True)
+
+    # ── TOP EMITTERS ─────────────────────────────────────────────────────────
+
+    st.markdown(f"##### 🔥 Top {len(result['top'])} Emitters")
+    st.dataframe([{'employee': ident, 'kg CO₂ / year': round(kg), 'cluster': cluster}
+                  for kg, ident, cluster in result['top']], hide_index=True, use_container_width=True)
+
+    st.caption(f"{stats['rows_read']:,} rows in {stats['seconds']:.1f} s — read + encode "
+               f"{stats['parse_s']:.1f} s, scoring {stats['score_s']:.1f} s, {CHUNK_ROWS:,} rows per batch.")
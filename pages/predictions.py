@@ -8,22 +8,49 @@ import numpy as np
 import joblib
 import json
 import os
+from datetime import date
+
+from engine.assign import ClusterAssigner
+from engine.compact_trees import FORMATS, load_compact
+from engine.distill import STUDENT_INFO_PATH, STUDENT_PATH
+from engine.explain import PERMUTATION_PATH, Explainer
+from engine.features import DECODE_MAP, rows_to_frame
+from engine.manifest import load_manifest
+from engine.metrics import timed
+from engine.projection import DEFAULT_RMSE, simulate
+from engine.scoring import assign_clusters, predict_models, serving
+from engine.session import history_saved, inputs_hash, observe_scored, precomputed, record_history
+from engine.shared_models import load_shared
+from engine.validation import ERROR, ValidationError, load_schema
 
 
 # ── Load models once and cache ─────────────────────────────────────────────────
 
-@st.cache_resource
-def load_models():
+def _load_models():
     models = {}
+    # CARBON_MODEL_FORMAT=float32|int16 serves the forests from compact node arrays,
+    # =shared attaches every worker on the host to one memory-mapped float32 bundle
+    fmt = os.environ.get('CARBON_MODEL_FORMAT', 'pickle')
+    compact = {name: load_compact(name, fmt) for name in ('random_forest', 'xgboost')} if fmt in FORMATS else {}
     try:
-        models['rf']     = joblib.load('models/random_forest.pkl')
-        models['kmeans'] = joblib.load('models/kmeans.pkl')
-        models['scaler'] = joblib.load('models/scaler.pkl')
-        models['xgb']    = joblib.load('models/xgboost.pkl')
+        shared = load_shared() if fmt == 'shared' else {}
+        models['rf']     = shared.get('random_forest') or compact.get('random_forest') or joblib.load('models/random_forest.pkl')
+        models['kmeans'] = None if shared else joblib.load('models/kmeans.pkl')
+        models['scaler'] = shared.get('scaler') or joblib.load('models/scaler.pkl')
+        models['xgb']    = shared.get('xgboost') or compact.get('xgboost') or joblib.load('models/xgboost.pkl')
         with open('models/cluster_label_map.json') as f:
             models['cluster_map'] = json.load(f)
         with open('models/feature_names.json') as f:
             models['features'] = json.load(f)
+        models['assigner'] = shared.get('assigner') or ClusterAssigner.load()
+        models['explainer'] = Explainer.load()
+        if os.path.exists(PERMUTATION_PATH):
+            models['permutation'] = pd.read_csv(PERMUTATION_PATH)
+        models['student'] = joblib.load(STUDENT_PATH) if os.path.exists(STUDENT_PATH) else None
+        if os.path.exists(STUDENT_INFO_PATH):
+            with open(STUDENT_INFO_PATH) as f:
+                models['student_info'] = json.load(f)
+        models['serving'] = os.environ.get('CARBON_SERVING_MODEL', 'ensemble')
         try:
             models['fi'] = pd.read_csv('models/feature_importance.csv')
         except:
@@ -33,10 +60,148 @@ def load_models():
         return None, f"⚠️ Models not found. Please run `python train_models.py` first.\nError: {e}"
 
 
+@st.cache_resource(show_spinner=False)     # also called from precompute threads
+def load_models():
+    with timed('load_models_seconds'):
+        return _load_models()
+
+
+def session_models():
+    """Cached models with this session's serving choice (ensemble / student) applied"""
+    models, error = load_models()
+    if models is None:
+        return models, error
+    return {**models, 'serving': st.session_state.get('serving_model', models['serving'])}, error
+
+
+def serving_selector(models):
+    """Served-model picker, shown only when a distilled student was trained"""
+    if models.get('student') is None:
+        return
+    options = {'ensemble': "🔮 Ensemble (RF + XGBoost)", 'student': "🎓 Distilled student"}
+    current = st.session_state.get('serving_model', models['serving'])
+    choice = st.selectbox("Serving model", list(options), format_func=options.get,
+                          index=list(options).index(current) if current in options else 0)
+    st.session_state['serving_model'] = choice
+    info = models.get('student_info')
+    if info:
+        s, t = info['student'], info['teacher']
+        st.caption(f"Student: {info['name']} on {len(info['features'])} features · "
+                   f"R² {s['r2']:.4f} vs {t['r2']:.4f} ensemble · {s['bytes'] / 1e3:,.0f} KB · "
+                   f"{s['single_us']:,.0f} µs per prediction")
+
+
 def make_input_df(inputs, features):
-    """Convert user inputs dict to DataFrame matching training features"""
-    row = [inputs[feat] for feat in features]
-    return pd.DataFrame([row], columns=features)
+    """Validate, then convert user inputs dict to DataFrame matching the (possibly pruned) training features"""
+    report = load_schema().check(inputs, required=features)
+    if not report.ok:
+        raise ValidationError(report)
+    return rows_to_frame([inputs], features)
+
+
+def model_cards(rf_pred, ensemble, xgb_pred):
+    """RF / ensemble / XGBoost side by side"""
+    c1, c2, c3 = st.columns(3, gap="medium")
+
+    with c1:
+        st.markdown(f"""
+        <div class='co2-meter'>
+            <div style='font-size:0.7rem; color:#6b7280'>🌲 Random Forest</div>
+            <div style='font-family:Syne,sans-serif; font-size:2.5rem; font-weight:800; color:#22c55e'>{rf_pred:,.0f}</div>
+            <div style='font-size:0.8rem; color:#6b7280'>kg CO₂ / year</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with c2:
+        st.markdown(f"""
+        <div class='co2-meter' style='border-color:#2dd4bf'>
+            <div style='font-size:0.7rem; color:#6b7280'>🔮 Ensemble</div>
+            <div style='font-family:Syne,sans-serif; font-size:2.5rem; font-weight:800; color:#2dd4bf'>{ensemble:,.0f}</div>
+            <div style='font-size:0.8rem; color:#6b7280'>kg CO₂ / year</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with c3:
+        st.markdown(f"""
+        <div class='co2-meter'>
+            <div style='font-size:0.7rem; color:#6b7280'>🚀 XGBoost</div>
+            <div style='font-family:Syne,sans-serif; font-size:2.5rem; font-weight:800; color:#a3e635'>{xgb_pred:,.0f}</div>
+            <div style='font-size:0.8rem; color:#6b7280'>kg CO₂ / year</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+
+TRANSPORT_WORDS = {'private': 'car', 'public': 'public transport', 'walk/bicycle': 'foot or bicycle'}
+
+
+def show_explanation(explainer, cluster_id, cluster_label, inputs):
+    """Precomputed path contributions for the user's cohort — a lookup, no model calls"""
+    contrib, source, n = explainer.explain(cluster_id, inputs)
+    top = contrib[contrib.abs().sort_values(ascending=False).index[:8]]
+    top.index = [f.replace('_', ' ') for f in top.index]
+
+    who = f"{n:,} {cluster_label.lower()}s"
+    if source == 'cohort':
+        transport = TRANSPORT_WORDS.get(DECODE_MAP['transport'].get(inputs['transport']), 'car')
+        air = DECODE_MAP['frequency_of_traveling_by_air'].get(inputs['frequency_of_traveling_by_air'], '')
+        who += f" who travel by {transport} and fly {air}"
+
+    st.markdown("#### 🔍 What Drives Predictions Like Yours")
+    st.caption(f"Average Random Forest contribution per feature (kg CO₂/year, relative to the "
+               f"{explainer.bias:,.0f} kg baseline) across {who}.")
+    st.bar_chart(top.rename('kg CO₂ / year'), color="#22c55e", horizontal=True)
+
+
+def show_permutation(permutation):
+    """Model-wide view next to the cohort one — holdout R² lost when each input is shuffled"""
+    with st.expander("🌐 What the ensemble relies on overall"):
+        top = permutation.head(8).set_index('feature')['importance']
+        top.index = [f.replace('_', ' ') for f in top.index]
+        st.caption("Drop in holdout R² of the 0.6·RF + 0.4·XGBoost ensemble when each input is "
+                   "shuffled — the same for every user, unlike the cohort view above.")
+        st.bar_chart(top.rename('R² lost'), color="#2dd4bf", horizontal=True)
+
+
+PROJECTION_BUDGET_S = 1.0
+SCENARIO_COLORS = {'Business as Usual': ('#f87171', 'rgba(248,113,113,'), 'With Actions': ('#22c55e', 'rgba(34,197,94,')}
+
+
+def build_projection(fans, first_year):
+    """Median line plus 25–75 and 10–90 percentile bands per scenario"""
+    import plotly.graph_objects as go
+    from pages.analytics import PLOTLY_THEME
+    years = list(range(first_year, first_year + fans[next(iter(fans))].shape[1]))
+    fig = go.Figure()
+    for name, (p10, p25, p50, p75, p90) in fans.items():
+        line, fill = SCENARIO_COLORS.get(name, ('#2dd4bf', 'rgba(45,212,191,'))
+        for lo, hi, alpha in ((p10, p90, 0.12), (p25, p75, 0.25)):
+            fig.add_trace(go.Scatter(x=years, y=hi, mode='lines', line=dict(width=0),
+                                     showlegend=False, hoverinfo='skip'))
+            fig.add_trace(go.Scatter(x=years, y=lo, mode='lines', line=dict(width=0), fill='tonexty',
+                                     fillcolor=f'{fill}{alpha})', showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=years, y=p50, mode='lines+markers', name=name,
+                                 line=dict(color=line, width=2.5),
+                                 hovertemplate='%{x}: %{y:,.0f} kg (median)<extra>' + name + '</extra>'))
+    fig.update_layout(**PLOTLY_THEME, height=340, yaxis_title='kg CO₂ / year',
+                      legend=dict(orientation='h', y=1.08))
+    return fig
+
+
+def show_projection(models, inputs):
+    """Monte Carlo fan chart — recomputed only when the inputs or served model change"""
+    key = (inputs_hash(inputs), serving(models))
+    if st.session_state.get('projection_key') != key:
+        holdout = load_manifest().get('holdout', {}).get('ensemble', {})
+        st.session_state['projection'] = simulate(
+            models, inputs, models['features'], rmse=holdout.get('rmse', DEFAULT_RMSE),
+            budget_s=PROJECTION_BUDGET_S, seed=int(key[0][:8], 16))
+        st.session_state['projection_key'] = key
+    fans, stats = st.session_state['projection']
+
+    st.markdown("#### 📅 5-Year Projection")
+    st.plotly_chart(build_projection(fans, date.today().year), use_container_width=True)
+    st.caption(f"Median and 50% / 80% bands of {stats['trajectories']:,} simulated trajectories "
+               f"({stats['unique_rows']:,} distinct model inputs scored in {stats['ms']:,.0f} ms).")
 
 
 def show():
@@ -52,6 +217,8 @@ def show():
         st.error(error)
         st.code("python train_models.py", language="bash")
         return
+    serving_selector(models)
+    models, _ = session_models()
 
     if 'user_inputs' not in st.session_state:
         st.warning("⚠️ Please go to **🧮 Calculator** first and fill in your data.")
@@ -62,21 +229,24 @@ def show():
 
     try:
         input_df = make_input_df(inputs, models['features'])
-    except KeyError as e:
-        st.error(f"Feature mismatch: {e}")
+    except ValidationError as e:
+        st.error("❌ These inputs can't be scored:\n\n" + '\n'.join(f"- {m}" for m in e.report.messages(ERROR)))
         return
 
-    rf_pred  = models['rf'].predict(input_df)[0]
-    xgb_pred = models['xgb'].predict(input_df)[0]
-    ensemble = (rf_pred * 0.6 + xgb_pred * 0.4)
-
-    x_scaled = models['scaler'].transform(input_df)
-    cluster_id = str(models['kmeans'].predict(x_scaled)[0])
-    cluster_label = models['cluster_map'].get(cluster_id, "Medium Emitter")
+    # usually finished in the background while the user was still on the Calculator
+    results = precomputed(inputs, stages=('scores', 'cluster', 'projection'))
+    if results is not None:
+        scores, (cluster_ids, cluster_labels) = results['scores'], results['cluster']
+    else:
+        scores = predict_models(models, input_df)
+        cluster_ids, cluster_labels = assign_clusters(models, input_df)
+    ensemble = float(scores['ensemble'][0])
+    cluster_label = cluster_labels[0]
 
-    st.session_state['rf_pred'] = rf_pred
+    st.session_state['rf_pred'] = float(scores['rf'][0]) if 'rf' in scores else ensemble
     st.session_state['ensemble_pred'] = ensemble
     st.session_state['cluster'] = cluster_label
+    observe_scored(inputs, ensemble)
 
     if 'Low' in cluster_label:
         color = "#22c55e"
@@ -86,35 +256,17 @@ def show():
         color = "#f87171"
 
     st.markdown("### 🎯 ML Model Predictions")
-    
-    c1, c2, c3 = st.columns(3, gap="medium")
-
-    with c1:
-        st.markdown(f"""
-        <div class='co2-meter'>
-            <div style='font-size:0.7rem; color:#6b7280'>🌲 Random Forest</div>
-            <div style='font-family:Syne,sans-serif; font-size:2.5rem; font-weight:800; color:#22c55e'>{rf_pred:,.0f}</div>
-            <div style='font-size:0.8rem; color:#6b7280'>kg CO₂ / year</div>
-        </div>
-        """, unsafe_allow_html=True)
 
-    with c2:
+    if serving(models) == 'student':
         st.markdown(f"""
         <div class='co2-meter' style='border-color:#2dd4bf'>
-            <div style='font-size:0.7rem; color:#6b7280'>🔮 Ensemble</div>
+            <div style='font-size:0.7rem; color:#6b7280'>🎓 Distilled Student</div>
             <div style='font-family:Syne,sans-serif; font-size:2.5rem; font-weight:800; color:#2dd4bf'>{ensemble:,.0f}</div>
             <div style='font-size:0.8rem; color:#6b7280'>kg CO₂ / year</div>
         </div>
         """, unsafe_allow_html=True)
-
-    with c3:
-        st.markdown(f"""
-        <div class='co2-meter'>
-            <div style='font-size:0.7rem; color:#6b7280'>🚀 XGBoost</div>
-            <div style='font-family:Syne,sans-serif; font-size:2.5rem; font-weight:800; color:#a3e635'>{xgb_pred:,.0f}</div>
-            <div style='font-size:0.8rem; color:#6b7280'>kg CO₂ / year</div>
-        </div>
-        """, unsafe_allow_html=True)
+    else:
+        model_cards(float(scores['rf'][0]), ensemble, float(scores['xgb'][0]))
 
     st.markdown("<br>", unsafe_allow_html=True)
 
@@ -133,23 +285,21 @@ def show():
     </div>
     """, unsafe_allow_html=True)
 
-    st.markdown("<br>", unsafe_allow_html=True)
-
-    years = list(range(2025, 2031))
-    business_as_usual = [round(ensemble * (1 + 0.015)**i) for i in range(6)]
-    with_actions = [round(ensemble * (0.95 - 0.08 * i)) for i in range(6)]
-    with_actions = [max(x, 500) for x in with_actions]
+    # Only saved predictions enter the history — not every answer the Calculator passes through
+    if st.button("💾 Save this prediction to my history", disabled=history_saved('prediction', inputs)):
+        record_history('prediction', ensemble, inputs, cluster=cluster_label)
+    if history_saved('prediction', inputs):
+        st.caption("✅ Saved — your monthly trend on 📊 Analytics averages the predictions you save.")
 
-    projection_df = pd.DataFrame({
-        'Year': years,
-        'Business as Usual': business_as_usual,
-        'With Actions': with_actions,
-    })
+    st.markdown("<br>", unsafe_allow_html=True)
 
-    st.markdown("#### 📅 5-Year Projection")
-    st.line_chart(projection_df.set_index('Year'), color=['#f87171', '#22c55e'])
+    show_projection(models, inputs)
 
-    if 'fi' in models:
+    if models.get('explainer') is not None:
+        show_explanation(models['explainer'], int(cluster_ids[0]), cluster_label, inputs)
+        if 'permutation' in models:
+            show_permutation(models['permutation'])
+    elif 'fi' in models:
         st.markdown("#### 🔍 Top Features")
         fi = models['fi'].head(10)
         st.bar_chart(fi.set_index('feature')['importance'], color="#22c55e", horizontal=True)
@@ -1,8 +1,18 @@
 """
 Recommendations Page — AI-powered personalized action plan
 """
+import time
+
+import numpy as np
 import streamlit as st
 
+from engine.counterfactual import best_per_group, combine, impact_label, rank_actions
+from engine.features import rows_to_frame, with_interactions
+from engine.neighbors import differences, load_index, lower_emitters, query
+from engine.planner import PARIS_TARGET, plan_to_target
+from engine.scoring import predict_ensemble, serving
+from engine.session import inputs_hash, precomputed, scored_group, session_group
+
 
 RECOMMENDATIONS = {
     'Low Emitter': {
@@ -80,6 +90,189 @@ RECOMMENDATIONS = {
 }
 
 
+def rank_for_session():
+    """Counterfactual ranking for the calculator inputs, or None when models aren't trained"""
+    if 'user_inputs' not in st.session_state:
+        return None
+    from pages.predictions import session_models
+    models, error = session_models()
+    if error:
+        return None
+    inputs = st.session_state['user_inputs']
+    key = (inputs_hash(inputs), serving(models))
+    if st.session_state.get('ranking_key') != key:
+        st.session_state['ranking'] = rank_actions(models, inputs, models['features'])
+        st.session_state['ranking_key'] = key
+    return st.session_state['ranking']
+
+
+def combined_plan(ranking):
+    """Best action per group applied together and re-scored → (plan, predicted footprint)"""
+    from pages.predictions import session_models
+    models, _ = session_models()
+    baseline, ranked, _ = ranking
+    plan = best_per_group(ranked)
+    if not plan:
+        return plan, baseline
+    row = combine(st.session_state['user_inputs'], [r['action'] for r in plan])
+    return plan, float(predict_ensemble(models, rows_to_frame([row], models['features']))[0])
+
+
+def show_target_planner():
+    """Smallest set of changes that reaches a user-chosen footprint target"""
+    from pages.predictions import session_models
+    models, _ = session_models()
+    inputs = st.session_state['user_inputs']
+
+    st.markdown("<hr style='border-color:#1f3320'>", unsafe_allow_html=True)
+    st.markdown("#### 🧭 Minimum-Change Plan to Hit a Target")
+    target = st.number_input("Target footprint (kg CO₂/year)", min_value=300, max_value=10000,
+                             value=PARIS_TARGET, step=100,
+                             help="2,000 kg is the per-person Paris Agreement 2050 target")
+
+    key = (inputs_hash(inputs), int(target), serving(models))
+    if st.session_state.get('plan_key') != key:
+        st.session_state['plan_result'] = plan_to_target(models, inputs, models['features'], target=target)
+        st.session_state['plan_key'] = key
+    plans, stats = st.session_state['plan_result']
+
+    if stats['baseline'] <= target:
+        st.success(f"✅ Your predicted {stats['baseline']:,.0f} kg is already at or below {target:,} kg.")
+        return
+    if stats['reached']:
+        n = len(plans[0]['actions'])
+        st.markdown(f"<p style='color:#6b7280; font-size:0.85rem'>Smallest plans reaching "
+                    f"<strong style='color:#22c55e'>{target:,} kg</strong> need "
+                    f"<strong style='color:#e8f5e9'>{n} change{'s' if n > 1 else ''}</strong>:</p>",
+                    unsafe_allow_html=True)
+    else:
+        st.warning(f"No combination of up to 5 changes reaches {target:,} kg — closest plans shown.")
+
+    for i, plan in enumerate(plans[:3], 1):
+        steps = " + ".join(f"{a.icon} {a.title}" for a in plan['actions'])
+        st.markdown(f"""
+        <div class='tip-card'>
+            <div style='font-weight:600; color:#e8f5e9; font-size:0.9rem'>Plan {i}: {steps}</div>
+            <div style='color:#9ca3af; font-size:0.8rem; margin-top:0.3rem'>
+                Predicted {plan['predicted']:,.0f} kg/year · saves {plan['saving']:,.0f} kg
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    st.caption(f"Searched {stats['evaluations']:,} model evaluations in {stats['batches']} batches "
+               f"({stats['ms']:.0f} ms){' — stopped at budget' if stats['truncated'] else ''}.")
+
+
+@st.cache_resource
+def load_neighbors():
+    """Memory-mapped KD-tree + profiles (shared page cache across processes)"""
+    return load_index()
+
+
+def show_people_like_you():
+    """k most similar real profiles, and what the lower emitters among them do differently"""
+    from pages.predictions import session_models
+    index = load_neighbors()
+    if index is None:
+        return
+    models, _ = session_models()
+    inputs = with_interactions(st.session_state['user_inputs'])
+    reference = st.session_state.get('ensemble_pred') or st.session_state.get('estimated_co2', 0)
+
+    x_scaled = models['scaler'].transform(rows_to_frame([inputs], models['features']))
+    t0 = time.perf_counter()
+    idx, _ = query(index, x_scaled, k=25)
+    lower, rows = lower_emitters(index, idx[0], reference)
+    ms = (time.perf_counter() - t0) * 1000
+    n_lower = len(lower['carbonemission'])
+
+    st.markdown("<hr style='border-color:#1f3320'>", unsafe_allow_html=True)
+    st.markdown("#### 👥 People Like You")
+    st.markdown(f"<p style='color:#6b7280; font-size:0.85rem'>Of the {len(rows)} most similar real profiles, "
+                f"<strong style='color:#22c55e'>{n_lower}</strong> emit less than your predicted "
+                f"{reference:,.0f} kg.</p>", unsafe_allow_html=True)
+    if n_lower:
+        c1, c2 = st.columns(2)
+        c1.metric("Their median footprint", f"{np.median(lower['carbonemission']):,.0f} kg",
+                  f"{np.median(lower['carbonemission']) - reference:+,.0f} kg vs you", delta_color="inverse")
+        c2.metric("Profiles indexed", f"{len(index['profiles']):,}", f"{ms:.1f} ms lookup")
+        for d in differences(inputs, lower):
+            st.markdown(f"<div class='tip-card' style='font-size:0.85rem; color:#9ca3af'>{d['text']}</div>",
+                        unsafe_allow_html=True)
+
+
+def show_group_plan():
+    """Household / team actions — every member's counterfactuals in one batch, summed per action"""
+    from pages.predictions import session_models
+    group = session_group()
+    if not len(group):
+        return
+    models, error = session_models()
+    if error:
+        return
+    result = scored_group(models)
+    key = st.session_state['group_key']
+    if st.session_state.get('group_ranking_key') != key:
+        t0 = time.perf_counter()
+        ranking = group.rank(models)
+        st.session_state['group_ranking'] = (*ranking, (time.perf_counter() - t0) * 1000)
+        st.session_state['group_ranking_key'] = key
+    per_member, totals, ms = st.session_state['group_ranking']
+
+    st.markdown("<hr style='border-color:#1f3320'>", unsafe_allow_html=True)
+    st.markdown(f"#### 👪 Household & Team Plan — {len(group)} member{'s' if len(group) > 1 else ''}")
+    st.markdown(f"<p style='color:#6b7280; font-size:0.85rem; margin-bottom:1.25rem'>"
+                f"Group footprint <strong style='color:#e8f5e9'>{result['total_kg']:,.0f} kg CO₂/year</strong>. "
+                f"Each change is scored for every member it applies to — "
+                f"{sum(len(r) for _, r in per_member)} what-if scenarios in one batch ({ms:.0f} ms):</p>",
+                unsafe_allow_html=True)
+    for i, t in enumerate(totals[:5], 1):
+        a = t['action']
+        impact, imp_color = impact_label(t['saving'] / t['members'])
+        share = t['saving'] / result['total_kg'] * 100 if result['total_kg'] else 0.0
+        desc = (f"{a.desc} Applies to {t['members']} of {len(group)} — together "
+                f"<strong>{t['saving']:,.0f} kg CO₂/year</strong> ({share:.1f}% of the group).")
+        action_card(i, a.icon, a.title, desc, impact, imp_color)
+    if not totals:
+        st.info("🌟 None of the candidate changes lowers any member's predicted footprint.")
+
+    with st.expander("Per member"):
+        rows = []
+        for name, kg, cluster, (_, ranked) in zip(result['names'], result['kg'], result['clusters'], per_member):
+            best = next((r for r in ranked if r['saving'] > 0), None)
+            rows.append({'member': name, 'kg CO₂ / year': round(float(kg)), 'segment': cluster,
+                         'top change': best['action'].title if best else '—',
+                         'saving kg': round(best['saving']) if best else 0})
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+
+
+def action_card(i, icon, title, desc, impact, imp_color):
+    st.markdown(f"""
+    <div class='carbon-card' style='display:flex; gap:1rem; align-items:flex-start'>
+        <div style='
+            background:rgba(34,197,94,0.1); border:1px solid rgba(34,197,94,0.2);
+            border-radius:10px; width:44px; height:44px; min-width:44px;
+            display:flex; align-items:center; justify-content:center;
+            font-size:1.3rem; flex-shrink:0;
+        '>{icon}</div>
+        <div style='flex:1'>
+            <div style='display:flex; align-items:center; gap:0.75rem; flex-wrap:wrap; margin-bottom:0.4rem'>
+                <span style='font-family:Syne,sans-serif; font-weight:700; color:#e8f5e9; font-size:0.95rem'>
+                    {i}. {title}
+                </span>
+                <span style='
+                    background:{imp_color}22; color:{imp_color};
+                    border:1px solid {imp_color}44;
+                    border-radius:1rem; padding:0.15rem 0.6rem;
+                    font-size:0.65rem; font-weight:600; letter-spacing:0.05em;
+                '>{impact}</span>
+            </div>
+            <p style='color:#9ca3af; font-size:0.82rem; line-height:1.7; margin:0'>{desc}</p>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+
 def show():
     st.markdown("<div class='hero-title' style='font-size:2rem'>💡 AI Recommendations</div>",
                 unsafe_allow_html=True)
@@ -91,6 +284,10 @@ def show():
 
     # ── CHECK SESSION STATE ───────────────────────────────────────────────────
 
+    if 'user_inputs' in st.session_state:
+        # cluster, ranking and plan land from the background job started on the Calculator
+        precomputed(st.session_state['user_inputs'], stages=('cluster', 'ranking', 'plan'))
+
     if 'cluster' not in st.session_state:
         if 'breakdown' not in st.session_state:
             st.warning("⚠️ Please complete the **🧮 Calculator** and **🤖 AI Prediction** first.")
@@ -137,38 +334,32 @@ def show():
     </div>
     """, unsafe_allow_html=True)
 
+    ranking = rank_for_session()
+
     # ── ACTION CARDS ─────────────────────────────────────────────────────────
 
     st.markdown("#### 🎯 Your Personalized Action Plan")
-    st.markdown(f"<p style='color:#6b7280; font-size:0.85rem; margin-bottom:1.25rem'>"
-                f"Ranked by CO₂ impact for a <strong style='color:{recs['color']}'>{cluster}</strong> profile:</p>",
-                unsafe_allow_html=True)
 
-    for i, (icon, title, desc, impact, imp_color) in enumerate(recs['actions'], 1):
-        st.markdown(f"""
-        <div class='carbon-card' style='display:flex; gap:1rem; align-items:flex-start'>
-            <div style='
-                background:rgba(34,197,94,0.1); border:1px solid rgba(34,197,94,0.2);
-                border-radius:10px; width:44px; height:44px; min-width:44px;
-                display:flex; align-items:center; justify-content:center;
-                font-size:1.3rem; flex-shrink:0;
-            '>{icon}</div>
-            <div style='flex:1'>
-                <div style='display:flex; align-items:center; gap:0.75rem; flex-wrap:wrap; margin-bottom:0.4rem'>
-                    <span style='font-family:Syne,sans-serif; font-weight:700; color:#e8f5e9; font-size:0.95rem'>
-                        {i}. {title}
-                    </span>
-                    <span style='
-                        background:{imp_color}22; color:{imp_color};
-                        border:1px solid {imp_color}44;
-                        border-radius:1rem; padding:0.15rem 0.6rem;
-                        font-size:0.65rem; font-weight:600; letter-spacing:0.05em;
-                    '>{impact}</span>
-                </div>
-                <p style='color:#9ca3af; font-size:0.82rem; line-height:1.7; margin:0'>{desc}</p>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+    if ranking:
+        baseline, ranked, stats = ranking
+        top = [r for r in ranked if r['saving'] > 0][:6]
+        st.markdown(f"<p style='color:#6b7280; font-size:0.85rem; margin-bottom:1.25rem'>"
+                    f"Ranked by ML-predicted savings for <strong style='color:{recs['color']}'>your exact inputs</strong> "
+                    f"— {stats['candidates']} what-if scenarios scored in one batch ({stats['ms']:.0f} ms):</p>",
+                    unsafe_allow_html=True)
+        for i, r in enumerate(top, 1):
+            a = r['action']
+            impact, imp_color = impact_label(r['saving'])
+            desc = f"{a.desc} Predicted saving: <strong>{r['saving']:,.0f} kg CO₂/year</strong> ({r['saving_pct']:.1f}%)."
+            action_card(i, a.icon, a.title, desc, impact, imp_color)
+        if not top:
+            st.info("🌟 None of the candidate changes lowers your predicted footprint — you're already near the floor.")
+    else:
+        st.markdown(f"<p style='color:#6b7280; font-size:0.85rem; margin-bottom:1.25rem'>"
+                    f"Ranked by CO₂ impact for a <strong style='color:{recs['color']}'>{cluster}</strong> profile:</p>",
+                    unsafe_allow_html=True)
+        for i, (icon, title, desc, impact, imp_color) in enumerate(recs['actions'], 1):
+            action_card(i, icon, title, desc, impact, imp_color)
 
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown("<hr style='border-color:#1f3320'>", unsafe_allow_html=True)
@@ -177,18 +368,31 @@ def show():
 
     st.markdown("#### 💰 Potential Savings Summary")
 
-    savings_map = {
-        'Low Emitter':    (600, 25),
-        'Medium Emitter': (1800, 38),
-        'High Emitter':   (4500, 55),
-    }
-    saving_kg, saving_pct = savings_map[cluster]
+    if ranking:
+        plan, after = combined_plan(ranking)
+        saving_kg = max(0, round(baseline - after))
+        saving_pct = round(saving_kg / baseline * 100) if baseline else 0
+        label = f"If you follow the top {len(plan)} tips"
+    else:
+        savings_map = {
+            'Low Emitter':    (600, 25),
+            'Medium Emitter': (1800, 38),
+            'High Emitter':   (4500, 55),
+        }
+        saving_kg, saving_pct = savings_map[cluster]
+        after = max(0, ensemble - saving_kg)
+        label = "If you follow ALL tips"
 
     cols = st.columns(4)
-    cols[0].metric("If you follow ALL tips", f"-{saving_kg:,} kg", f"-{saving_pct}% reduction")
-    cols[1].metric("After Reduction", f"{max(0, total - saving_kg):,.0f} kg", "new annual footprint")
+    cols[0].metric(label, f"-{saving_kg:,} kg", f"-{saving_pct}% reduction")
+    cols[1].metric("After Reduction", f"{after:,.0f} kg", "new annual footprint")
     cols[2].metric("Trees Equivalent", f"{int(saving_kg / 21):,}", "trees saved per year")
     cols[3].metric("Monthly Saving", f"{saving_kg//12:,} kg", "per month avg")
 
+    if ranking:
+        show_target_planner()
+        show_people_like_you()
+    show_group_plan()
+
     st.markdown("<br>", unsafe_allow_html=True)
     st.success("🎉 All data flows from your Calculator → AI Prediction → Recommendations. Try changing your inputs and see how recommendations shift!")
\ No newline at end of file
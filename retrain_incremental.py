@@ -0,0 +1,213 @@
+"""
+Incremental Retraining - fold a new batch of cleaned rows into the saved models
+XGBoost keeps boosting from the saved booster, the Random Forest grows extra
+trees on the batch (warm_start) and the mini-batch K-Means takes partial fits.
+Falls back to a full `train_models.py` run when holdout metrics drift. The
+holdout is the manifest's hash split, which the served models never saw; batch
+rows that hash into it are kept out of the update and join it.
+
+Run:
+    python retrain_incremental.py --batch data/new_rows.csv
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import mean_squared_error, r2_score
+
+from engine.assign import ASSIGNER_PATH, ClusterAssigner
+from engine.compact_trees import FORMATS, export_compact
+from engine.manifest import MANIFEST_PATH, holdout_mask, load_manifest, update_manifest
+from engine.scoring import ENSEMBLE_WEIGHTS
+from engine.segmentation import iter_chunks, label_clusters
+from engine.drift import REFERENCE_PATH, fit_reference, save_reference
+from engine.validation import RANGES_PATH, fit_ranges, save_ranges
+import warnings
+warnings.filterwarnings('ignore')
+
+DATA_PATH = 'data/carbon_data_cleaned.csv'
+TARGET = 'carbonemission'
+
+parser = argparse.ArgumentParser(description="Update the saved models with a new batch of rows")
+parser.add_argument('--batch', required=True, help="CSV of new rows in the cleaned-data format")
+parser.add_argument('--extra-trees', type=int, default=20, help="trees the Random Forest grows on the batch")
+parser.add_argument('--extra-rounds', type=int, default=50, help="boosting rounds XGBoost adds on the batch")
+parser.add_argument('--max-drift', type=float, default=0.01,
+                    help="max ensemble R² drop (batch vs reference, or holdout before vs after) before a full retrain")
+parser.add_argument('--no-append', action='store_true', help="don't append the batch to the cleaned dataset")
+args = parser.parse_args()
+
+print("=" * 55)
+print("  INCREMENTAL RETRAINING")
+print("=" * 55)
+
+manifest = load_manifest()
+base = pd.read_csv(DATA_PATH)
+batch = pd.read_csv(args.batch)
+
+missing = [c for c in base.columns if c not in batch.columns]
+if missing:
+    sys.exit(f"❌ Batch is missing columns: {', '.join(missing)}")
+batch = batch[base.columns]
+
+
+def append_batch():
+    if not args.no_append:
+        batch.to_csv(DATA_PATH, mode='a', header=False, index=False)
+        print(f"  ✅ Appended {len(batch):,} rows to {DATA_PATH}")
+
+
+def full_retrain(reason):
+    """Append the batch and rerun train_models.py with the last full run's arguments"""
+    print(f"\n⚠️  {reason}\n   → falling back to a full retrain")
+    append_batch()
+    argv = []
+    for name, value in manifest.get('args', {}).items():
+        if value is not None:
+            argv += [f"--{name.replace('_', '-')}", str(value)]
+    t0 = time.time()
+    subprocess.run([sys.executable, 'train_models.py', *argv], check=True)
+    print(f"\n  Full retrain took {time.time() - t0:.1f}s")
+    sys.exit(0)
+
+
+if not manifest:
+    full_retrain(f"No {MANIFEST_PATH} — models predate incremental training")
+spec = manifest['holdout']
+if spec.get('split') != 'hash':
+    full_retrain("Manifest holdout predates the hash split — the served forest may have trained on it")
+
+FEATURES = manifest['features']
+held = holdout_mask(base, spec['fraction'], spec['salt'])
+X_hold, y_hold = base.loc[held, FEATURES], base.loc[held, TARGET]
+X_batch, y_batch = batch[FEATURES], batch[TARGET]
+fit_rows = ~holdout_mask(batch, spec['fraction'], spec['salt'])
+X_fit, y_fit = X_batch[fit_rows], y_batch[fit_rows]
+
+print(f"\n📊 Dataset    : {len(base):,} rows  (+{len(batch):,} new, {len(X_fit):,} used for the update)")
+print(f"   Holdout    : {len(X_hold):,} rows (hash split, unseen by the served models)")
+if not len(X_fit):
+    sys.exit("❌ Every batch row hashes into the holdout — nothing to update on")
+
+rf = joblib.load('models/random_forest.pkl')
+xgb_reg = joblib.load('models/xgboost.pkl')
+kmeans = joblib.load('models/kmeans.pkl')
+scaler = joblib.load('models/scaler.pkl')
+
+if not hasattr(kmeans, 'partial_fit'):
+    full_retrain("Saved K-Means can't take partial fits")
+
+
+def ensemble_r2(rf, xgb_reg, X, y):
+    pred = rf.predict(X) * ENSEMBLE_WEIGHTS['rf'] + xgb_reg.predict(X) * ENSEMBLE_WEIGHTS['xgb']
+    return r2_score(y, pred), float(np.sqrt(mean_squared_error(y, pred)))
+
+# ─── DRIFT GUARD (before) ─────────────────────────────────────────────────────
+
+reference = manifest['holdout']['ensemble']['r2']
+batch_r2, batch_rmse = ensemble_r2(rf, xgb_reg, X_batch, y_batch)
+hold_before, _ = ensemble_r2(rf, xgb_reg, X_hold, y_hold)
+
+print(f"\n  Reference holdout R² (last full run) : {reference:.4f}")
+print(f"  Current models on new batch          : {batch_r2:.4f}  (RMSE {batch_rmse:.1f} kg)")
+if reference - batch_r2 > args.max_drift:
+    full_retrain(f"New batch scores R² {batch_r2:.4f}, {reference - batch_r2:.4f} below the reference")
+
+# ─── INCREMENTAL UPDATE ───────────────────────────────────────────────────────
+
+t0 = time.time()
+
+# XGBoost: extra rounds starting from the saved booster
+xgb_new = xgb.XGBRegressor(**{**xgb_reg.get_params(), 'n_estimators': args.extra_rounds})
+xgb_new.fit(X_fit, y_fit, xgb_model=xgb_reg.get_booster())
+xgb_s = time.time() - t0
+
+# Random Forest: warm_start keeps the fitted trees and only grows the new ones
+t1 = time.time()
+n_before = len(rf.estimators_)
+rf.set_params(warm_start=True, n_estimators=n_before + args.extra_trees)
+rf.fit(X_fit, y_fit)
+rf.set_params(warm_start=False)
+rf_s = time.time() - t1
+
+# K-Means: partial fits in the saved scaler's space
+t1 = time.time()
+X_batch_scaled = scaler.transform(X_fit)
+for chunk in iter_chunks(len(X_batch_scaled)):
+    kmeans.partial_fit(X_batch_scaled[chunk])
+km_s = time.time() - t1
+
+update_s = time.time() - t0
+
+print(f"\n{'─'*50}")
+print(f"  XGBoost        : +{args.extra_rounds} rounds  {xgb_s:>6.2f}s")
+print(f"  Random Forest  : {n_before} → {len(rf.estimators_)} trees  {rf_s:>6.2f}s")
+print(f"  K-Means        : {len(X_fit):,} rows of partial fits  {km_s:>6.2f}s")
+print(f"{'─'*50}")
+
+# ─── DRIFT GUARD (after) ──────────────────────────────────────────────────────
+
+hold_after, hold_rmse = ensemble_r2(rf, xgb_new, X_hold, y_hold)
+print(f"\n  Holdout R² before → after : {hold_before:.4f} → {hold_after:.4f}")
+if hold_before - hold_after > args.max_drift:
+    full_retrain(f"Holdout R² dropped {hold_before - hold_after:.4f} after the incremental update")
+
+# ─── RELABEL CLUSTERS ─────────────────────────────────────────────────────────
+
+k = kmeans.n_clusters
+all_rows = pd.concat([base, batch], ignore_index=True)
+clusters = kmeans.predict(scaler.transform(all_rows[FEATURES]))
+cluster_label_map = label_clusters(clusters, all_rows[TARGET], k)
+assigner = ClusterAssigner.from_sklearn(scaler, kmeans, FEATURES)
+
+# ─── SAVE ─────────────────────────────────────────────────────────────────────
+
+print(f"\n\n{'='*55}")
+print("  SAVING MODELS")
+print(f"{'='*55}")
+
+joblib.dump(rf, 'models/random_forest.pkl')
+joblib.dump(xgb_new, 'models/xgboost.pkl')
+joblib.dump(kmeans, 'models/kmeans.pkl')
+assigner.save(ASSIGNER_PATH)
+export_compact({'random_forest': rf, 'xgboost': xgb_new}, FEATURES, all_rows[FEATURES])
+with open('models/cluster_label_map.json', 'w') as f:
+    json.dump({str(c): v for c, v in cluster_label_map.items()}, f)
+save_ranges(fit_ranges(all_rows))
+save_reference(fit_reference(all_rows, predictions=rf.predict(X_hold) * ENSEMBLE_WEIGHTS['rf'] +
+                             xgb_new.predict(X_hold) * ENSEMBLE_WEIGHTS['xgb']))
+append_batch()
+
+update_manifest(
+    mode='incremental', rows=len(all_rows),
+    increments=manifest.get('increments', []) + [{
+        'at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'batch': os.path.basename(args.batch),
+        'rows': len(batch), 'fit_rows': len(X_fit), 'extra_trees': args.extra_trees, 'extra_rounds': args.extra_rounds,
+        'batch_r2': batch_r2, 'holdout_r2': hold_after, 'holdout_rmse': hold_rmse,
+        'update_seconds': update_s,
+    }])
+
+print(f"  ✅ models/random_forest.pkl  ({len(rf.estimators_)} trees)")
+print(f"  ✅ models/xgboost.pkl        ({xgb_new.get_booster().num_boosted_rounds()} rounds)")
+print(f"  ✅ models/kmeans.pkl")
+print(f"  ✅ {ASSIGNER_PATH}")
+print(f"  ✅ models/{{random_forest,xgboost}}.{{{','.join(FORMATS)}}}.npz")
+print(f"  ✅ models/cluster_label_map.json")
+print(f"  ✅ {RANGES_PATH}")
+print(f"  ✅ {REFERENCE_PATH}")
+print(f"  ✅ {MANIFEST_PATH}")
+
+full_s = manifest.get('train_seconds')
+print(f"\n{'='*55}")
+print(f"  UPDATE COMPLETE in {update_s:.2f}s" +
+      (f"  (last full retrain {full_s:.1f}s, {full_s / update_s:.0f}× slower)" if full_s else ""))
+print(f"{'='*55}")
+print("\nNN index, explanations and the distilled student keep their last full-run versions.")
@@ -0,0 +1,3 @@
+# tools/__init__.py
+# Benchmarks and operational scripts — run from the repo root, e.g.
+#   python -m tools.bench_binning
@@ -0,0 +1,76 @@
+"""
+Parity check + benchmark — fused cluster assigner vs scaler + KMeans
+Needs trained models (python train_models.py). Exits non-zero on a parity failure.
+
+Run:
+    python -m tools.bench_assigner [--rows 1000000]
+"""
+import argparse
+import json
+import sys
+import time
+
+import joblib
+import pandas as pd
+
+from engine.assign import ClusterAssigner
+from tools.synth import synthetic_population
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    scaler = joblib.load('models/scaler.pkl')
+    kmeans = joblib.load('models/kmeans.pkl')
+    with open('models/feature_names.json') as f:
+        features = json.load(f)
+    assigner = ClusterAssigner.from_sklearn(scaler, kmeans, features)
+
+    print("=" * 60)
+    print("  FUSED CLUSTER ASSIGNER")
+    print("=" * 60)
+
+    # ── Parity ────────────────────────────────────────────────────────────────
+    ok = True
+    for name, df in [('cleaned dataset', pd.read_csv('data/carbon_data_cleaned.csv')),
+                     (f'synthetic {args.rows:,}', synthetic_population(args.rows))]:
+        X = df[features]
+        expected = kmeans.predict(scaler.transform(X))
+        got = assigner.predict(X.to_numpy())
+        mismatches = int((expected != got).sum())
+        ok &= mismatches == 0
+        print(f"  Parity on {name:<20}: {len(X) - mismatches:,}/{len(X):,} match")
+
+    # ── Latency ───────────────────────────────────────────────────────────────
+    row_df = X.iloc[[0]]
+    row_np = row_df.to_numpy()
+    single_sk = best_of(lambda: kmeans.predict(scaler.transform(row_df)), 200) * 1e6
+    single_np = best_of(lambda: assigner.predict(row_np), 200) * 1e6
+    batch_np_in = X.to_numpy()
+    batch_sk = best_of(lambda: kmeans.predict(scaler.transform(X)), 3)
+    batch_np = best_of(lambda: assigner.predict(batch_np_in), 3)
+
+    print(f"\n  {'':<22}{'scaler+KMeans':>14}{'fused':>12}{'speedup':>9}")
+    print(f"  {'single row':<22}{single_sk:>11.1f} µs{single_np:>9.1f} µs{single_sk / single_np:>8.1f}×")
+    print(f"  {f'batch {len(X):,} rows':<22}{batch_sk * 1000:>11.1f} ms{batch_np * 1000:>9.1f} ms"
+          f"{batch_sk / batch_np:>8.1f}×")
+
+    if not ok:
+        print("\n  ❌ parity failure")
+        sys.exit(1)
+    print("\n  ✅ parity OK")
+
+
+if __name__ == '__main__':
+    main()
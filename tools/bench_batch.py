@@ -0,0 +1,95 @@
+"""
+Benchmark — organization upload: streaming encode + batched scoring
+Writes a synthetic employee CSV in the raw survey vocabulary (strings, as a
+company export would be), then streams it through engine.batch.score_csv in a
+fresh process per chunk size, reporting rows/s, the read+encode vs scoring
+split and peak RSS above the post-load baseline — flat in the row count when
+memory is bounded by the chunk, not the file.
+
+Run (after python train_models.py):
+    python -m tools.bench_batch [--rows 500000] [--chunks 10000 20000 50000 200000]
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+
+def status_mb(field):
+    """VmRSS / VmHWM of this process in MB"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def write_csv(path, n_rows, seed=7):
+    """Synthetic employees with raw category labels, an id and a department column"""
+    import pandas as pd
+    from engine.batch import REQUIRED
+    from engine.features import DECODE_MAP
+    from tools.synth import synthetic_population
+    df = synthetic_population(n_rows, seed=seed)[list(REQUIRED)]
+    for col, labels in DECODE_MAP.items():
+        df[col] = df[col].map(labels)
+    rng = np.random.default_rng(seed)
+    df.insert(0, 'department', rng.choice(['Sales', 'Engineering', 'Operations', 'Finance', 'Support',
+                                           'Marketing', 'Legal', 'Logistics'], size=n_rows))
+    df.insert(0, 'employee_id', pd.RangeIndex(n_rows).map(lambda i: f'E{i:07d}'))
+    df.to_csv(path, index=False)
+
+
+def run(path, chunk_rows, fmt):
+    """One streaming pass in this (fresh) process → timings and memory"""
+    os.environ['CARBON_MODEL_FORMAT'] = fmt
+    from engine.batch import score_csv
+    from pages.predictions import _load_models
+    models, error = _load_models()
+    if error:
+        raise SystemExit(error)
+    base = status_mb('VmRSS')
+    summary = stats = None
+    for summary, stats in score_csv(path, models, chunk_rows=chunk_rows):
+        pass
+    result = summary.to_dict()
+    return {'rows': result['rows'], 'invalid': result['invalid'], 'mean_kg': result['mean_kg'],
+            'top': result['top'][0], **stats, 'peak_mb': status_mb('VmHWM') - base}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--chunks', type=int, nargs='+', default=[10_000, 20_000, 50_000, 200_000])
+    parser.add_argument('--formats', nargs='+', default=['pickle', 'float32'])
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'employees.csv')
+    t0 = time.perf_counter()
+    write_csv(path, args.rows)
+    size_mb = os.path.getsize(path) / 1e6
+
+    print("=" * 78)
+    print(f"  ORGANIZATION UPLOAD — {args.rows:,} rows, {size_mb:,.1f} MB CSV (written in {time.perf_counter() - t0:.1f}s)")
+    print("=" * 78)
+    print(f"\n  {'models':<8} {'chunk':>8} {'rows/s':>9} {'total s':>8} {'read+enc':>9} {'score':>7} {'peak ΔMB':>9}")
+    ctx = get_context('spawn')
+    means = set()
+    for fmt in args.formats:
+        for chunk in args.chunks:
+            with ProcessPoolExecutor(1, mp_context=ctx) as pool:
+                r = pool.submit(run, path, chunk, fmt).result()
+            means.add(round(r['mean_kg'], 1))
+            print(f"  {fmt:<8} {chunk:>8,} {r['rows_per_s']:>9,.0f} {r['seconds']:>8.1f} {r['parse_s']:>9.1f} "
+                  f"{r['score_s']:>7.1f} {r['peak_mb']:>9.1f}")
+    print(f"\n  rows scored {r['rows']:,} · rejected {r['invalid']:,} · mean kg per format/chunk: {sorted(means)}")
+    print(f"  top emitter: {r['top'][1]} {r['top'][0]:,.0f} kg ({r['top'][2]})")
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
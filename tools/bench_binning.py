@@ -0,0 +1,75 @@
+"""
+Benchmark — binned vs raw population charts
+Measures Plotly JSON payload size and server-side render time (aggregate +
+build figure + serialize) at growing population sizes.
+
+Run:
+    python -m tools.bench_binning [--sizes 10000 1000000 10000000]
+"""
+import argparse
+import time
+
+import plotly.graph_objects as go
+
+from engine.binning import population_bins
+from tools.synth import synthetic_population
+
+
+RAW_LIMIT = 1_000_000  # raw payloads above this are hundreds of MB — skip them
+
+
+def binned_figures(df):
+    bins = population_bins(df, clusters=df['diet'].to_numpy() % 3)
+    hist, heat, ch = bins['co2_hist'], bins['distance_heatmap'], bins['cluster_hist']
+    figs = [
+        go.Figure(go.Bar(x=hist['centers'], y=hist['counts'])),
+        go.Figure(go.Heatmap(x=heat['x'], y=heat['y'], z=heat['z'])),
+        go.Figure([go.Scatter(x=ch['centers'], y=c, line_shape='hvh') for c in ch['counts']]),
+    ]
+    return figs
+
+
+def raw_figures(df):
+    co2 = df['carbonemission'].to_numpy()
+    groups = df['diet'].to_numpy() % 3
+    return [
+        go.Figure(go.Histogram(x=co2)),
+        go.Figure(go.Scattergl(x=df['vehicle_monthly_distance_km'].to_numpy(), y=co2, mode='markers')),
+        go.Figure([go.Histogram(x=co2[groups == g]) for g in range(3)]),
+    ]
+
+
+def measure(build, df):
+    t0 = time.perf_counter()
+    payload = sum(len(fig.to_json()) for fig in build(df))
+    return payload, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    print("=" * 64)
+    print("  POPULATION CHARTS — BINNED vs RAW")
+    print("=" * 64)
+    print(f"  {'rows':>11}  {'binned bytes':>13}  {'binned s':>9}  {'raw bytes':>13}  {'raw s':>8}")
+
+    measure(binned_figures, synthetic_population(1_000))  # warm plotly validators
+
+    for n in args.sizes:
+        df = synthetic_population(n)
+        b_bytes, b_time = measure(binned_figures, df)
+        if n <= RAW_LIMIT:
+            r_bytes, r_time = measure(raw_figures, df)
+            raw = f"{r_bytes:>13,}  {r_time:>8.2f}"
+        else:
+            raw = f"{'skipped':>13}  {'—':>8}"
+        print(f"  {n:>11,}  {b_bytes:>13,}  {b_time:>9.3f}  {raw}")
+        del df
+
+    print("\n  Binned payload is fixed by bin counts; only the aggregation pass grows with rows.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark — streaming drift monitor: per-request cost, memory, alert accuracy
+Replays synthetic scored requests through engine.drift.DriftMonitor one
+request at a time, as the app does: microseconds per observe(), traced memory
+after a short warm-up vs after the full replay (flat when the histograms are
+fixed-size), and which features alert for traffic drawn from the training
+distribution vs traffic with deliberately shifted columns.
+
+Run (after python train_models.py):
+    python -m tools.bench_drift [--requests 1000000] [--scenario-requests 5000]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from engine.drift import ALERT, WATCH, WINDOW, DriftMonitor, fit_reference, load_reference
+from engine.features import ENCODE_MAP
+from engine.validation import NUMERIC
+from tools.synth import synthetic_population
+
+
+COLUMNS = [*ENCODE_MAP, *NUMERIC]
+
+
+def requests(n, seed, shift=None):
+    """n answers as the Calculator's {column: value} dicts, optionally passed through `shift(df)`"""
+    df = synthetic_population(n, seed=seed)[COLUMNS].astype(np.float64)
+    if shift is not None:
+        df = shift(df)
+    return df.to_dict('records')
+
+
+def drive_further(df):
+    df = df.copy()
+    private = df['transport'] == ENCODE_MAP['transport']['private']
+    df.loc[private, 'vehicle_monthly_distance_km'] *= 1.5
+    return df
+
+
+def all_omnivore(df):
+    return df.assign(diet=ENCODE_MAP['diet']['omnivore'])
+
+
+def grocery_inflation(df):
+    return df.assign(monthly_grocery_bill=df['monthly_grocery_bill'] * 1.3)
+
+
+SCENARIOS = {
+    'in-distribution': None,
+    'vehicle km ×1.5 (private)': drive_further,
+    'diet all omnivore': all_omnivore,
+    'grocery bill +30%': grocery_inflation,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=1_000_000)
+    parser.add_argument('--scenario-requests', type=int, default=5_000)
+    args = parser.parse_args()
+
+    reference = load_reference()
+    print("=" * 66)
+    print("  DRIFT MONITOR — streaming histograms vs the training reference")
+    print("=" * 66)
+    if reference is None:
+        import pandas as pd
+        from tools.synth import CLEANED_PATH
+        reference = fit_reference(pd.read_csv(CLEANED_PATH))
+        print("  (no models/drift_reference.json — fitted from the cleaned CSV, inputs only)")
+    sizes = [len(s['counts']) for s in reference['features'].values()]
+    print(f"  {len(sizes)} features, {sum(sizes)} bins, window {WINDOW:,}–{2 * WINDOW:,} requests")
+
+    # ── PER-REQUEST COST ─────────────────────────────────────────────────────
+
+    pool = requests(50_000, seed=1)
+    monitor = DriftMonitor(reference)
+    t0 = time.perf_counter()
+    for i in range(args.requests):
+        monitor.observe(pool[i % len(pool)])
+    per = (time.perf_counter() - t0) / args.requests
+    print(f"\n  observe(): {per * 1e6:,.1f} µs per request ({args.requests:,} requests, "
+          f"{1 / per:,.0f} requests/s, metrics published)")
+
+    # ── MEMORY ───────────────────────────────────────────────────────────────
+
+    tracemalloc.start()
+    monitor = DriftMonitor(reference)
+    for row in pool[:10_000]:
+        monitor.observe(row)
+    warm = tracemalloc.get_traced_memory()[0]
+    for i in range(args.requests):
+        monitor.observe(pool[i % len(pool)])
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"  traced memory: {warm / 1024:,.1f} KB after 10,000 requests, "
+          f"{after / 1024:,.1f} KB after {10_000 + args.requests:,} ({after - warm:+,} B)")
+
+    # ── ALERTS ───────────────────────────────────────────────────────────────
+
+    print(f"\n  {'scenario':<28} {'alert':<42} {'watch'}")
+    for seed, (name, shift) in enumerate(SCENARIOS.items(), start=11):
+        monitor = DriftMonitor(reference, publish=False)
+        for row in requests(args.scenario_requests, seed=seed, shift=shift):
+            monitor.observe(row)
+        monitor.refresh()
+        report = monitor.report()
+        alert = ', '.join(r['feature'] for r in report if r['status'] == ALERT) or '—'
+        watch = ', '.join(r['feature'] for r in report if r['status'] == WATCH) or '—'
+        print(f"  {name:<28} {alert:<42} {watch}")
+        worst = report[0]
+        print(f"  {'':<28} worst: {worst['feature']} psi {worst['psi']:.3f} "
+              f"(noise {worst['noise']:.3f})" + (f", ks {worst['ks']:.3f}" if worst['ks'] is not None else ""))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark — group profiles: one batched score vs one call per member
+Builds households of 1–12 members from real profiles and times
+GroupProfile.score (one predict per model + one cluster call for everyone) and
+GroupProfile.rank (every member's counterfactuals in one predict) against
+looping the single-person path per member, as the pages did for one user.
+
+Run (after python train_models.py):
+    python -m tools.bench_group [--sizes 1 2 4 8 12] [--repeat 20]
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from engine.counterfactual import rank_actions
+from engine.group import COLUMNS, GroupProfile
+from engine.scoring import assign_clusters, predict_models
+from tools.synth import CLEANED_PATH
+
+
+def best_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 2, 4, 8, 12])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    from pages.predictions import _load_models
+    models, error = _load_models()
+    if error:
+        raise SystemExit(error)
+    features = models['features']
+    people = pd.read_csv(CLEANED_PATH, nrows=max(args.sizes))[list(COLUMNS)].to_dict('records')
+
+    print("=" * 66)
+    print("  GROUP PROFILES — batched vs per-member scoring (median ms)")
+    print("=" * 66)
+    print(f"\n  {'members':>7} {'score':>8} {'looped':>8} {'rank':>8} {'looped':>8} {'rank ms / member':>17}")
+    for n in args.sizes:
+        group = GroupProfile()
+        for i, person in enumerate(people[:n]):
+            group.add(f'Member {i + 1}', person)
+        rows = group.rows()
+
+        def looped_score():
+            for row in rows:
+                X = pd.DataFrame([row])[features]
+                predict_models(models, X)
+                assign_clusters(models, X)
+
+        score = best_ms(lambda: group.score(models), args.repeat)
+        score_loop = best_ms(looped_score, args.repeat)
+        rank = best_ms(lambda: group.rank(models), max(1, args.repeat // 4))
+        rank_loop = best_ms(lambda: [rank_actions(models, r, features) for r in rows], max(1, args.repeat // 4))
+        print(f"  {n:>7} {score:>8.1f} {score_loop:>8.1f} {rank:>8.1f} {rank_loop:>8.1f} {rank / n:>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark — instrumentation overhead
+Per-call cost of `timed()` / `inc()` with metrics on and off, then whole
+sessions (the load test's Calculator → AI Prediction → Analytics →
+Recommendations flow) in fresh processes with CARBON_METRICS=1 vs 0,
+alternating, comparing warm rerun time.
+
+Run (after python train_models.py):
+    python -m tools.bench_metrics [--pairs 4] [--flows 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+from tools.loadtest_app import run_session
+
+
+def per_call_ns(n=200_000):
+    """(timed ns, inc ns) for the current CARBON_METRICS setting"""
+    from engine import metrics
+    t0 = time.perf_counter()
+    for _ in range(n):
+        with metrics.timed('bench_seconds', page='bench'):
+            pass
+    t1 = time.perf_counter()
+    for _ in range(n):
+        metrics.inc('bench_total', page='bench')
+    t2 = time.perf_counter()
+    return (t1 - t0) / n * 1e9, (t2 - t1) / n * 1e9
+
+
+def instrumented_session(flows):
+    """Warm rerun ms of one session plus how many metric updates it made"""
+    from engine.metrics import ENABLED, REGISTRY
+    session = run_session(0, flows)
+    warm = sum(ms for flow, _, ms in session['reruns'] if flow > 0)
+    # every timed() is paired with at most one inc() → an upper bound on updates
+    updates = 2 * sum(s['count'] for _, _, s in REGISTRY.histograms())
+    return {'enabled': ENABLED, 'warm_ms': warm, 'updates': updates, 'errors': session['errors'],
+            'per_call': per_call_ns(50_000)}
+
+
+def run(enabled, flows):
+    os.environ['CARBON_METRICS'] = '1' if enabled else '0'
+    with ProcessPoolExecutor(1, mp_context=get_context('spawn')) as pool:
+        return pool.submit(instrumented_session, flows).result()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pairs', type=int, default=4, help="on/off session pairs")
+    parser.add_argument('--flows', type=int, default=3, help="page flows per session (first is cold)")
+    args = parser.parse_args()
+    os.environ.setdefault('CARBON_HISTORY_PATH', os.path.join(tempfile.mkdtemp(), 'history_bench.db'))
+
+    print("=" * 66)
+    print("  INSTRUMENTATION OVERHEAD")
+    print("=" * 66)
+
+    on, off = [], []
+    for i in range(args.pairs):
+        # alternate which goes first so drift (page cache, thermal) hits both sides
+        for enabled in ((True, False) if i % 2 == 0 else (False, True)):
+            result = run(enabled, max(args.flows, 2))
+            (on if enabled else off).append(result)
+            print(f"  pair {i + 1}  metrics {'on ' if enabled else 'off'}  warm {result['warm_ms']:8.0f} ms")
+
+    print(f"\n  Per call (ns)        {'timed()':>10} {'inc()':>10}")
+    for name, runs in (('metrics on', on), ('metrics off', off)):
+        timed_ns = np.median([r['per_call'][0] for r in runs])
+        inc_ns = np.median([r['per_call'][1] for r in runs])
+        print(f"  {name:<20} {timed_ns:>10.0f} {inc_ns:>10.0f}")
+
+    warm_on = np.array([r['warm_ms'] for r in on])
+    warm_off = np.array([r['warm_ms'] for r in off])
+    updates = int(np.median([r['updates'] for r in on]))
+    per_update_ms = np.median([r['per_call'][0] for r in on]) / 1e6
+    computed = updates * per_update_ms / np.median(warm_on)
+
+    print(f"\n  Warm session time over {args.pairs} pairs ({max(args.flows, 2) - 1} warm flows each)")
+    print(f"    metrics on  : median {np.median(warm_on):8.0f} ms  (min {warm_on.min():.0f})")
+    print(f"    metrics off : median {np.median(warm_off):8.0f} ms  (min {warm_off.min():.0f})")
+    measured = np.median(warm_on) / np.median(warm_off) - 1
+    print(f"    measured    : {measured:+.2%}  (run-to-run noise included)")
+    print(f"    from costs  : ≤{updates:,} updates × {per_update_ms * 1e6:.0f} ns = {computed:.4%} of warm time")
+    print(f"    exceptions  : {sum(r['errors'] for r in on + off)}")
+
+
+if __name__ == '__main__':
+    main()
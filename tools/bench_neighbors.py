@@ -0,0 +1,62 @@
+"""
+Benchmark — "people like you" KD-tree at synthetic scale
+Reports build time, index size, memory-mapped load time and query latency.
+
+Run:
+    python -m tools.bench_neighbors [--sizes 100000 1000000 3000000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from engine.neighbors import build_index, load_index, query
+from tools.synth import synthetic_population
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000, 3_000_000])
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('-k', type=int, default=25)
+    args = parser.parse_args()
+
+    print("=" * 72)
+    print("  NEAREST-NEIGHBOUR INDEX")
+    print("=" * 72)
+    print(f"  {'profiles':>10}  {'build s':>8}  {'size MB':>8}  {'load ms':>8}  {'p50 ms':>7}  {'p99 ms':>7}")
+
+    tmp = tempfile.mkdtemp()
+    for n in args.sizes:
+        df = synthetic_population(n)
+        features = [c for c in df.columns if c != 'carbonemission']
+        X_scaled = StandardScaler().fit_transform(df[features])
+        path = os.path.join(tmp, f'nn_{n}.pkl')
+
+        t0 = time.perf_counter()
+        build_index(X_scaled, df.to_numpy(), df.columns, path=path)
+        build_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        index = load_index(path)
+        load_ms = (time.perf_counter() - t0) * 1000
+
+        rng = np.random.default_rng(0)
+        lat = []
+        for i in rng.integers(0, n, size=args.queries):
+            t0 = time.perf_counter()
+            query(index, X_scaled[i], k=args.k)
+            lat.append((time.perf_counter() - t0) * 1000)
+
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"  {n:>10,}  {build_s:>8.2f}  {size_mb:>8.0f}  {load_ms:>8.1f}  "
+              f"{np.percentile(lat, 50):>7.2f}  {np.percentile(lat, 99):>7.2f}")
+        del df, X_scaled, index
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
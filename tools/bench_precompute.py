@@ -0,0 +1,76 @@
+"""
+Benchmark — background precompute vs inline inference
+One session per run in a fresh process: Calculator, a pause while the user reads
+the estimate, then AI Prediction → Analytics → Recommendations, timing each
+page's rerun. CARBON_PRECOMPUTE=1 starts the models from the Calculator;
+=0 is the old path where every page computes as it renders. A zero pause is the
+worst case for precompute (the job has barely started when the user clicks on).
+
+Run (after python train_models.py):
+    python -m tools.bench_precompute [--runs 3] [--think 0 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+
+PAGES = ("🤖  AI Prediction", "📊  Analytics", "💡  Recommendations")
+
+
+def session(think_s):
+    """{page: rerun ms} for one Calculator → results flow, plus exceptions seen"""
+    import warnings
+    warnings.filterwarnings('ignore')
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.abspath('app.py'), default_timeout=120)
+    at.run()
+    at.sidebar.radio[0].set_value("🧮  Calculator").run()
+    time.sleep(think_s)
+    out, errors = {}, 0
+    for page in PAGES:
+        t0 = time.perf_counter()
+        at.sidebar.radio[0].set_value(page).run()
+        out[page] = (time.perf_counter() - t0) * 1000
+        errors += len(at.exception)
+    return out, errors
+
+
+def run(enabled, think_s):
+    os.environ['CARBON_PRECOMPUTE'] = '1' if enabled else '0'
+    with ProcessPoolExecutor(1, mp_context=get_context('spawn')) as pool:
+        return pool.submit(session, think_s).result()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=3, help="sessions per setting")
+    parser.add_argument('--think', type=float, nargs='+', default=[0.0, 3.0],
+                        help="seconds on the Calculator before navigating on")
+    args = parser.parse_args()
+    os.environ.setdefault('CARBON_HISTORY_PATH', os.path.join(tempfile.mkdtemp(), 'history_bench.db'))
+
+    print("=" * 78)
+    print("  BACKGROUND PRECOMPUTE — page rerun ms after the Calculator (median of runs)")
+    print("=" * 78)
+    print(f"\n  {'pause':>6} {'precompute':<11}" + ''.join(f"{p.split()[-1]:>16}" for p in PAGES) + f"{'total':>10}")
+    errors = 0
+    for think_s in args.think:
+        for enabled in (False, True):
+            runs = []
+            for _ in range(args.runs):
+                ms, err = run(enabled, think_s)
+                runs.append(ms)
+                errors += err
+            med = {p: float(np.median([r[p] for r in runs])) for p in PAGES}
+            print(f"  {think_s:>5.1f}s {'on' if enabled else 'off':<11}" + ''.join(f"{med[p]:>16.0f}" for p in PAGES)
+                  + f"{sum(med.values()):>10.0f}")
+    print(f"\n  exceptions: {errors}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark — Monte Carlo projection throughput
+Trajectories per second for each served model (ensemble pickles, compact
+float32 forests, distilled student) at growing trajectory counts, plus how
+many trajectories fit the page's interactive latency budget.
+
+Run (after python train_models.py):
+    python -m tools.bench_projection [--profiles 20] [--sizes 500 2000 10000]
+"""
+import argparse
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from engine.compact_trees import load_compact
+from engine.features import with_interactions
+from engine.projection import simulate
+from pages.predictions import PROJECTION_BUDGET_S, load_models
+warnings.filterwarnings('ignore')
+
+
+def served_variants(models):
+    yield 'ensemble (pickle)', {**models, 'serving': 'ensemble'}
+    rf, xgb = load_compact('random_forest', 'float32'), load_compact('xgboost', 'float32')
+    if rf is not None and xgb is not None:
+        yield 'ensemble (float32)', {**models, 'rf': rf, 'xgb': xgb, 'serving': 'ensemble'}
+    if models.get('student') is not None:
+        yield 'student', {**models, 'serving': 'student'}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--profiles', type=int, default=20, help="dataset rows used as users")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000, 10000],
+                        help="trajectories per scenario")
+    args = parser.parse_args()
+
+    models, error = load_models()
+    if error:
+        raise SystemExit(error)
+    df = pd.read_csv('data/carbon_data_cleaned.csv').drop(columns='carbonemission')
+    users = [with_interactions(r) for r in df.sample(args.profiles, random_state=0).to_dict('records')]
+
+    print("=" * 78)
+    print("  MONTE CARLO PROJECTION — 2 scenarios × 5 years, batched + deduplicated")
+    print("=" * 78)
+    print(f"  {'model':<20} {'traj/scen':>9} {'ms p50':>8} {'ms max':>8} {'unique':>7} {'traj/s':>9}")
+    for name, variant in served_variants(models):
+        for n in args.sizes:
+            runs = [simulate(variant, u, models['features'], n=n, seed=i)[1] for i, u in enumerate(users)]
+            ms = np.array([r['ms'] for r in runs])
+            unique = np.mean([r['unique_rows'] / r['rows'] for r in runs])
+            print(f"  {name:<20} {n:>9,} {np.median(ms):>8.0f} {ms.max():>8.0f} {unique:>6.0%} "
+                  f"{np.median([r['per_second'] for r in runs]):>9,.0f}")
+        budgeted = [simulate(variant, u, models['features'], n=100_000, budget_s=PROJECTION_BUDGET_S, seed=i)[1]
+                    for i, u in enumerate(users)]
+        print(f"  {'':<20} {'budget':>9} {np.median([r['ms'] for r in budgeted]):>8.0f} "
+              f"{max(r['ms'] for r in budgeted):>8.0f} {'':>7} "
+              f"{np.median([r['trajectories'] for r in budgeted]):>9,.0f} trajectories in {PROJECTION_BUDGET_S:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
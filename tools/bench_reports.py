@@ -0,0 +1,109 @@
+"""
+Benchmark — static HTML reports: batched scoring + precompiled templates
+Writes a synthetic employee CSV, then renders a report per user with
+engine.reports across a process pool, reporting reports/s, the worker split
+between scoring and rendering, and output size for each plotly.js mode. A naive
+baseline on a sample — rank_actions per user and fig.to_html per figure, as a
+one-off script would — shows what batching and the compiled figures buy.
+
+Run (after python train_models.py):
+    python -m tools.bench_reports [--users 10000] [--workers 1 2] [--sample 200]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from engine.batch import REQUIRED, encoded_chunks
+from engine.reports import CHUNK_USERS, generate, write_index
+from tools.bench_batch import write_csv
+
+
+def chunks(path, limit=None, chunk=CHUNK_USERS):
+    seen = 0
+    with open(path, 'rb') as f:
+        for rows, report, ids, groups, start in encoded_chunks(f, chunk):
+            valid = report.valid
+            lines = np.arange(start, start + len(rows)) + 2
+            yield {c: report.values[c][valid] for c in REQUIRED}, ids[valid], groups[valid], lines[valid]
+            seen += len(rows)
+            if limit and seen >= limit:
+                return
+
+
+def run(path, workers, mode, limit=None):
+    out = tempfile.mkdtemp()
+    t0 = time.perf_counter()
+    entries, score_s, render_s = [], 0.0, 0.0
+    for done, timings in generate(chunks(path, limit), out, workers, mode):
+        entries.extend(done)
+        score_s += timings['score_s']
+        render_s += timings['render_s']
+    write_index(entries, out)
+    wall = time.perf_counter() - t0
+    files = [os.path.join(out, e['file']) for e in entries]
+    size = sum(os.path.getsize(p) for p in files)
+    shared = os.path.getsize(os.path.join(out, 'plotly.min.js')) if mode == 'directory' else 0
+    shutil.rmtree(out)
+    return {'n': len(entries), 'wall': wall, 'score_s': score_s, 'render_s': render_s,
+            'size': size, 'shared': shared}
+
+
+def naive(path, n):
+    """Per-user rank_actions + Plotly's own to_html for each figure → seconds per report"""
+    import warnings
+    warnings.filterwarnings('ignore')
+    from engine.counterfactual import rank_actions
+    from engine.features import with_interactions
+    from engine.footprint import breakdown
+    from pages.analytics import build_benchmarks, build_pie, build_radar
+    from pages.predictions import _load_models
+    models, _ = _load_models()
+    values = next(chunks(path, n, chunk=n))[0]
+    rows = [with_interactions({c: float(values[c][i]) for c in values}) for i in range(n)]
+    t0 = time.perf_counter()
+    size = 0
+    for row in rows:
+        kg, ranked, _ = rank_actions(models, row, models['features'])
+        parts = breakdown(row)
+        page = ''.join(fig.to_html(full_html=False, include_plotlyjs='cdn')
+                       for fig in (build_pie(parts, sum(parts.values())), build_benchmarks(kg), build_radar(parts)))
+        size += len(page) + sum(len(r['action'].desc) for r in ranked[:5])
+    return (time.perf_counter() - t0) / n, size / n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument('--sample', type=int, default=200, help="users for the inline mode and the naive baseline")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'employees.csv')
+    write_csv(path, args.users)
+
+    print("=" * 78)
+    print(f"  STATIC REPORTS — {args.users:,} users, {os.cpu_count()} CPU(s)")
+    print("=" * 78)
+    print(f"\n  {'plotly.js':<10} {'workers':>7} {'users':>7} {'reports/s':>10} {'wall s':>7} "
+          f"{'score s':>8} {'render s':>9} {'KB/report':>10} {'total MB':>9}")
+    runs = [('cdn', w, None) for w in args.workers] + [('directory', args.workers[-1], None),
+                                                      ('inline', args.workers[-1], args.sample)]
+    for mode, workers, limit in runs:
+        r = run(path, workers, mode, limit)
+        total = (r['size'] / r['n'] * args.users + r['shared']) / 1e6
+        print(f"  {mode:<10} {workers:>7} {r['n']:>7,} {r['n'] / r['wall']:>10,.0f} {r['wall']:>7.1f} "
+              f"{r['score_s']:>8.1f} {r['render_s']:>9.1f} {r['size'] / r['n'] / 1024:>10.1f} "
+              f"{total:>9,.1f}" + ("  (extrapolated)" if limit else ""))
+
+    per, size = naive(path, args.sample)
+    print(f"\n  Naive per-user baseline on {args.sample}: {1 / per:,.0f} reports/s "
+          f"(rank_actions + fig.to_html, {size / 1024:,.1f} KB of figure HTML per report)")
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark — mini-batch segmentation vs full K-Means
+Fit time and peak traced memory for the k=3 serving fit, plus wall time of the
+parallel k sweep, at synthetic population sizes.
+
+Run:
+    python -m tools.bench_segmentation [--sizes 100000 1000000 5000000]
+"""
+import argparse
+import time
+import tracemalloc
+
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+from engine.segmentation import fit_minibatch, predict_chunked, sweep_k
+from tools.synth import synthetic_population
+
+
+FULL_KMEANS_LIMIT = 1_000_000
+
+
+def traced(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument('--no-sweep', action='store_true')
+    args = parser.parse_args()
+
+    print("=" * 78)
+    print("  SEGMENTATION — MiniBatchKMeans (chunked) vs KMeans(n_init=10)")
+    print("=" * 78)
+    print(f"  {'rows':>10}  {'X MB':>6}  {'mini s':>7}  {'mini MB':>8}  "
+          f"{'full s':>7}  {'full MB':>8}  {'sweep k=2..8 s':>14}")
+
+    for n in args.sizes:
+        df = synthetic_population(n)
+        X = StandardScaler().fit_transform(df.drop(columns='carbonemission'))
+        del df
+
+        mini_s, mini_mb = traced(lambda: predict_chunked(fit_minibatch(X, 3), X))
+        if n <= FULL_KMEANS_LIMIT:
+            full_s, full_mb = traced(lambda: KMeans(n_clusters=3, random_state=42, n_init=10).fit_predict(X))
+            full = f"{full_s:>7.2f}  {full_mb:>8.0f}"
+        else:
+            full = f"{'—':>7}  {'—':>8}"
+
+        if args.no_sweep:
+            sweep = '—'
+        else:
+            t0 = time.perf_counter()
+            sweep_k(X)
+            sweep = f"{time.perf_counter() - t0:.2f}"
+
+        print(f"  {n:>10,}  {X.nbytes / 1e6:>6.0f}  {mini_s:>7.2f}  {mini_mb:>8.0f}  {full}  {sweep:>14}")
+        del X
+
+    print("\n  MB = peak traced allocations during the fit, excluding the input matrix.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark — model memory across concurrent worker processes
+Starts N workers per serving mode, each loading the models the way
+load_models() does, touching every model array and scoring a batch, then
+reads /proc/self/smaps_rollup while all N are alive:
+
+- pickle : joblib RF / XGBoost / KMeans / scaler, private per process
+- float32: compact node arrays loaded from .npz, private per process
+- shared : one memory-mapped bundle (engine.shared_models), attached zero-copy
+
+Deltas are against each worker's own baseline after imports, taken once every
+worker has loaded, so they are model data only; scoring scratch is reported apart. USS (private pages) is what one more worker costs; PSS splits
+shared pages across the workers that map them, so ΣPSS is host memory.
+
+Run (after python train_models.py):
+    python -m tools.bench_shared_models [--workers 8]
+"""
+import argparse
+import json
+import time
+from multiprocessing import get_context
+
+import numpy as np
+
+
+MODES = ('pickle', 'float32', 'shared')
+
+
+def memory_mb():
+    """{'rss', 'pss', 'uss', 'shared'} in MB from smaps_rollup"""
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {'rss': fields['Rss'], 'pss': fields['Pss'],
+            'uss': fields['Private_Clean'] + fields['Private_Dirty'],
+            'shared': fields['Shared_Clean'] + fields['Shared_Dirty']}
+
+
+def load(mode):
+    import joblib
+    from engine.assign import ClusterAssigner
+    from engine.compact_trees import load_compact
+    from engine.shared_models import load_shared
+    if mode == 'shared':
+        shared = load_shared()
+        return {'rf': shared['random_forest'], 'xgb': shared['xgboost'],
+                'assigner': shared['assigner'], 'scaler': shared['scaler']}
+    if mode == 'float32':
+        return {'rf': load_compact('random_forest', 'float32'), 'xgb': load_compact('xgboost', 'float32'),
+                'assigner': ClusterAssigner.load(), 'scaler': joblib.load('models/scaler.pkl')}
+    return {'rf': joblib.load('models/random_forest.pkl'), 'xgb': joblib.load('models/xgboost.pkl'),
+            'kmeans': joblib.load('models/kmeans.pkl'), 'scaler': joblib.load('models/scaler.pkl'),
+            'assigner': ClusterAssigner.load()}
+
+
+def touch(models):
+    """Read every page of the compact arrays (worst case for shared RSS)"""
+    for name in ('rf', 'xgb'):
+        for a in ('feature', 'split', 'right', 'roots'):
+            arr = getattr(models[name], a, None)
+            if arr is not None:
+                int(np.asarray(arr).view(np.uint8)[::4096].sum())
+
+
+def worker(mode, X, start, done, results):
+    import pandas as pd
+    import joblib, sklearn.ensemble, xgboost   # noqa: F401 — imports are not model data
+    import engine.compact_trees, engine.shared_models   # noqa: F401
+    from engine.scoring import assign_clusters, predict_ensemble
+    with open('models/cluster_label_map.json') as f:
+        cluster_map = json.load(f)
+    frame = pd.DataFrame(X[0], columns=X[1])
+
+    start.wait()                     # all imported, so shared library pages are split 8 ways in both readings
+    base = memory_mb()
+    t0 = time.perf_counter()
+    models = load(mode)
+    load_s = time.perf_counter() - t0
+    models['cluster_map'] = cluster_map
+    touch(models)
+
+    done.wait()                      # every worker loaded → sharing is visible in PSS
+    loaded = memory_mb()
+    predict_ensemble(models, frame)
+    assign_clusters(models, frame)
+    models['scaler'].transform(frame)
+    scored = memory_mb()
+    results.put({k: loaded[k] - base[k] for k in loaded} | {'scored_uss': scored['uss'] - base['uss'],
+                                                          'load_s': load_s})
+    done.wait()                      # keep mappings alive until all have measured
+
+
+def run_mode(mode, n, X):
+    ctx = get_context('spawn')
+    start, done, results = ctx.Barrier(n), ctx.Barrier(n), ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(mode, X, start, done, results)) for _ in range(n)]
+    for p in procs:
+        p.start()
+    out = [results.get() for _ in range(n)]
+    for p in procs:
+        p.join()
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rows', type=int, default=2000, help="rows each worker scores")
+    args = parser.parse_args()
+
+    import pandas as pd
+    from engine.shared_models import SHARED_PATH, load_shared
+    with open('models/feature_names.json') as f:
+        features = json.load(f)
+    X = (pd.read_csv('data/carbon_data_cleaned.csv')[features].head(args.rows).to_numpy(), features)
+    load_shared()                    # publish up front so no worker pays for it
+
+    print("=" * 78)
+    print(f"  MODEL MEMORY — {args.workers} concurrent workers, Δ vs post-import baseline (MB)")
+    print("=" * 78)
+    print(f"  bundle: {SHARED_PATH}")
+    print(f"\n  {'mode':<9} {'load ms':>8} {'ΔRSS':>8} {'ΔPSS':>8} {'ΔUSS':>8} {'ΣΔPSS':>9} {'ΣΔRSS':>9} {'+scoring':>9}")
+    for mode in MODES:
+        res = run_mode(mode, args.workers, X)
+        med = {k: float(np.median([r[k] for r in res])) for k in ('rss', 'pss', 'uss', 'scored_uss', 'load_s')}
+        print(f"  {mode:<9} {med['load_s'] * 1000:>8.0f} {med['rss']:>8.1f} {med['pss']:>8.1f} {med['uss']:>8.1f} "
+              f"{sum(r['pss'] for r in res):>9.1f} {sum(r['rss'] for r in res):>9.1f} {med['scored_uss']:>9.1f}")
+    print(f"\n  ΔUSS = what one more worker costs; ΣΔPSS = host memory for {args.workers} workers' model data;")
+    print(f"  +scoring = ΔUSS after scoring {args.rows:,} rows (per-request scratch, not model data)")
+
+
+if __name__ == '__main__':
+    main()
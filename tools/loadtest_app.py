@@ -0,0 +1,161 @@
+"""
+Load test — concurrent headless sessions through the Streamlit pages
+Every simulated session is its own process driving app.py with AppTest along
+Calculator → AI Prediction → Analytics → Recommendations, with randomized
+calculator sliders / selects and planner target. The first flow per session is
+the cold one (models load, caches fill); the rest are timed as steady state.
+Each concurrency level reports rerun latency percentiles per page, CPU and RSS
+per session, and the highest level whose warm p95 stays under the SLO is the
+maximum sustainable concurrency. Everything lands in a JSON report.
+
+Sessions don't share st.cache_resource the way threads of one server do, so
+RSS per session includes its own model copy — an upper bound for a real server.
+
+Run:
+    python -m tools.loadtest_app [--levels 1 2 4 8] [--flows 3] [--slo-ms 2000]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+
+FLOW = ["🧮  Calculator", "🤖  AI Prediction", "📊  Analytics", "💡  Recommendations"]
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * PAGE_SIZE / 1e6
+
+
+def randomize(at, rng):
+    """Random value for every slider / selectbox / number input on the current page"""
+    for s in at.slider:
+        steps = int(round((s.max - s.min) / s.step))
+        s.set_value(type(s.value)(s.min + rng.randint(0, steps) * s.step))
+    for s in at.selectbox:
+        if s.label != 'Serving model':
+            s.set_value(rng.choice(s.options))
+    for n in at.number_input:
+        lo, hi = n.min if n.min is not None else 0, n.max if n.max is not None else 10_000
+        n.set_value(type(n.value)(rng.uniform(lo, hi)))
+
+
+def run_session(session_id, flows, app='app.py'):
+    """One session: `flows` passes of FLOW → {'reruns': [(flow, page, ms)], cpu, rss, errors}"""
+    warnings.filterwarnings('ignore')
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(session_id)
+    reruns, errors = [], 0
+    cpu0 = resource.getrusage(resource.RUSAGE_SELF)
+
+    def timed(flow, page, run):
+        nonlocal errors
+        t0 = time.perf_counter()
+        run()
+        reruns.append((flow, page, (time.perf_counter() - t0) * 1000))
+        errors += len(at.exception)
+
+    at = AppTest.from_file(os.path.abspath(app), default_timeout=300)
+    timed(0, 'Home', at.run)
+    for flow in range(flows):
+        for page in FLOW:
+            name = page.split(maxsplit=1)[-1]
+            timed(flow, name, at.sidebar.radio[0].set_value(page).run)
+            if page in ("🧮  Calculator", "💡  Recommendations"):
+                randomize(at, rng)
+                timed(flow, name, at.run)
+
+    cpu1 = resource.getrusage(resource.RUSAGE_SELF)
+    return {'session': session_id, 'reruns': reruns, 'errors': errors,
+            'cpu_s': (cpu1.ru_utime - cpu0.ru_utime) + (cpu1.ru_stime - cpu0.ru_stime),
+            'rss_mb': rss_mb(), 'peak_rss_mb': cpu1.ru_maxrss / 1000}
+
+
+def percentiles(ms):
+    ms = np.asarray(ms)
+    return {'n': int(ms.size), 'p50': float(np.percentile(ms, 50)), 'p95': float(np.percentile(ms, 95)),
+            'p99': float(np.percentile(ms, 99)), 'max': float(ms.max())}
+
+
+def run_level(concurrency, flows):
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(concurrency, mp_context=get_context('spawn')) as pool:
+        sessions = list(pool.map(run_session, range(concurrency), [flows] * concurrency))
+    wall = time.perf_counter() - t0
+
+    warm = [(page, ms) for s in sessions for flow, page, ms in s['reruns'] if flow > 0]
+    cold = [(page, ms) for s in sessions for flow, page, ms in s['reruns'] if flow == 0]
+    pages = ['Home'] + [p.split(maxsplit=1)[-1] for p in FLOW]
+    return {
+        'concurrency': concurrency,
+        'wall_s': wall,
+        'warm': {p: percentiles([ms for q, ms in warm if q == p]) for p in pages if any(q == p for q, _ in warm)},
+        'cold': {p: percentiles([ms for q, ms in cold if q == p]) for p in pages},
+        'warm_p95_ms': percentiles([ms for _, ms in warm])['p95'] if warm else None,
+        'reruns_per_s': sum(len(s['reruns']) for s in sessions) / wall,
+        'errors': sum(s['errors'] for s in sessions),
+        'sessions': [{k: s[k] for k in ('session', 'cpu_s', 'rss_mb', 'peak_rss_mb', 'errors')} for s in sessions],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 2, 4, 8], help="concurrent sessions")
+    parser.add_argument('--flows', type=int, default=3, help="page flows per session (first one is cold)")
+    parser.add_argument('--slo-ms', type=float, default=2000, help="warm p95 rerun latency target")
+    parser.add_argument('--out', default='loadtest_app.json')
+    args = parser.parse_args()
+
+    # sessions record history like real users do — keep it out of data/history.db
+    os.environ.setdefault('CARBON_HISTORY_PATH', os.path.join(tempfile.mkdtemp(), 'history_loadtest.db'))
+
+    print("=" * 78)
+    print("  APP LOAD TEST — Calculator → AI Prediction → Analytics → Recommendations")
+    print("=" * 78)
+    print(f"  CPUs {os.cpu_count()} · {args.flows} flows per session · SLO warm p95 ≤ {args.slo_ms:.0f} ms")
+
+    levels = []
+    for concurrency in args.levels:
+        level = run_level(concurrency, max(args.flows, 2))
+        level['sustainable'] = level['errors'] == 0 and level['warm_p95_ms'] <= args.slo_ms
+        levels.append(level)
+
+        print(f"\n  {concurrency} concurrent session(s) — {level['wall_s']:.1f}s wall, "
+              f"{level['reruns_per_s']:.1f} reruns/s, {level['errors']} errors")
+        print(f"    {'page':<16} {'cold p50':>9} {'warm p50':>9} {'p95':>8} {'p99':>8} {'max':>8}")
+        for page, cold in level['cold'].items():
+            warm = level['warm'].get(page)
+            row = f"{warm['p50']:>9.0f} {warm['p95']:>8.0f} {warm['p99']:>8.0f} {warm['max']:>8.0f}" if warm else ''
+            print(f"    {page:<16} {cold['p50']:>9.0f} {row}")
+        cpu = [s['cpu_s'] for s in level['sessions']]
+        rss = [s['peak_rss_mb'] for s in level['sessions']]
+        print(f"    per session: cpu {np.mean(cpu):.1f}s · peak RSS {np.mean(rss):.0f} MB"
+              f"  → {'✅ within SLO' if level['sustainable'] else '❌ over SLO'} (warm p95 {level['warm_p95_ms']:.0f} ms)")
+
+    sustainable = [lv['concurrency'] for lv in levels if lv['sustainable']]
+    report = {
+        'at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'cpu_count': os.cpu_count(),
+        'flows': max(args.flows, 2), 'slo_ms': args.slo_ms, 'flow': FLOW, 'levels': levels,
+        'max_sustainable_concurrency': max(sustainable) if sustainable else 0,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n{'='*78}")
+    print(f"  Max sustainable concurrency: {report['max_sustainable_concurrency']}  → {args.out}")
+    print("=" * 78)
+
+
+if __name__ == '__main__':
+    main()
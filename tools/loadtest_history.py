@@ -0,0 +1,90 @@
+"""
+Load test — history store under many concurrent writers
+Simulates `--users` users each submitting once a month for `--months` months,
+spread over `--threads` concurrent session threads, then measures trend-query
+latency against the populated store.
+
+Run:
+    python -m tools.loadtest_history [--users 100000 --months 24 --threads 32]
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from engine.history import HistoryStore
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--months', type=int, default=24)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--queries', type=int, default=20_000)
+    parser.add_argument('--db', default=None, help="defaults to a temp file")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), 'history_loadtest.db')
+    store = HistoryStore(path)
+    start_ts = time.mktime((2024, 1, 15, 12, 0, 0, 0, 0, 0))
+    month_s = 30.44 * 86400
+    n_events = args.users * args.months
+
+    print("=" * 60)
+    print("  HISTORY STORE LOAD TEST")
+    print("=" * 60)
+    print(f"  Users × months : {args.users:,} × {args.months} = {n_events:,} events")
+    print(f"  Writer threads : {args.threads}")
+    print(f"  Database       : {path}")
+
+    enqueue_lat = [[] for _ in range(args.threads)]
+
+    def session_worker(t):
+        rng = random.Random(t)
+        lat = enqueue_lat[t]
+        for m in range(args.months):
+            ts = start_ts + m * month_s
+            for u in range(t, args.users, args.threads):
+                t0 = time.perf_counter()
+                store.record(f"u{u}", 'prediction', rng.uniform(800, 5000), cluster='Medium Emitter', ts=ts)
+                lat.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=session_worker, args=(t,)) for t in range(args.threads)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    enqueued = time.perf_counter() - t0
+    store.flush()
+    committed = time.perf_counter() - t0
+
+    lat = np.concatenate([np.asarray(x) for x in enqueue_lat]) * 1e6
+    print(f"\n  Ingest")
+    print(f"    all enqueued after : {enqueued:8.1f} s")
+    print(f"    all committed after: {committed:8.1f} s  ({n_events / committed:,.0f} events/s)")
+    print(f"    record() latency   : p50 {np.percentile(lat, 50):.1f} µs · "
+          f"p99 {np.percentile(lat, 99):.1f} µs · max {lat.max() / 1000:.1f} ms")
+
+    rng = random.Random(0)
+    q_lat = []
+    for _ in range(args.queries):
+        uid = f"u{rng.randrange(args.users)}"
+        t1 = time.perf_counter()
+        rows = store.trend(uid, 'prediction', limit=12)
+        q_lat.append(time.perf_counter() - t1)
+    q_lat = np.asarray(q_lat) * 1e6
+    print(f"\n  Trend query (12 monthly rollups)")
+    print(f"    rows returned      : {len(rows)}")
+    print(f"    latency            : p50 {np.percentile(q_lat, 50):.0f} µs · p99 {np.percentile(q_lat, 99):.0f} µs")
+
+    size = sum(os.path.getsize(path + suffix) for suffix in ('', '-wal') if os.path.exists(path + suffix))
+    print(f"\n  Database size      : {size / 1e6:,.0f} MB ({store.count_events():,} events)")
+
+
+if __name__ == '__main__':
+    main()
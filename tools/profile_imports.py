@@ -0,0 +1,105 @@
+"""
+Profile — import cost and cold-start time per page
+Each page module is imported under `python -X importtime` on top of streamlit,
+then the app is cold-started in a fresh process per page (AppTest) to time the
+first paint of Home and of the page itself, and which heavy libraries it loaded.
+
+Run:
+    python -m tools.profile_imports [--runs 3] [--top 8]
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+import numpy as np
+
+
+PAGES = {
+    "🏠  Home": 'home',
+    "🧮  Calculator": 'calculator',
+    "🤖  AI Prediction": 'predictions',
+    "📊  Analytics": 'analytics',
+    "💡  Recommendations": 'recommendations',
+    "🏢  Organization": 'organization',
+}
+HEAVY = ('numpy', 'pandas', 'plotly.graph_objects', 'plotly.express', 'joblib', 'scipy',
+         'sklearn', 'xgboost')
+
+COLD_START = """
+import json, sys, time, warnings
+warnings.filterwarnings('ignore')
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t_import = time.perf_counter()
+at = AppTest.from_file('app.py', default_timeout=300)
+at.run()
+t_home = time.perf_counter()
+label = sys.argv[1]
+if 'Home' not in label:
+    at.sidebar.radio[0].set_value(label).run()
+t_page = time.perf_counter()
+print(json.dumps({'import_ms': (t_import - t0) * 1000, 'home_ms': (t_home - t_import) * 1000,
+                  'page_ms': (t_page - t_home) * 1000, 'errors': len(at.exception),
+                  'loaded': [m for m in %r if m in sys.modules]}))
+""" % (HEAVY,)
+
+
+def import_profile(module):
+    """(ms to import pages.<module> once streamlit is loaded, [(ms, package)] heaviest top-level imports)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import streamlit, pages.{module}'],
+                            capture_output=True, text=True)
+    rows, after_streamlit = [], False
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if name.strip() == 'streamlit' and not name.startswith('  '):
+            after_streamlit = True
+            continue
+        if after_streamlit:
+            depth = (len(name) - len(name.lstrip())) // 2
+            rows.append((depth, int(cumulative) / 1000, name.strip()))
+    total = sum(ms for depth, ms, _ in rows if depth == 0)
+    nested = sorted(((ms, name) for depth, ms, name in rows if depth <= 1), reverse=True)
+    return total, nested
+
+
+def cold_start(label, runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', COLD_START, label], capture_output=True, text=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=3, help="fresh processes per page")
+    parser.add_argument('--top', type=int, default=8, help="heaviest imports listed per page")
+    args = parser.parse_args()
+
+    print("=" * 78)
+    print("  IMPORT TIME — pages.<module> on top of `import streamlit`")
+    print("=" * 78)
+    for label, module in PAGES.items():
+        total, nested = import_profile(module)
+        print(f"\n  pages.{module:<16} {total:>8.0f} ms")
+        for ms, name in nested[:args.top]:
+            print(f"      {ms:>8.0f} ms  {name}")
+
+    print(f"\n{'='*78}")
+    print(f"  COLD START — fresh process per page, median of {args.runs}")
+    print("=" * 78)
+    print(f"  {'page':<20} {'streamlit':>9} {'home ms':>8} {'page ms':>8} {'total':>8}  heavy modules loaded")
+    for label, module in PAGES.items():
+        samples = cold_start(label, args.runs)
+        med = {k: np.median([s[k] for s in samples]) for k in ('import_ms', 'home_ms', 'page_ms')}
+        loaded = ', '.join(samples[-1]['loaded']) or '—'
+        errors = f"  ({samples[-1]['errors']} exceptions)" if samples[-1]['errors'] else ''
+        print(f"  {label.split(maxsplit=1)[-1]:<20} {med['import_ms']:>9.0f} {med['home_ms']:>8.0f} "
+              f"{med['page_ms']:>8.0f} {sum(med.values()):>8.0f}  {loaded}{errors}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,9 @@
 Machine Learning Model Training - Carbon Emission Dataset
 """
 
+import argparse
+import json
+import pickle
 import pandas as pd
 import numpy as np
 import joblib
@@ -12,13 +15,38 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LinearRegression
 from sklearn.tree import DecisionTreeRegressor
 from sklearn.ensemble import RandomForestRegressor
-from sklearn.cluster import KMeans
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 import xgboost as xgb
+from engine.assign import ClusterAssigner
+from engine.compact_trees import FORMATS, compact_path, export_compact, sklearn_nbytes
+from engine.distill import STUDENT_INFO_PATH, STUDENT_PATH, accuracy, distill, measure, predict_latency, refit
+from engine.explain import (COHORT_COLUMNS, EXPLAIN_PATH, PERMUTATION_PATH,
+                            build_explanations, tree_contributions)
+from engine.manifest import MANIFEST_PATH, holdout_mask, holdout_spec, load_manifest, update_manifest
+from engine.neighbors import build_index
+from engine.scoring import ENSEMBLE_WEIGHTS
+from engine.segmentation import fit_minibatch, label_clusters, predict_chunked, sweep_k
+from engine.drift import REFERENCE_PATH, fit_reference, save_reference
+from engine.validation import RANGES_PATH, fit_ranges, save_ranges
+from engine.selection import Blend, permutation_ranking, prune_features, speedup
 import warnings
 warnings.filterwarnings('ignore')
 
+parser = argparse.ArgumentParser(description="Train the carbon footprint models")
+parser.add_argument('--k', default='3',
+                    help="number of K-Means segments, or 'auto' to pick the best silhouette from the sweep")
+parser.add_argument('--no-tuned', action='store_true',
+                    help="ignore hyperparameters saved by tune_models.py and use the built-in defaults")
+parser.add_argument('--prune-budget', type=float, default=0.002,
+                    help="max validation R² feature pruning may lose before a feature is kept (negative disables)")
+parser.add_argument('--distill-budget', type=float, default=0.02,
+                    help="max holdout R² the distilled student may lose vs the ensemble (negative disables)")
+parser.add_argument('--distill-rmse-budget', type=float, default=None,
+                    help="optional max holdout RMSE increase (kg CO₂) for the student")
+args = parser.parse_args()
+
 os.makedirs('models', exist_ok=True)
+started = time.time()
 
 # ─── LOAD CLEANED DATA ────────────────────────────────────────────────────────
 
@@ -35,15 +63,75 @@ TARGET = 'carbonemission'
 X = df[FEATURES]
 y = df[TARGET]
 
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
+# Hash split: a row's side never changes as batches are appended, and the served
+# models never see the holdout, so retrain_incremental.py can re-test on it
+held = holdout_mask(df)
+X_train, X_test, y_train, y_test = X[~held], X[held], y[~held], y[held]
 
 print(f"\n📊 Dataset    : {len(df)} samples")
 print(f"   Training   : {len(X_train)} samples")
 print(f"   Testing    : {len(X_test)} samples")
 print(f"   Features   : {len(FEATURES)}")
 
+# ─── HYPERPARAMETERS ──────────────────────────────────────────────────────────
+
+RF_PARAMS = dict(n_estimators=200, max_depth=15, min_samples_split=10)
+XGB_PARAMS = dict(n_estimators=300, learning_rate=0.05, max_depth=7,
+                  subsample=0.8, colsample_bytree=0.8)
+
+# Winners from tune_models.py override the defaults
+tuned = {} if args.no_tuned else load_manifest().get('tuned', {})
+RF_PARAMS.update(tuned.get('rf', {}).get('params', {}))
+XGB_PARAMS.update(tuned.get('xgb', {}).get('params', {}))
+if tuned:
+    print(f"\n🎛️  Tuned hyperparameters: {', '.join(tuned)} (from {MANIFEST_PATH})")
+
+def rf_model():
+    return RandomForestRegressor(**RF_PARAMS, n_jobs=-1, random_state=42)
+
+def xgb_model(n_jobs=None):
+    return xgb.XGBRegressor(**XGB_PARAMS, random_state=42, verbosity=0, n_jobs=n_jobs)
+
+# ─── FEATURE SELECTION ────────────────────────────────────────────────────────
+
+ALL_FEATURES = FEATURES
+ranking = None
+if args.prune_budget >= 0:
+    print(f"\n\n{'='*55}")
+    print(f"  FEATURE SELECTION (permutation + elimination, R² budget {args.prune_budget})")
+    print(f"{'='*55}")
+
+    # Selection never sees the test split: rank and eliminate on a slice of train
+    X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=0.2, random_state=42)
+    proxy = lambda: xgb_model(n_jobs=1)   # single-threaded, the parallelism is across fits
+
+    t0 = time.time()
+    ranking = permutation_ranking(proxy().fit(X_fit, y_fit), X_val, y_val)
+    FEATURES, steps = prune_features(proxy, X_fit, y_fit, X_val, y_val, ranking, args.prune_budget)
+    print(f"\n  {'dropped':>7}  {'feature':<32} {'val R²':>7}  {'loss':>7}")
+    for step in steps[1:]:
+        mark = "  ✂️" if step['feature'] not in FEATURES else ""
+        print(f"  {step['dropped']:>7}  {step['feature']:<32} {step['r2']:>7.4f}  {step['r2_loss']:>+7.4f}{mark}")
+        if not step['within_budget']:
+            break
+    print(f"  Selection time: {time.time() - t0:.2f}s")
+    print(f"\n  Keeping {len(FEATURES)}/{len(ALL_FEATURES)} features"
+          + (f" — dropped {', '.join(c for c in ALL_FEATURES if c not in FEATURES)}"
+             if len(FEATURES) < len(ALL_FEATURES) else ""))
+    ranking.assign(kept=ranking['feature'].isin(FEATURES)).to_csv('models/feature_selection.csv', index=False)
+
+    if len(FEATURES) < len(ALL_FEATURES):
+        print(f"\n  {'Model':<15} {'fit full':>9} {'fit pruned':>11} {'µs/row, 1 thread':>16} {'test R²':>17}")
+        for name, make in (("Random Forest", rf_model), ("XGBoost", xgb_model)):
+            sp = speedup(make, X_train, y_train, X_test, y_test, FEATURES)
+            f, p = sp['full'], sp['pruned']
+            print(f"  {name:<15} {f['fit_s']:>8.2f}s {p['fit_s']:>10.2f}s "
+                  f"{f['predict_us_per_row']:>7.2f} → {p['predict_us_per_row']:<6.2f} "
+                  f"{f['r2']:.4f} → {p['r2']:.4f}")
+
+    X = df[FEATURES]
+    X_train, X_test = X_train[FEATURES], X_test[FEATURES]
+
 # ─── HELPER: EVALUATE MODEL ───────────────────────────────────────────────────
 
 def evaluate(name, model, X_tr, X_te, y_tr, y_te):
@@ -95,16 +183,13 @@ results.append(evaluate(
 
 results.append(evaluate(
     "3. Random Forest Regressor  ⭐ (Best Expected)",
-    RandomForestRegressor(n_estimators=200, max_depth=15,
-                          min_samples_split=10, n_jobs=-1, random_state=42),
+    rf_model(),
     X_train, X_test, y_train, y_test
 ))
 
 results.append(evaluate(
     "4. XGBoost Regressor  🚀 (Challenger)",
-    xgb.XGBRegressor(n_estimators=300, learning_rate=0.05, max_depth=7,
-                     subsample=0.8, colsample_bytree=0.8,
-                     random_state=42, verbosity=0),
+    xgb_model(),
     X_train, X_test, y_train, y_test
 ))
 
@@ -125,10 +210,8 @@ best = max(results, key=lambda x: x['r2'])
 print(f"\n🏆 Best Model: {best['name']}")
 print(f"   R² = {best['r2']:.4f} | RMSE = {best['rmse']:.1f} kg | CV R² = {best['cv_r2']:.4f}")
 
-# Re-train best on full data for max accuracy
-rf_final = RandomForestRegressor(n_estimators=200, max_depth=15,
-                                  min_samples_split=10, n_jobs=-1, random_state=42)
-rf_final.fit(X, y)
+# Serve the forest fitted on the train split, like XGBoost — the holdout stays unseen
+rf_final = results[2]['model']
 
 # ─── FEATURE IMPORTANCE ───────────────────────────────────────────────────────
 
@@ -147,23 +230,36 @@ for _, row in feat_importance.head(15).iterrows():
 # ─── K-MEANS CLUSTERING ───────────────────────────────────────────────────────
 
 print(f"\n\n{'='*55}")
-print("  K-MEANS USER SEGMENTATION (k=3)")
+print("  K-MEANS USER SEGMENTATION (mini-batch, k sweep)")
 print(f"{'='*55}")
 
 # Scale features for KMeans
 scaler = StandardScaler()
 X_scaled = scaler.fit_transform(X)
 
-kmeans = KMeans(n_clusters=3, random_state=42, n_init=10)
-clusters = kmeans.fit_predict(X_scaled)
+# Validate k: every candidate is fitted in parallel, scored by inertia + sampled silhouette
+t0 = time.time()
+sweep = sweep_k(X_scaled, ks=range(2, 9))
+print(f"\n  {'k':>3}  {'inertia':>12}  {'silhouette':>10}  {'fit':>7}")
+for r in sweep:
+    print(f"  {r['k']:>3}  {r['inertia']:>12,.0f}  {r['silhouette']:>10.4f}  {r['fit_s']:>6.2f}s")
+print(f"  Sweep time: {time.time() - t0:.2f}s")
+pd.DataFrame(sweep).to_csv('models/kmeans_sweep.csv', index=False)
+
+k = max(sweep, key=lambda r: r['silhouette'])['k'] if args.k == 'auto' else int(args.k)
+print(f"\n  Serving k = {k}" + ("  (best silhouette)" if args.k == 'auto' else ""))
+
+kmeans = fit_minibatch(X_scaled, k)
+clusters, _ = predict_chunked(kmeans, X_scaled)
 
 # Label clusters by mean CO₂
-cluster_means = pd.Series(y).groupby(clusters).mean().sort_values()
-cluster_label_map = {
-    cluster_means.index[0]: 'Low Emitter',
-    cluster_means.index[1]: 'Medium Emitter',
-    cluster_means.index[2]: 'High Emitter'
-}
+cluster_label_map = label_clusters(clusters, y, k)
+
+# Fold the scaler into the centroids for serve-time assignment and check parity
+assigner = ClusterAssigner.from_sklearn(scaler, kmeans, FEATURES)
+mismatches = int((assigner.predict(X) != clusters).sum())
+print(f"  Fused assigner parity: {len(X) - mismatches:,}/{len(X):,} rows match sklearn")
+assert mismatches <= len(X) * 1e-4, "fused cluster assigner disagrees with scaler + KMeans"
 
 print(f"\n  Cluster segments:")
 for c, label in cluster_label_map.items():
@@ -174,6 +270,109 @@ for c, label in cluster_label_map.items():
           f"Avg CO₂: {co2_vals.mean():>7,.0f} kg | "
           f"Range: {co2_vals.min():.0f}–{co2_vals.max():.0f} kg")
 
+# ─── EXPLANATIONS ─────────────────────────────────────────────────────────────
+
+print(f"\n\n{'='*55}")
+print("  EXPLANATIONS (permutation importance + RF path contributions)")
+print(f"{'='*55}")
+
+t0 = time.time()
+perm_importance = permutation_ranking(
+    Blend([results[2]['model'], results[3]['model']], [ENSEMBLE_WEIGHTS['rf'], ENSEMBLE_WEIGHTS['xgb']]),
+    X_test, y_test)
+print(f"\n  Permutation importance (ensemble, holdout R² drop) — {time.time() - t0:.2f}s")
+for _, row in perm_importance.head(8).iterrows():
+    print(f"  {row['feature']:<35} {row['importance']:>7.4f} ± {row['std']:.4f}")
+
+t0 = time.time()
+bias, contributions = tree_contributions(rf_final, X)
+gap = float(np.abs(bias + contributions.sum(axis=1) - rf_final.predict(X)).max())
+assert gap < 1e-3, "tree-path contributions don't add up to the forest prediction"
+n_cohorts = build_explanations(bias, contributions, clusters, df[COHORT_COLUMNS].to_numpy(), FEATURES)
+print(f"\n  Path contributions for {len(X):,} rows in {time.time() - t0:.2f}s "
+      f"(max |bias + Σ − predict| = {gap:.1e} kg)")
+print(f"  Aggregated into {k} clusters and {n_cohorts} cluster × {' × '.join(COHORT_COLUMNS)} cohorts")
+
+# ─── NEAREST-NEIGHBOUR INDEX ──────────────────────────────────────────────────
+
+print(f"\n\n{'='*55}")
+print("  \"PEOPLE LIKE YOU\" INDEX (KD-tree, scaled space)")
+print(f"{'='*55}")
+
+t0 = time.time()
+build_index(X_scaled, df.to_numpy(), df.columns)
+print(f"  ✅ Indexed {len(df):,} profiles in {time.time() - t0:.2f}s")
+
+# ─── DISTILLED STUDENT ────────────────────────────────────────────────────────
+
+student = None
+if args.distill_budget >= 0:
+    print(f"\n\n{'='*55}")
+    print(f"  DISTILLATION (student ← 0.6·RF + 0.4·XGB, R² budget {args.distill_budget})")
+    print(f"{'='*55}")
+
+    weights = [ENSEMBLE_WEIGHTS['rf'], ENSEMBLE_WEIGHTS['xgb']]
+    teacher = Blend([results[2]['model'], results[3]['model']], weights).predict
+
+    # Choose on a validation slice of train, as feature selection does — the test split
+    # only reports the chosen student. The selection teacher never sees that slice either.
+    X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=0.2, random_state=42)
+    if ranking is None:
+        ranking = permutation_ranking(xgb_model(n_jobs=1).fit(X_fit, y_fit), X_val, y_val)
+    ranked = [f for f in ranking['feature'] if f in FEATURES]          # same order as feature selection
+    t0 = time.time()
+    selector = Blend([rf_model().fit(X_fit, y_fit), xgb_model().fit(X_fit, y_fit)], weights)
+    candidate, distill_report, teacher_val = distill(
+        selector.predict(X_fit), X_fit, X_val, y_val, selector.predict(X_val), ranked,
+        r2_budget=args.distill_budget, rmse_budget=args.distill_rmse_budget)
+    print(f"\n  Candidates on {len(X_val):,} validation rows (teacher refitted on {len(X_fit):,}) "
+          f"— {time.time() - t0:.2f}s")
+    print(f"  {'Model':<22} {'val R²':>7} {'RMSE':>7} {'size':>9} {'1-row':>8} {'batch/row':>10}")
+    print(f"  {'Ensemble (teacher)':<22} {teacher_val['r2']:>7.4f} {teacher_val['rmse']:>7.1f}")
+    for r in distill_report:
+        mark = " ✅" if candidate is r['student'] else (" ·" if r['within_budget'] else "")
+        print(f"  {r['name']:<22} {r['r2']:>7.4f} {r['rmse']:>7.1f} {r['bytes'] / 1e3:>7.0f}KB "
+              f"{r['single_us']:>6.0f}µs {r['batch_us_per_row']:>8.2f}µs{mark}")
+
+    if candidate is not None:
+        # the chosen configuration, refitted on all of train, measured once on the test split
+        student = refit(candidate, X_train, teacher(X_train))
+        student_metrics = measure(student, X_test, y_test)
+        single, batch = predict_latency(teacher, X_test, repeat=5)
+        teacher_metrics = {**accuracy(y_test, teacher(X_test)), 'single_us': single, 'batch_us_per_row': batch,
+                           'bytes': sum(len(pickle.dumps(results[i]['model'])) for i in (2, 3))}
+        print(f"\n  {'Test split':<22} {'R²':>7} {'RMSE':>7} {'size':>9} {'1-row':>8} {'batch/row':>10}")
+        for name, m in (("Ensemble (teacher)", teacher_metrics), (student.name, student_metrics)):
+            print(f"  {name:<22} {m['r2']:>7.4f} {m['rmse']:>7.1f} {m['bytes'] / 1e3:>7,.0f}KB "
+                  f"{m['single_us']:>6.0f}µs {m['batch_us_per_row']:>8.2f}µs")
+
+    if student is None:
+        print("\n  ⚠️  No student fits the budget — serving stays on the ensemble")
+    else:
+        print(f"\n  🎓 Student: {student.name} ({len(student.features)} features)")
+
+# ─── COMPACT TREE EXPORT ──────────────────────────────────────────────────────
+
+print(f"\n\n{'='*55}")
+print("  COMPACT TREES (float32 / int16 node arrays)")
+print(f"{'='*55}")
+
+served = {'random_forest': rf_final, 'xgboost': results[3]['model']}
+t0 = time.time()
+compact = export_compact(served, FEATURES, X)
+print(f"\n  Exported {len(compact)} forests in {time.time() - t0:.2f}s — drift over all {len(X):,} rows:")
+print(f"  {'model':<15} {'format':<8} {'in memory':>10} {'on disk':>9} {'max |Δ| kg':>11} {'mean |Δ| kg':>12}")
+for name, model in served.items():
+    reference = model.predict(X)
+    mem = sklearn_nbytes(model) if name == 'random_forest' else len(pickle.dumps(model))
+    print(f"  {name:<15} {'pickle':<8} {mem / 1e6:>8.2f}MB {'':>9} {'':>11} {'':>12}")
+    for fmt in FORMATS:
+        forest = compact[name, fmt]
+        drift = np.abs(forest.predict(X) - reference)
+        disk = os.path.getsize(compact_path(name, fmt))
+        print(f"  {'':<15} {fmt:<8} {forest.nbytes / 1e6:>8.2f}MB {disk / 1e6:>7.2f}MB "
+              f"{drift.max():>11.4f} {drift.mean():>12.5f}")
+
 # ─── SAVE ALL MODELS ──────────────────────────────────────────────────────────
 
 print(f"\n\n{'='*55}")
@@ -181,27 +380,69 @@ print("  SAVING MODELS")
 print(f"{'='*55}")
 
 joblib.dump(rf_final, 'models/random_forest.pkl')
-joblib.dump(best['model'] if best['name'] != results[2]['name'] else rf_final,
-            'models/best_model.pkl')
+joblib.dump(best['model'], 'models/best_model.pkl')
 joblib.dump(kmeans, 'models/kmeans.pkl')
 joblib.dump(scaler, 'models/scaler.pkl')
+assigner.save('models/cluster_assigner.npz')
 joblib.dump(results[3]['model'], 'models/xgboost.pkl')
+ensemble_test = (results[2]['y_pred'] * ENSEMBLE_WEIGHTS['rf'] +
+                 results[3]['y_pred'] * ENSEMBLE_WEIGHTS['xgb'])
+update_manifest(
+    mode='full', trained=time.strftime('%Y-%m-%dT%H:%M:%S'), rows=len(df),
+    features=FEATURES, k=k, args=vars(args),
+    holdout={**holdout_spec(), 'rows': int(held.sum()),
+             'rf': {'r2': results[2]['r2'], 'rmse': results[2]['rmse']},
+             'xgb': {'r2': results[3]['r2'], 'rmse': results[3]['rmse']},
+             'ensemble': {'r2': r2_score(y_test, ensemble_test),
+                          'rmse': float(np.sqrt(mean_squared_error(y_test, ensemble_test)))}},
+    hyperparams={'rf': RF_PARAMS, 'xgb': XGB_PARAMS},
+    train_seconds=time.time() - started,
+    increments=[])
+if student is not None:
+    joblib.dump(student, STUDENT_PATH)
+    with open(STUDENT_INFO_PATH, 'w') as f:
+        json.dump({
+            'name': student.name, 'features': student.features,
+            'r2_budget': args.distill_budget, 'rmse_budget': args.distill_rmse_budget,
+            'teacher': teacher_metrics, 'student': student_metrics,        # both on the test split
+            'validation': {'teacher': teacher_val, 'rows': len(X_val),
+                           'candidates': [{k: v for k, v in r.items() if k != 'student'} for r in distill_report]},
+        }, f, indent=2, default=float)
+else:
+    for path in (STUDENT_PATH, STUDENT_INFO_PATH):
+        if os.path.exists(path):
+            os.remove(path)
 
 # Save feature names and label map
-import json
 with open('models/feature_names.json', 'w') as f:
     json.dump(FEATURES, f)
 with open('models/cluster_label_map.json', 'w') as f:
     json.dump({str(k): v for k, v in cluster_label_map.items()}, f)
+save_ranges(fit_ranges(df))       # inputs outside these are flagged as extrapolation
+save_reference(fit_reference(df, predictions=ensemble_test))     # live traffic is compared to this
 feat_importance.to_csv('models/feature_importance.csv', index=False)
+perm_importance.to_csv(PERMUTATION_PATH, index=False)
 
 print(f"  ✅ models/random_forest.pkl")
 print(f"  ✅ models/best_model.pkl")
 print(f"  ✅ models/kmeans.pkl")
 print(f"  ✅ models/scaler.pkl")
+print(f"  ✅ models/cluster_assigner.npz")
 print(f"  ✅ models/xgboost.pkl")
 print(f"  ✅ models/feature_importance.csv")
+if args.prune_budget >= 0:
+    print(f"  ✅ models/feature_selection.csv  ({len(FEATURES)}/{len(ALL_FEATURES)} features kept)")
+print(f"  ✅ {PERMUTATION_PATH}")
+print(f"  ✅ {EXPLAIN_PATH}")
 print(f"  ✅ models/cluster_label_map.json")
+print(f"  ✅ {RANGES_PATH}")
+print(f"  ✅ {REFERENCE_PATH}")
+print(f"  ✅ models/kmeans_sweep.csv")
+print(f"  ✅ models/{{random_forest,xgboost}}.{{{','.join(FORMATS)}}}.npz")
+print(f"  ✅ models/nn_index.pkl")
+print(f"  ✅ {MANIFEST_PATH}")
+if student is not None:
+    print(f"  ✅ {STUDENT_PATH} + {STUDENT_INFO_PATH}")
 
 print(f"\n{'='*55}")
 print("  TRAINING COMPLETE! ✅")
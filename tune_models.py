@@ -0,0 +1,93 @@
+"""
+Hyperparameter Tuning - successive halving for the Random Forest and XGBoost
+Winning configurations go into models/manifest.json under 'tuned';
+train_models.py picks them up on its next run (--no-tuned to ignore them).
+
+Run:
+    python tune_models.py [--configs 27] [--eta 3] [--workers 4]
+"""
+
+import argparse
+import tempfile
+import time
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from engine.manifest import MANIFEST_PATH, holdout_mask, load_manifest, update_manifest
+from engine.tuning import RF_SPACE, XGB_SPACE, budgets, sample_configs, share_arrays, successive_halving
+import warnings
+warnings.filterwarnings('ignore')
+
+TARGET = 'carbonemission'
+MAX_ROUNDS = 1000
+
+parser = argparse.ArgumentParser(description="Tune RF / XGBoost hyperparameters by successive halving")
+parser.add_argument('--configs', type=int, default=27, help="random configurations per model")
+parser.add_argument('--eta', type=int, default=3, help="keep 1/eta per rung, multiply the budget by eta")
+parser.add_argument('--workers', type=int, default=None, help="process pool size (default: CPU count)")
+parser.add_argument('--models', nargs='+', default=['rf', 'xgb'], choices=['rf', 'xgb'])
+args = parser.parse_args()
+
+print("=" * 55)
+print("  HYPERPARAMETER TUNING (successive halving)")
+print("=" * 55)
+
+manifest = load_manifest()
+df = pd.read_csv('data/carbon_data_cleaned.csv')
+FEATURES = manifest.get('features') or [c for c in df.columns if c != TARGET]
+
+# Same test split as train_models.py; tuning only ever sees the training part
+train = df[~holdout_mask(df)]
+X_train, y_train = train[FEATURES], train[TARGET]
+X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=0.2, random_state=42)
+
+print(f"\n📊 Tuning rows : {len(X_fit):,} fit / {len(X_val):,} validation")
+print(f"   Features    : {len(FEATURES)}")
+print(f"   Configs     : {args.configs} per model, eta = {args.eta}")
+
+tuned = {}
+
+with tempfile.TemporaryDirectory() as tmp:
+    paths = share_arrays(tmp, X_train=X_fit, y_train=y_fit, X_val=X_val, y_val=y_val)
+
+    for kind in args.models:
+        space = RF_SPACE if kind == 'rf' else XGB_SPACE
+        max_budget = len(X_fit) if kind == 'rf' else MAX_ROUNDS
+        min_budget = budgets(max_budget, args.configs, args.eta)[0]
+        unit = 'rows' if kind == 'rf' else 'rounds'
+        configs = sample_configs(space, args.configs)
+
+        print(f"\n{'─'*50}")
+        print(f"  {'Random Forest' if kind == 'rf' else 'XGBoost'} — budget {min_budget:,} → {max_budget:,} {unit}")
+        print(f"{'─'*50}")
+
+        t0 = time.time()
+        best, result, rungs = successive_halving(kind, configs, paths, max_budget,
+                                                 eta=args.eta, max_workers=args.workers)
+        wall = time.time() - t0
+
+        print(f"  {'budget':>8}  {'configs':>7}  {'best val R²':>11}  {'cpu s':>7}")
+        for rung in rungs:
+            res = rung['results'].values()
+            print(f"  {rung['budget']:>8,}  {len(res):>7}  {max(r['r2'] for r in res):>11.4f}  "
+                  f"{sum(r['seconds'] for r in res):>7.1f}")
+
+        # every config at full budget, extrapolated linearly from the last rung it reached
+        last_seen = {i: (rung['budget'], r['seconds']) for rung in rungs for i, r in rung['results'].items()}
+        naive = sum(s * max_budget / b for b, s in last_seen.values())
+        spent = sum(r['seconds'] for rung in rungs for r in rung['results'].values())
+        print(f"\n  Wall {wall:.1f}s · {spent:.1f} cpu-s vs ≈{naive:.0f} cpu-s to run all {len(configs)} at full budget")
+
+        params = dict(best)
+        if kind == 'xgb':
+            params['n_estimators'] = result['rounds']
+        print(f"  🏆 {params}  (val R² {result['r2']:.4f})")
+        tuned[kind] = {'params': params, 'val_r2': result['r2'], 'configs': len(configs),
+                       'eta': args.eta, 'seconds': wall, 'at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+update_manifest(tuned={**manifest.get('tuned', {}), **tuned})
+
+print(f"\n{'='*55}")
+print(f"  ✅ Winners saved to {MANIFEST_PATH} → run python train_models.py")
+print(f"{'='*55}")